@@ -5,7 +5,7 @@ from PyQt5.QtWidgets import (
     QFormLayout, QAbstractItemView, QHeaderView
 )
 from PyQt5.QtCore import Qt
-from database import db 
+from database import db, db_async
 
 class AdminManagement(QWidget):
     def __init__(self):
@@ -122,9 +122,7 @@ class AdminManagement(QWidget):
         self.load_admins()
 
     def load_admins(self):
-        """Load admins from database into the table using the new query."""
-        conn = db.get_db_connection()
-        cursor = conn.cursor(dictionary=True)
+        """Load admins from database in the background."""
         query = """
         SELECT 
             a.user_id, 
@@ -143,8 +141,10 @@ class AdminManagement(QWidget):
         INNER JOIN users u ON a.user_id = u.user_id
         ORDER BY a.admin_id;
         """
-        cursor.execute(query)
-        rows = cursor.fetchall()
+        db_async.submit(query, on_result=self.populate_admins, key=(self, "admins"))
+
+    def populate_admins(self, rows):
+        """Fill the admin table with query results."""
         self.admin_table.setRowCount(len(rows))
         for row_idx, row in enumerate(rows):
             # Column 0: user_id (hidden)
@@ -177,7 +177,6 @@ class AdminManagement(QWidget):
             self.admin_table.setItem(row_idx, 10, QTableWidgetItem(row["admin_level"]))
             # Column 11: Department
             self.admin_table.setItem(row_idx, 11, QTableWidgetItem(row["department"]))
-        cursor.close()
 
     def get_selected_row(self):
         """Get the currently selected row index from row selection."""
@@ -331,6 +330,7 @@ class AdminManagement(QWidget):
             """
             cursor.execute(user_query, (username, password, email, first_name, last_name, phone, role))
             conn.commit()
+            db.invalidate_tables("users")
 
             user_id_query = "SELECT user_id FROM users WHERE username = %s"
             cursor.execute(user_id_query, (username,))
@@ -351,6 +351,7 @@ class AdminManagement(QWidget):
             if query and params:
                 cursor.execute(query, params)
                 conn.commit()
+                db.invalidate_tables("admins")
                 QMessageBox.information(self, "Success", "Admin details saved successfully.")
                 self.load_admins()
         except Exception as e:
@@ -374,12 +375,15 @@ class AdminManagement(QWidget):
             conn = db.get_db_connection()
             cursor = conn.cursor()
             try:
+                conn.start_transaction()
                 cursor.execute("UPDATE users SET role = 'customer' WHERE user_id = (SELECT user_id FROM admins WHERE admin_id = %s)", (admin_id,))
                 cursor.execute("DELETE FROM admins WHERE admin_id = %s", (admin_id,))
                 conn.commit()
+                db.invalidate_tables("users", "admins")
                 QMessageBox.information(self, "Deleted", "Admin deleted successfully and role updated to 'customer'.")
                 self.load_admins()
             except Exception as e:
+                conn.rollback()
                 QMessageBox.critical(self, "Database Error", f"Failed to delete admin: {e}")
             finally:
                 cursor.close()
@@ -7,7 +7,9 @@ from PyQt5.QtWidgets import (
     QComboBox
 )
 from PyQt5.QtCore import Qt
-from database import db
+from database import db, db_async
+from database.rollups import reset_sales_watermark
+from models import ColumnTableView
 
 
 class BrandManagementPage(QWidget):
@@ -78,16 +80,14 @@ class BrandManagementPage(QWidget):
         self.save_button.clicked.connect(self.save_changes)
         
     def load_brands(self):
-        conn = db.get_db_connection()
-        cursor = conn.cursor(dictionary=True)
         query = "SELECT brand_id, brand_name FROM brands ORDER BY brand_id"
-        cursor.execute(query)
-        rows = cursor.fetchall()
+        db_async.submit(query, on_result=self.populate_brands, key=(self, "brands"))
+
+    def populate_brands(self, rows):
         self.brand_table.setRowCount(len(rows))
         for row_idx, row in enumerate(rows):
             self.brand_table.setItem(row_idx, 0, QTableWidgetItem(str(row["brand_id"])))
             self.brand_table.setItem(row_idx, 1, QTableWidgetItem(row["brand_name"]))
-        cursor.close()
     
     def clear_fields(self):
         self.brand_name_input.clear()
@@ -124,6 +124,7 @@ class BrandManagementPage(QWidget):
                     query = "DELETE FROM brands WHERE brand_id = %s"
                     cursor.execute(query, (brand_id,))
                     conn.commit()
+                    db.invalidate_tables("brands")
                     cursor.close()
                     self.load_brands()
                     QMessageBox.information(self, "Deletion Successful", "The brand has been deleted successfully.")
@@ -140,12 +141,14 @@ class BrandManagementPage(QWidget):
                     query = "UPDATE brands SET brand_name = %s WHERE brand_id = %s"
                     cursor.execute(query, (brand_name, self.current_brand_id))
                     conn.commit()
+                    db.invalidate_tables("brands")
                     QMessageBox.information(self, "Success", "Brand updated successfully!")
                 else:
                     # Insert new brand
                     query = "INSERT INTO brands (brand_name) VALUES (%s)"
                     cursor.execute(query, (brand_name,))
                     conn.commit()
+                    db.invalidate_tables("brands")
                     QMessageBox.information(self, "Success", "Brand saved successfully!")
             except mysql.connector.IntegrityError:
                 QMessageBox.warning(self, "Error", "This brand already exists.")
@@ -269,14 +272,13 @@ class SupplierManagementPage(QWidget):
         self.save_button.clicked.connect(self.save_changes)
         
     def load_suppliers(self):
-        conn = db.get_db_connection()
-        cursor = conn.cursor(dictionary=True)
         query = """SELECT supplier_id, supplier_name, contact_email, contact_phone_number, 
                           street, city, state, postal_code, country 
                    FROM suppliers 
                    ORDER BY supplier_id"""
-        cursor.execute(query)
-        rows = cursor.fetchall()
+        db_async.submit(query, on_result=self.populate_suppliers, key=(self, "suppliers"))
+
+    def populate_suppliers(self, rows):
         self.supplier_table.setRowCount(len(rows))
         for row_idx, row in enumerate(rows):
             self.supplier_table.setItem(row_idx, 0, QTableWidgetItem(str(row["supplier_id"])))
@@ -288,7 +290,6 @@ class SupplierManagementPage(QWidget):
             self.supplier_table.setItem(row_idx, 6, QTableWidgetItem(row["state"]))
             self.supplier_table.setItem(row_idx, 7, QTableWidgetItem(row["postal_code"]))
             self.supplier_table.setItem(row_idx, 8, QTableWidgetItem(row["country"]))
-        cursor.close()
     
     def clear_fields(self):
         self.supplier_name_input.clear()
@@ -352,6 +353,7 @@ class SupplierManagementPage(QWidget):
                     query = "DELETE FROM suppliers WHERE supplier_id = %s"
                     cursor.execute(query, (supplier_id,))
                     conn.commit()
+                    db.invalidate_tables("suppliers")
                     cursor.close()
                     self.load_suppliers()
                     QMessageBox.information(self, "Deletion Successful", "The supplier has been deleted successfully.")
@@ -382,6 +384,7 @@ class SupplierManagementPage(QWidget):
                         self.current_supplier_id
                     ))
                     conn.commit()
+                    db.invalidate_tables("suppliers")
                     QMessageBox.information(self, "Success", "Supplier updated successfully!")
                 else:
                     # Insert new supplier
@@ -392,6 +395,7 @@ class SupplierManagementPage(QWidget):
                         supplier_name, contact_email, contact_phone, street, city, state, postal_code, country
                     ))
                     conn.commit()
+                    db.invalidate_tables("suppliers")
                     QMessageBox.information(self, "Success", "Supplier saved successfully!")
             except mysql.connector.IntegrityError:
                 QMessageBox.warning(self, "Error", "This supplier already exists or there is a data integrity issue.")
@@ -412,15 +416,13 @@ class ProductManagementPage(QWidget):
 
         # Product Table
         # Product ID, Product Name, Description, Price, Brand Name, Supplier Name
-        self.product_table = QTableWidget()
-        self.product_table.setColumnCount(6)
-        self.product_table.setHorizontalHeaderLabels([
-            "Product ID", "Product Name", "Description", "Price", "Brand Name", "Supplier Name"
+        self.product_table = ColumnTableView([
+            ("product_id", "Product ID"), ("product_name", "Product Name"),
+            ("product_description", "Description"), ("price", "Price"),
+            ("brand_name", "Brand Name"), ("supplier_name", "Supplier Name"),
         ])
         header = self.product_table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.Stretch)
-        self.product_table.setSelectionBehavior(QAbstractItemView.SelectRows)
-        self.product_table.setSelectionMode(QAbstractItemView.SingleSelection)
         self.product_table.setFixedHeight(400)
         self.load_products()
         main_layout.addWidget(self.product_table)
@@ -497,9 +499,7 @@ class ProductManagementPage(QWidget):
         self.load_products()
 
     def load_products(self):
-        """Load products using the given query."""
-        conn = db.get_db_connection()
-        cursor = conn.cursor(dictionary=True)
+        """Load products in the background."""
         query = """
         SELECT 
             p.product_id, 
@@ -515,17 +515,11 @@ class ProductManagementPage(QWidget):
         INNER JOIN suppliers s ON p.supplier_id = s.supplier_id
         ORDER BY p.product_id;
         """
-        cursor.execute(query)
-        rows = cursor.fetchall()
-        self.product_table.setRowCount(len(rows))
-        for row_idx, row in enumerate(rows):
-            self.product_table.setItem(row_idx, 0, QTableWidgetItem(str(row["product_id"])))
-            self.product_table.setItem(row_idx, 1, QTableWidgetItem(row["product_name"]))
-            self.product_table.setItem(row_idx, 2, QTableWidgetItem(row["product_description"]))
-            self.product_table.setItem(row_idx, 3, QTableWidgetItem(str(row["price"])))
-            self.product_table.setItem(row_idx, 4, QTableWidgetItem(row["brand_name"]))
-            self.product_table.setItem(row_idx, 5, QTableWidgetItem(row["supplier_name"]))
-        cursor.close()
+        db_async.submit(query, on_result=self.populate_products, key=(self, "products"), fetch=db.fetch_columns)
+
+    def populate_products(self, data):
+        """Show the product query results (a ColumnarResult)."""
+        self.product_table.set_result(data)
 
     def load_brands_into_combo(self):
         """Load brands into the brand combo box."""
@@ -553,7 +547,7 @@ class ProductManagementPage(QWidget):
 
     def get_selected_row(self):
         """Return the index of the currently selected row."""
-        row_idx = self.product_table.currentRow()
+        row_idx = self.product_table.current_row()
         if row_idx < 0:
             return None
         return row_idx
@@ -564,13 +558,13 @@ class ProductManagementPage(QWidget):
         if row_idx is None:
             QMessageBox.warning(self, "Error", "Please select a product to edit.")
             return
-        self.current_product_id = int(self.product_table.item(row_idx, 0).text())
-        self.product_name_input.setText(self.product_table.item(row_idx, 1).text())
-        self.product_description_input.setText(self.product_table.item(row_idx, 2).text())
-        self.price_input.setText(self.product_table.item(row_idx, 3).text())
+        self.current_product_id = self.product_table.value(row_idx, "product_id")
+        self.product_name_input.setText(self.product_table.value(row_idx, "product_name"))
+        self.product_description_input.setText(self.product_table.value(row_idx, "product_description") or "")
+        self.price_input.setText(f"{self.product_table.value(row_idx, 'price'):.2f}")
         # For brand and supplier, set the combo box based on the text shown
-        brand_name = self.product_table.item(row_idx, 4).text()
-        supplier_name = self.product_table.item(row_idx, 5).text()
+        brand_name = self.product_table.value(row_idx, "brand_name")
+        supplier_name = self.product_table.value(row_idx, "supplier_name")
         index_brand = self.brand_input.findText(brand_name, Qt.MatchFixedString)
         if index_brand >= 0:
             self.brand_input.setCurrentIndex(index_brand)
@@ -615,6 +609,7 @@ class ProductManagementPage(QWidget):
                 """
                 cursor.execute(query, (product_name, product_description, price, brand_id, supplier_id, self.current_product_id))
                 conn.commit()
+                db.invalidate_tables("products")
                 QMessageBox.information(self, "Success", "Product updated successfully!")
             else:
                 # Insert new product
@@ -624,6 +619,7 @@ class ProductManagementPage(QWidget):
                 """
                 cursor.execute(query, (product_name, product_description, price, brand_id, supplier_id))
                 conn.commit()
+                db.invalidate_tables("products")
                 QMessageBox.information(self, "Success", "Product saved successfully!")
         except mysql.connector.IntegrityError:
             QMessageBox.warning(self, "Error", "This product already exists or there is a data integrity issue.")
@@ -638,8 +634,8 @@ class ProductManagementPage(QWidget):
         if row_idx is None:
             QMessageBox.warning(self, "Error", "Please select a product to delete.")
             return
-        product_name = self.product_table.item(row_idx, 1).text()
-        product_id = int(self.product_table.item(row_idx, 0).text())
+        product_name = self.product_table.value(row_idx, "product_name")
+        product_id = self.product_table.value(row_idx, "product_id")
         reply = QMessageBox.question(self, "Confirm Deletion",
                                      f"Are you sure you want to delete product '{product_name}'?",
                                      QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
@@ -647,8 +643,11 @@ class ProductManagementPage(QWidget):
             conn = db.get_db_connection()
             cursor = conn.cursor()
             query = "DELETE FROM products WHERE product_id = %s"
+            conn.start_transaction()
             cursor.execute(query, (product_id,))
+            reset_sales_watermark(cursor)
             conn.commit()
+            db.invalidate_tables("products")
             cursor.close()
             QMessageBox.information(self, "Deleted", "Product deleted successfully.")
             self.load_products()
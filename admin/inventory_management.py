@@ -1,11 +1,10 @@
 import sys
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QPushButton, QHBoxLayout,
-    QTableWidget, QTableWidgetItem, QMessageBox, QInputDialog, 
-    QHeaderView, QDialog, QLabel, QComboBox, QSpinBox, 
-    QAbstractItemView
+    QMessageBox, QInputDialog, QHeaderView, QDialog, QLabel, QComboBox, QSpinBox
 )
-from database import db  
+from database import db, db_async
+from models import ColumnTableView
 
 
 # Dialog to add a new inventory record
@@ -73,17 +72,14 @@ class InventoryManagement(QWidget):
 
         # Inventory Table 
         # Columns: Inventory ID, Product ID, Product Name, Stock Quantity
-        self.inventory_table = QTableWidget()
-        self.inventory_table.setColumnCount(4)
-        self.inventory_table.setHorizontalHeaderLabels([
-            "Inventory ID", "Product ID", "Product Name", "Stock Quantity"
+        self.inventory_table = ColumnTableView([
+            ("inventory_id", "Inventory ID"), ("product_id", "Product ID"),
+            ("product_name", "Product Name"), ("stock_quantity", "Stock Quantity"),
         ])
         header = self.inventory_table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.Stretch)
 
         self.inventory_table.setFixedHeight(800)
-        self.inventory_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.inventory_table.setSelectionMode(QAbstractItemView.SingleSelection)
 
         self.load_inventory()
         main_layout.addWidget(self.inventory_table)
@@ -108,36 +104,22 @@ class InventoryManagement(QWidget):
         self.delete_stock_button.clicked.connect(self.delete_stock)
 
     def load_inventory(self):
-        """Load inventory from the database using the new query."""
-        conn = db.get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-
+        """Load inventory from the database in the background."""
         query = """
         SELECT i.inventory_id, i.product_id, p.product_name, i.stock_quantity
         FROM inventory i
         INNER JOIN products p ON i.product_id = p.product_id
         ORDER BY i.inventory_id;
         """
-        cursor.execute(query)
-        rows = cursor.fetchall()
+        db_async.submit(query, on_result=self.populate_inventory, key=(self, "inventory"), fetch=db.fetch_columns)
 
-        self.inventory_table.setRowCount(len(rows))
-
-        for row_idx, row in enumerate(rows):
-            # Column 0: Inventory ID
-            self.inventory_table.setItem(row_idx, 0, QTableWidgetItem(str(row["inventory_id"])))
-            # Column 1: Product ID
-            self.inventory_table.setItem(row_idx, 1, QTableWidgetItem(str(row["product_id"])))
-            # Column 2: Product Name
-            self.inventory_table.setItem(row_idx, 2, QTableWidgetItem(row["product_name"]))
-            # Column 3: Stock Quantity
-            self.inventory_table.setItem(row_idx, 3, QTableWidgetItem(str(row["stock_quantity"])))
-
-        cursor.close()
+    def populate_inventory(self, data):
+        """Show the inventory query results (a ColumnarResult)."""
+        self.inventory_table.set_result(data)
 
     def get_selected_row(self):
         """Get the currently selected row index."""
-        row_idx = self.inventory_table.currentRow()
+        row_idx = self.inventory_table.current_row()
         if row_idx < 0:
             return None
         return row_idx
@@ -156,6 +138,7 @@ class InventoryManagement(QWidget):
             insert_query = "INSERT INTO inventory (product_id, stock_quantity) VALUES (%s, %s)"
             cursor.execute(insert_query, (product_id, quantity))
             conn.commit()
+            db.invalidate_tables("inventory")
             cursor.close()
             QMessageBox.information(self, "Success", f"Added {quantity} units for product ID {product_id}.")
             self.load_inventory()
@@ -167,8 +150,8 @@ class InventoryManagement(QWidget):
             QMessageBox.warning(self, "Error", "Please select a product to edit stock.")
             return
 
-        product_name = self.inventory_table.item(row_idx, 2).text()
-        inventory_id = int(self.inventory_table.item(row_idx, 0).text())
+        product_name = self.inventory_table.value(row_idx, "product_name")
+        inventory_id = self.inventory_table.value(row_idx, "inventory_id")
 
         new_quantity, ok = QInputDialog.getInt(self, "Edit Stock", f"Enter new stock quantity for {product_name}:")
         if not ok or new_quantity < 0:
@@ -179,6 +162,7 @@ class InventoryManagement(QWidget):
         query = "UPDATE inventory SET stock_quantity = %s WHERE inventory_id = %s"
         cursor.execute(query, (new_quantity, inventory_id))
         conn.commit()
+        db.invalidate_tables("inventory")
         cursor.close()
 
         QMessageBox.information(self, "Success", f"Updated stock of {product_name} to {new_quantity}.")
@@ -191,8 +175,8 @@ class InventoryManagement(QWidget):
             QMessageBox.warning(self, "Error", "Please select a product to delete stock.")
             return
 
-        product_name = self.inventory_table.item(row_idx, 2).text()
-        inventory_id = int(self.inventory_table.item(row_idx, 0).text())
+        product_name = self.inventory_table.value(row_idx, "product_name")
+        inventory_id = self.inventory_table.value(row_idx, "inventory_id")
 
         reply = QMessageBox.question(
             self, "Confirm Deletion",
@@ -206,6 +190,7 @@ class InventoryManagement(QWidget):
             query = "DELETE FROM inventory WHERE inventory_id = %s"
             cursor.execute(query, (inventory_id,))
             conn.commit()
+            db.invalidate_tables("inventory")
             cursor.close()
 
             QMessageBox.information(self, "Deleted", f"Stock for {product_name} deleted successfully.")
@@ -1,10 +1,84 @@
 import sys
+from datetime import timedelta
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QPushButton, QHBoxLayout, 
     QTableWidget, QTableWidgetItem, QMessageBox, QComboBox, QLabel, 
-    QHeaderView, QLineEdit, QDialog 
+    QHeaderView, QLineEdit, QDialog, QCheckBox, QDateEdit, QProgressDialog,
+    QAbstractItemView
 )
-from database import db  
+from PyQt5.QtCore import QDate, Qt
+from database import db, db_async
+from models import ColumnTableView
+
+PAGE_SIZES = [50, 100, 200, 500, 1000]
+
+# Orders locked and updated per statement in a bulk status change
+STATUS_CHUNK_SIZE = 500
+
+ORDERS_FROM = """
+FROM orders o
+JOIN users u ON o.user_id = u.user_id
+JOIN addresses a ON o.shipping_address_id = a.address_id
+"""
+
+# Keyset page: the next `LIMIT` orders after the last order_id of the previous page
+ORDERS_PAGE_QUERY = """
+SELECT o.order_id, u.username, o.total_amount, o.order_date, 
+    CONCAT(a.street, ' ', a.city, ' ', a.country, ' ', a.postal_code) AS shipping_address, 
+    o.delivery_status, o.status_updated_date
+""" + ORDERS_FROM + """
+WHERE o.order_id > %s{filters}
+ORDER BY o.order_id
+LIMIT %s
+"""
+
+# Orders with the same columns as a page row, for patching them in place
+ORDER_ROWS_QUERY = """
+SELECT o.order_id, u.username, o.total_amount, o.order_date, 
+    CONCAT(a.street, ' ', a.city, ' ', a.country, ' ', a.postal_code) AS shipping_address, 
+    o.delivery_status, o.status_updated_date
+""" + ORDERS_FROM + """
+WHERE o.order_id IN ({ids})
+"""
+
+LOCK_STATUS_QUERY = "SELECT order_id, delivery_status FROM orders WHERE order_id IN ({ids}) FOR UPDATE"
+
+UPDATE_STATUS_QUERY = """
+UPDATE orders
+SET delivery_status = %s, status_updated_date = NOW()
+WHERE order_id IN ({ids}) AND delivery_status <> %s
+"""
+
+ORDERS_COUNT_QUERY = "SELECT COUNT(*) AS order_count" + ORDERS_FROM + "WHERE 1=1{filters}"
+
+# InnoDB's row estimate, read from the table statistics instead of counting
+ORDERS_ESTIMATE_QUERY = """
+SELECT TABLE_ROWS AS order_count
+FROM information_schema.TABLES
+WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'orders'
+"""
+
+def transition_orders(cursor, order_ids, new_status, progress=None):
+    """Set `new_status` on `order_ids` in chunks of STATUS_CHUNK_SIZE, in the caller's transaction.
+
+    Each chunk is locked (in order_id order), then changed with one UPDATE; orders
+    already in `new_status` keep their status_updated_date. `progress(done)` is
+    called after each chunk and may return False to stop early. Returns
+    {order_id: previous status, or None if the order does not exist}.
+    """
+    order_ids = sorted(set(order_ids))
+    previous = {}
+    for start in range(0, len(order_ids), STATUS_CHUNK_SIZE):
+        chunk = order_ids[start:start + STATUS_CHUNK_SIZE]
+        ids = ", ".join(["%s"] * len(chunk))
+        cursor.execute(LOCK_STATUS_QUERY.format(ids=ids), chunk)
+        found = dict(cursor.fetchall())
+        previous.update((order_id, found.get(order_id)) for order_id in chunk)
+        cursor.execute(UPDATE_STATUS_QUERY.format(ids=ids), [new_status] + chunk + [new_status])
+        if progress is not None and progress(start + len(chunk)) is False:
+            break
+    return previous
+
 
 class OrderStatusDialog(QDialog):
     """Dialog for selecting a new order status."""
@@ -43,6 +117,10 @@ class OrderManagement(QWidget):
     def __init__(self):
         super().__init__()
         self.selected_order_id = None  
+        self.reselect_order_id = None  # Order to reselect once the table reloads
+        self.filters = ("", [])  # WHERE fragment and params of the last search
+        self.page_bounds = [0]  # order_id each page starts after; the last entry is the current page
+        self.page_last_id = None
         self.initUI()
 
     def initUI(self):
@@ -69,27 +147,40 @@ class OrderManagement(QWidget):
         self.search_status.setFixedHeight(40)
         self.search_status.setFixedWidth(200)  
 
+        self.search_dates = QCheckBox("Order Date")
+        self.search_date_from = QDateEdit(QDate.currentDate().addMonths(-1))
+        self.search_date_to = QDateEdit(QDate.currentDate())
+        for date_edit in [self.search_date_from, self.search_date_to]:
+            date_edit.setCalendarPopup(True)
+            date_edit.setDisplayFormat("yyyy-MM-dd")
+            date_edit.setFixedHeight(35)
+
         self.search_button = QPushButton("Search")
         self.search_button.setFixedHeight(35)
         self.search_button.setFixedWidth(100)  
-        self.search_button.clicked.connect(self.load_orders)
+        self.search_button.clicked.connect(self.search_orders)
 
         self.reset_button = QPushButton("Reset")
         self.reset_button.setFixedHeight(35)
         self.reset_button.setFixedWidth(100)
         self.reset_button.clicked.connect(self.reset_filters)
 
-        for widget in [self.search_order_id, self.search_user, self.search_status, self.search_button, self.reset_button]:
+        for widget in [self.search_order_id, self.search_user, self.search_status, self.search_dates,
+                       self.search_date_from, self.search_date_to, self.search_button, self.reset_button]:
             search_layout.addWidget(widget)
 
         main_layout.addLayout(search_layout)
 
         # Order Table
-        self.orders_table = QTableWidget()
-        self.orders_table.setColumnCount(7)
-        self.orders_table.setHorizontalHeaderLabels(["Order ID", "Username", "Total Amount", "Order Date", "Shipping Address", "Delivery Status", "Status Update Date"])
-        self.orders_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.orders_table.cellClicked.connect(self.load_order_items)
+        self.orders_table = ColumnTableView([
+            ("order_id", "Order ID"), ("username", "Username"), ("total_amount", "Total Amount"),
+            ("order_date", "Order Date"), ("shipping_address", "Shipping Address"),
+            ("delivery_status", "Delivery Status"), ("status_updated_date", "Status Update Date"),
+        ], formatters={"total_amount": lambda amount: f"${amount:.2f}"})
+        self.orders_table.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        # Follows clicks and arrow keys alike
+        self.orders_table.selectionModel().currentRowChanged.connect(
+            lambda current, _: self.load_order_items(current.row()))
 
         header = self.orders_table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.Stretch)
@@ -99,6 +190,30 @@ class OrderManagement(QWidget):
 
         main_layout.addWidget(self.orders_table)
 
+        # Page Navigation
+        page_layout = QHBoxLayout()
+        self.previous_page_button = QPushButton("Previous")
+        self.next_page_button = QPushButton("Next")
+        self.page_label = QLabel()
+        self.count_label = QLabel()
+        self.page_size_combo = QComboBox()
+        self.page_size_combo.addItems([str(size) for size in PAGE_SIZES])
+        self.page_size_combo.setCurrentText("100")
+
+        self.previous_page_button.clicked.connect(self.previous_page)
+        self.next_page_button.clicked.connect(self.next_page)
+        self.page_size_combo.currentTextChanged.connect(lambda _: self.load_orders())
+
+        page_layout.addWidget(self.previous_page_button)
+        page_layout.addWidget(self.page_label)
+        page_layout.addWidget(self.next_page_button)
+        page_layout.addStretch()
+        page_layout.addWidget(self.count_label)
+        page_layout.addWidget(QLabel("Rows per page:"))
+        page_layout.addWidget(self.page_size_combo)
+
+        main_layout.addLayout(page_layout)
+
         # Order Items Table
         self.order_items_table = QTableWidget()
         self.order_items_table.setColumnCount(6)
@@ -130,82 +245,146 @@ class OrderManagement(QWidget):
 
         self.update_status_button.clicked.connect(self.update_order_status)
 
-        self.load_orders()
+        self.search_orders()
 
     def reset_filters(self):
         """Reset search fields and reload orders."""
         self.search_order_id.clear()  
         self.search_user.clear()  
         self.search_status.setCurrentIndex(0)  
-        self.load_orders()  
-        
-    def load_orders(self):
-        """Load orders from database into the table with search filters."""
-        conn = db.get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-
-        query = """
-        SELECT o.order_id, u.username, o.total_amount, o.order_date, 
-            CONCAT(a.street, ' ', a.city, ' ', a.country, ' ', a.postal_code) AS shipping_address, 
-            o.delivery_status, o.status_updated_date
-        FROM orders o
-        JOIN users u ON o.user_id = u.user_id
-        JOIN addresses a ON o.shipping_address_id = a.address_id
-        WHERE (%s IS NULL OR o.order_id LIKE %s)
-        AND (%s IS NULL OR u.username LIKE %s)
-        AND (%s = 'All' OR o.delivery_status = %s)
-        ORDER BY o.order_id;
+        self.search_dates.setChecked(False)
+        self.search_orders()  
+
+    def build_filters(self):
+        """Return the WHERE fragment and params for the search fields, or None if they are invalid.
+
+        An order ID is matched exactly (primary key lookup) and the date range is a
+        half-open range on o.order_date so idx_orders_order_date can be used.
         """
-        
-        cursor.execute(query, (
-            self.search_order_id.text() or None, f"%{self.search_order_id.text()}%",
-            self.search_user.text() or None, f"%{self.search_user.text()}%",
-            self.search_status.currentText(), self.search_status.currentText()
-        ))
+        clauses = []
+        params = []
+
+        order_id_text = self.search_order_id.text().strip()
+        if order_id_text:
+            if not order_id_text.isdigit():
+                QMessageBox.warning(self, "Error", "Order ID must be a number.")
+                return None
+            clauses.append("o.order_id = %s")
+            params.append(int(order_id_text))
+
+        username = self.search_user.text().strip()
+        if username:
+            clauses.append("u.username LIKE %s")
+            params.append(f"%{username}%")
+
+        status = self.search_status.currentText()
+        if status != "All":
+            clauses.append("o.delivery_status = %s")
+            params.append(status)
+
+        if self.search_dates.isChecked():
+            start = self.search_date_from.date().toPyDate()
+            end = self.search_date_to.date().toPyDate() + timedelta(days=1)
+            clauses.append("o.order_date >= %s AND o.order_date < %s")
+            params.extend([start, end])
+
+        return "".join(f" AND {clause}" for clause in clauses), params
+
+    def search_orders(self):
+        """Apply the search fields: show the first page and count the matches separately."""
+        filters = self.build_filters()
+        if filters is None:
+            return
+        self.filters = filters
+        self.page_bounds = [0]
+        self.load_orders()
+        self.count_orders()
 
-        rows = cursor.fetchall()
-        self.orders_table.setRowCount(len(rows))
+    def page_size(self):
+        return int(self.page_size_combo.currentText())
 
-        for row_idx, row in enumerate(rows):
-            self.orders_table.setItem(row_idx, 0, QTableWidgetItem(str(row["order_id"])))
-            self.orders_table.setItem(row_idx, 1, QTableWidgetItem(row["username"]))
-            self.orders_table.setItem(row_idx, 2, QTableWidgetItem(f"${row['total_amount']:.2f}"))
-            self.orders_table.setItem(row_idx, 3, QTableWidgetItem(str(row["order_date"])))  
-            self.orders_table.setItem(row_idx, 4, QTableWidgetItem(row["shipping_address"]))  
-            self.orders_table.setItem(row_idx, 5, QTableWidgetItem(row["delivery_status"]))
-            self.orders_table.setItem(row_idx, 6, QTableWidgetItem(str(row["status_updated_date"])))
+    def load_orders(self):
+        """Load the current page of orders in the background."""
+        where, params = self.filters
+        query = ORDERS_PAGE_QUERY.format(filters=where)
+        # One extra row tells whether there is a next page
+        params = [self.page_bounds[-1]] + params + [self.page_size() + 1]
+        db_async.submit(query, params, on_result=self.populate_orders, key=(self, "orders"), fetch=db.fetch_columns)
+
+    def count_orders(self):
+        """Count the matching orders without holding up the first page.
 
-        cursor.close()
+        Without filters the table statistics' estimate is shown instead of a full count.
+        """
+        where, params = self.filters
+        self.count_label.setText("Counting...")
+        if where:
+            query = ORDERS_COUNT_QUERY.format(filters=where)
+            on_result = lambda rows: self.show_order_count(rows, exact=True)
+        else:
+            query, params = ORDERS_ESTIMATE_QUERY, None
+            on_result = lambda rows: self.show_order_count(rows, exact=False)
+        db_async.submit(query, params, on_result=on_result, key=(self, "order_count"))
+
+    def show_order_count(self, rows, exact):
+        count = rows[0]["order_count"] if rows else None
+        if count is None:
+            self.count_label.setText("")
+        else:
+            self.count_label.setText(f"{count:,} orders" if exact else f"About {count:,} orders")
+
+    def next_page(self):
+        if self.page_last_id is not None:
+            self.page_bounds.append(self.page_last_id)
+            self.load_orders()
+
+    def previous_page(self):
+        if len(self.page_bounds) > 1:
+            self.page_bounds.pop()
+            self.load_orders()
+
+    def populate_orders(self, data):
+        """Show a page of orders (a ColumnarResult) and restore a pending selection."""
+        page_size = self.page_size()
+        has_next = data.row_count > page_size
+        if has_next:
+            data = data.take(slice(0, page_size))
+        self.orders_table.set_result(data)
+
+        self.page_last_id = int(data["order_id"][-1]) if data else None
+        if data:
+            # Load the whole page's line items in one query so moving between orders is instant
+            db_async.run(db.order_items.fetch, data["order_id"].tolist(), key=(self, "order_items_prefetch"))
+        self.previous_page_button.setEnabled(len(self.page_bounds) > 1)
+        self.next_page_button.setEnabled(has_next)
+        self.page_label.setText(f"Page {len(self.page_bounds)}")
+
+        if self.reselect_order_id is not None:
+            order_id = self.reselect_order_id
+            self.reselect_order_id = None
+            row_idx = self.orders_table.select_value("order_id", order_id)
+            if row_idx >= 0:
+                self.load_order_items(row_idx)
 
     def load_order_items(self, row):
         """Load items for the selected order."""
-        order_id_item = self.orders_table.item(row, 0)
-        if order_id_item is None:
-            print(f"Warning: No order_id found at row {row}")
-            return
-
-        order_id_text = order_id_item.text()
-        if not order_id_text:
-            print(f"Warning: Order ID is empty at row {row}")
-            return
+        if row < 0:
+            return  # Selection cleared, e.g. by a page reload
 
-        self.selected_order_id = int(order_id_text)
+        self.selected_order_id = self.orders_table.value(row, "order_id")
             
         self.update_status_button.setEnabled(True)
 
-        conn = db.get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-
-        query = """
-        SELECT oi.order_item_id, oi.order_id, p.product_name, oi.quantity, oi.unit_price, (oi.quantity * oi.unit_price) AS subtotal
-        FROM order_items oi
-        JOIN products p ON oi.product_id = p.product_id
-        WHERE oi.order_id = %s
-        ORDER BY oi.order_item_id;
-        """
-        cursor.execute(query, (self.selected_order_id,))
-        rows = cursor.fetchall()
+        items = db.order_items.get(self.selected_order_id)
+        if items is not None:
+            db_async.cancel((self, "order_items"))
+            self.populate_order_items(items)
+        else:
+            db_async.run(db.order_items.items, self.selected_order_id,
+                         on_result=self.populate_order_items, key=(self, "order_items"))
 
+    def populate_order_items(self, rows):
+        """Fill the order items table with query results."""
         self.order_items_table.setRowCount(len(rows))
 
         for row_idx, row in enumerate(rows):
@@ -216,50 +395,103 @@ class OrderManagement(QWidget):
             self.order_items_table.setItem(row_idx, 4, QTableWidgetItem(f"${row['unit_price']:.2f}"))
             self.order_items_table.setItem(row_idx, 5, QTableWidgetItem(f"${row['subtotal']:.2f}"))
 
-        cursor.close()
-
     def update_order_status(self):
-        """Update the status of the selected order."""
-        if not self.selected_order_id:
+        """Update the status of the selected order(s) in one transaction."""
+        rows = self.orders_table.selected_rows()
+        if not rows:
             QMessageBox.warning(self, "Error", "Please select an order to update.")
             return
+        order_ids = [self.orders_table.value(row, "order_id") for row in rows]
 
-        current_status = self.orders_table.item(self.orders_table.currentRow(), 5).text()
-        print(f"Updating status for Order ID: {self.selected_order_id}, Current Status: {current_status}")
+        current_status = self.orders_table.value(rows[0], "delivery_status")
+        print(f"Updating status for {len(order_ids)} order(s), Current Status: {current_status}")
 
         dialog = OrderStatusDialog(current_status, self)
         
         if dialog.exec_() == QDialog.Accepted:
             new_status = dialog.get_selected_status()
-            print(f"New Status Selected: {new_status} for Order ID {self.selected_order_id}")
+            print(f"New Status Selected: {new_status} for {len(order_ids)} order(s)")
+
+            progress = QProgressDialog(f"Updating {len(order_ids)} order(s)...", "Cancel", 0, len(order_ids), self)
+            progress.setWindowModality(Qt.WindowModal)
+            progress.setMinimumDuration(0)
+
+            def report_progress(done):
+                progress.setValue(done)
+                return not progress.wasCanceled()
 
             conn = db.get_db_connection()
             cursor = conn.cursor()
 
             try:
-                cursor.execute("UPDATE orders SET delivery_status = %s WHERE order_id = %s", (new_status, self.selected_order_id))
+                conn.start_transaction()
+                previous = transition_orders(cursor, order_ids, new_status, report_progress)
+                if progress.wasCanceled():
+                    conn.rollback()
+                    QMessageBox.information(self, "Canceled", "No orders were changed.")
+                    return
                 conn.commit()
-                
-                QMessageBox.information(self, "Success", f"Order {self.selected_order_id} status updated to {new_status}.")
+                db.invalidate_tables("orders")
+                progress.setValue(len(order_ids))
 
-                last_selected_order_id = self.selected_order_id
-                self.load_orders()
-
-                selected_row = None
-                for row_idx in range(self.orders_table.rowCount()):
-                    if int(self.orders_table.item(row_idx, 0).text()) == last_selected_order_id:
-                        self.orders_table.selectRow(row_idx)
-                        selected_row = row_idx
-                        break
-
-                if selected_row is not None:
-                    self.load_order_items(selected_row)
+                self.show_status_report(previous, new_status)
+                self.refresh_orders(order_ids, new_status)
          
             except Exception as e:
+                conn.rollback()
                 QMessageBox.critical(self, "Database Error", f"Failed to update order status: {e}")
             
             finally:
                 cursor.close()
+                progress.close()
+
+    def show_status_report(self, previous, new_status):
+        """Summarize a status change, with one line per order in the details."""
+        lines = []
+        updated = 0
+        for order_id, old_status in previous.items():
+            if old_status is None:
+                lines.append(f"Order {order_id}: not found")
+            elif old_status == new_status:
+                lines.append(f"Order {order_id}: already {new_status}")
+            else:
+                lines.append(f"Order {order_id}: {old_status} -> {new_status}")
+                updated += 1
+
+        if len(previous) == 1:
+            QMessageBox.information(self, "Success", lines[0])
+            return
+        report = QMessageBox(QMessageBox.Information, "Success",
+                             f"{updated} of {len(previous)} orders updated to {new_status}.", parent=self)
+        report.setDetailedText("\n".join(lines))
+        report.exec_()
+
+    def refresh_orders(self, order_ids, new_status):
+        """Re-fetch just the updated orders and patch their rows, keeping the selection.
+
+        If the status filter no longer matches them, the page is reloaded (and
+        recounted) instead, since the orders have to drop out of it.
+        """
+        status_filter = self.search_status.currentText()
+        if status_filter != "All" and status_filter != new_status:
+            self.reselect_order_id = self.selected_order_id
+            self.load_orders()
+            self.count_orders()
+            return
+        query = ORDER_ROWS_QUERY.format(ids=", ".join(["%s"] * len(order_ids)))
+        db_async.submit(query, order_ids, on_result=lambda rows: self.patch_orders(order_ids, rows),
+                        key=(self, "order_rows"))
+
+    def patch_orders(self, order_ids, rows):
+        """Write the re-fetched orders into their rows; reload the page if any cannot be patched."""
+        patched = 0
+        for row in rows:
+            if self.orders_table.update_row("order_id", row["order_id"], row):
+                patched += 1
+        if patched < len(order_ids):
+            # The order is reselected once the reloaded table arrives
+            self.reselect_order_id = self.selected_order_id
+            self.load_orders()
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
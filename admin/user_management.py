@@ -1,10 +1,73 @@
 import sys
+import numpy as np
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-    QTableWidget, QTableWidgetItem, QMessageBox, QLineEdit, 
-    QComboBox, QHeaderView, QDialog, QLabel
+    QMessageBox, QLineEdit, QComboBox, QHeaderView, QDialog, QLabel
 )
-from database import db  
+from PyQt5.QtCore import QTimer
+from config import SEARCH_DEBOUNCE_MS, USER_INDEX_MAX_ROWS, DEBUG_LOGGING
+from database import db, db_async
+from models import ColumnTableView, PrefixIndex, tokenize
+
+# Columns matched by the search box (and covered by the ft_users_search FULLTEXT index)
+SEARCH_KEYS = ["username", "email", "first_name", "last_name", "phone_number"]
+
+USER_COLUMNS = """
+SELECT user_id, username, password, email, first_name, last_name, phone_number, role, created_at
+FROM users
+"""
+
+USERS_QUERY = USER_COLUMNS + "ORDER BY user_id"
+
+USER_ROW_QUERY = USER_COLUMNS + "WHERE user_id = %s"
+
+# Server-side search, used when the user list is too large to index in memory
+USERS_SEARCH_QUERY = USER_COLUMNS + """
+WHERE 1=1{filters}
+ORDER BY user_id
+LIMIT %s
+"""
+
+# Rows shown for a server-side search
+USER_SEARCH_LIMIT = 1000
+
+# Words shorter than InnoDB's default innodb_ft_min_token_size are not in the FULLTEXT
+# index; they are matched as a username prefix instead (a range scan on its unique key)
+FULLTEXT_MIN_WORD = 3
+
+USERS_ESTIMATE_QUERY = """
+SELECT TABLE_ROWS AS user_count
+FROM information_schema.TABLES
+WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'users'
+"""
+
+def fetch_users(max_rows):
+    """Return every user as a ColumnarResult, or None if the table holds more than `max_rows`.
+
+    The row count is InnoDB's estimate, so this is cheap even for a huge table.
+    """
+    estimate = db.execute_query(USERS_ESTIMATE_QUERY)
+    if estimate and (estimate[0]["user_count"] or 0) > max_rows:
+        return None
+    return db.fetch_columns(USERS_QUERY)
+
+def search_filters(text, role):
+    """Build the WHERE additions and params of USERS_SEARCH_QUERY for a search."""
+    where = ""
+    params = []
+    words = tokenize(text)
+    long_words = [word for word in words if len(word) >= FULLTEXT_MIN_WORD]
+    if long_words:
+        where += f" AND MATCH({', '.join(SEARCH_KEYS)}) AGAINST (%s IN BOOLEAN MODE)"
+        params.append(" ".join(f"+{word}*" for word in long_words))
+    for word in words:
+        if len(word) < FULLTEXT_MIN_WORD:
+            where += " AND username LIKE %s"
+            params.append(f"{word}%")
+    if role != "All Roles":
+        where += " AND role = %s"
+        params.append(role)
+    return where, params
 
 class AdminPromotionDialog(QDialog):
     def __init__(self, parent=None):
@@ -50,6 +113,9 @@ class AdminPromotionDialog(QDialog):
 class UserManagement(QWidget):
     def __init__(self):
         super().__init__()
+        self.user_index = None  # PrefixIndex over the loaded user list, once built
+        self.server_search = False  # True when the user list is too large to load
+        self.role_rows = {}  # role -> boolean mask over the loaded user list
         self.initUI()
 
     def initUI(self):
@@ -76,31 +142,25 @@ class UserManagement(QWidget):
 
         main_layout.addLayout(filter_layout)
 
+        self.status_label = QLabel("")
+        main_layout.addWidget(self.status_label)
+
+        # Search as you type, once typing pauses
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+
         # User Table (Row selection, no "Select" column)
-        # 0: user_id
-        # 1: username
-        # 2: password
-        # 3: email
-        # 4: first_name
-        # 5: last_name
-        # 6: phone_number
-        # 7: role
-        # 8: created_at
-        self.user_table = QTableWidget()
-        self.user_table.setColumnCount(9)
-        self.user_table.setHorizontalHeaderLabels([
-            "User ID", "Username", "Password", "Email", 
-            "First Name", "Last Name", "Phone Number", "Role", "Created At"
-        ])
+        self.user_table = ColumnTableView([
+            ("user_id", "User ID"), ("username", "Username"), ("password", "Password"),
+            ("email", "Email"), ("first_name", "First Name"), ("last_name", "Last Name"),
+            ("phone_number", "Phone Number"), ("role", "Role"), ("created_at", "Created At"),
+        ], formatters={"password": lambda password: "*" * len(password or "")})
 
         header = self.user_table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.Stretch)
         self.user_table.setFixedHeight(700)
 
-        # Enable row selection
-        self.user_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.user_table.setSelectionMode(QTableWidget.SingleSelection)
-
         self.load_users()
         main_layout.addWidget(self.user_table)
 
@@ -115,100 +175,106 @@ class UserManagement(QWidget):
         self.setLayout(main_layout)
 
         # Button Actions
+        self.search_input.textChanged.connect(self.search_timer.start)
+        self.search_input.returnPressed.connect(self.search_users)
+        self.search_timer.timeout.connect(self.search_users)
+        self.role_filter.currentIndexChanged.connect(self.search_users)
         self.search_button.clicked.connect(self.search_users)
         self.reset_button.clicked.connect(self.reset_filters)
         self.promote_button.clicked.connect(self.promote_user_to_admin)
 
-    def load_users(self, filters=None):
-        """Load users into the table using the new query, applying filters if provided."""
-        conn = db.get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-
-        query = """
-        SELECT 
-            user_id, 
-            username, 
-            password, 
-            email, 
-            first_name, 
-            last_name, 
-            phone_number, 
-            role, 
-            created_at
-        FROM users
-        WHERE 1=1
-        """
-        params = []
-
-        if filters:
-            if filters.get("search"):
-                query += """ 
-                AND (
-                    username LIKE %s 
-                    OR email LIKE %s 
-                    OR first_name LIKE %s 
-                    OR last_name LIKE %s 
-                    OR phone_number LIKE %s
-                )
-                """
-                search_term = f"%{filters['search']}%"
-                params.extend([search_term]*5)
-
-            if filters.get("role") and filters["role"] != "All Roles":
-                query += " AND role = %s"
-                params.append(filters["role"])
-
-        query += " ORDER BY user_id"
-        cursor.execute(query, params)
-        users = cursor.fetchall()
-
-        self.user_table.setRowCount(len(users))
-
-        for row_idx, user in enumerate(users):
-            # Column 0: user_id
-            self.user_table.setItem(row_idx, 0, QTableWidgetItem(str(user["user_id"])))
-            # Column 1: username
-            self.user_table.setItem(row_idx, 1, QTableWidgetItem(user["username"]))
-            # Column 2: password 
-            pw = user["password"] or ""
-            display_pw = "*" * len(pw)
-            self.user_table.setItem(row_idx, 2, QTableWidgetItem(display_pw))
-            # Column 3: email
-            self.user_table.setItem(row_idx, 3, QTableWidgetItem(user["email"]))
-            # Column 4: first_name
-            self.user_table.setItem(row_idx, 4, QTableWidgetItem(user["first_name"]))
-            # Column 5: last_name
-            self.user_table.setItem(row_idx, 5, QTableWidgetItem(user["last_name"]))
-            # Column 6: phone_number
-            self.user_table.setItem(row_idx, 6, QTableWidgetItem(user["phone_number"]))
-            # Column 7: role
-            self.user_table.setItem(row_idx, 7, QTableWidgetItem(user["role"]))
-            # Column 8: created_at
-            self.user_table.setItem(row_idx, 8, QTableWidgetItem(str(user["created_at"])))
-
-        cursor.close()
+    def load_users(self):
+        """Load the whole user list in the background; search then runs on an in-memory index."""
+        self.user_index = None
+        self.role_rows = {}
+        db_async.cancel((self, "user_index"))
+        self.status_label.setText("Loading users...")
+        db_async.run(fetch_users, USER_INDEX_MAX_ROWS, on_result=self.populate_users, key=(self, "users"))
+
+    def populate_users(self, users):
+        """Show the user list (a ColumnarResult) and index it, or switch to server-side search."""
+        if users is None:
+            if DEBUG_LOGGING:
+                print(f"[DEBUG] More than {USER_INDEX_MAX_ROWS} users, searching on the server")
+            self.server_search = True
+            self.search_users()
+            return
+        self.server_search = False
+        self.user_table.set_result(users)
+        self.status_label.setText(f"{users.row_count:,} users (indexing for search...)")
+        db_async.run(PrefixIndex, users, SEARCH_KEYS, on_result=self.set_user_index, key=(self, "user_index"))
+
+    def set_user_index(self, index):
+        self.user_index = index
+        self.search_users()
 
     def search_users(self):
         """Filter users based on search input and role selection."""
-        filters = {
-            "search": self.search_input.text().strip(),
-            "role": self.role_filter.currentText()
-        }
-        self.load_users(filters)
+        self.search_timer.stop()
+        text = self.search_input.text().strip()
+        role = self.role_filter.currentText()
+        if self.server_search:
+            filters, params = search_filters(text, role)
+            query = USERS_SEARCH_QUERY.format(filters=filters)
+            db_async.submit(query, params + [USER_SEARCH_LIMIT], on_result=self.populate_search_results,
+                            key=(self, "user_search"), fetch=db.fetch_columns)
+        elif self.user_index is not None:
+            self.filter_loaded_users(text, role)
+
+    def filter_loaded_users(self, text, role):
+        """Show the loaded users matching the search, without touching the database."""
+        rows = self.user_index.search(text)
+        if role != "All Roles":
+            if role not in self.role_rows:
+                self.role_rows[role] = self.user_table.source_model.result["role"] == role
+            role_mask = self.role_rows[role]
+            rows = np.flatnonzero(role_mask) if rows is None else rows[role_mask[rows]]
+        self.user_table.set_row_filter(rows)
+        self.status_label.setText(f"{self.user_table.source_model.total_rows():,} users")
+
+    def populate_search_results(self, users):
+        self.user_table.set_result(users)
+        if users.row_count >= USER_SEARCH_LIMIT:
+            self.status_label.setText(f"First {USER_SEARCH_LIMIT:,} matching users")
+        else:
+            self.status_label.setText(f"{users.row_count:,} matching users")
 
     def reset_filters(self):
-        """Reset filters and reload all users."""
+        """Clear the search and role filter."""
+        self.search_input.blockSignals(True)
         self.search_input.clear()
+        self.search_input.blockSignals(False)
+        self.role_filter.blockSignals(True)
         self.role_filter.setCurrentIndex(0)
-        self.load_users()
+        self.role_filter.blockSignals(False)
+        self.search_users()
+
+    def refresh_user(self, user_id):
+        """Re-fetch one user after a change and patch their row instead of reloading the list."""
+        db_async.submit(USER_ROW_QUERY, (user_id,), on_result=self.patch_user, key=(self, "user_row"))
+
+    def patch_user(self, rows):
+        if not rows:
+            return
+        user = rows[0]
+        result_row = self.user_table.result_row("user_id", user["user_id"])
+        if result_row is None:
+            return
+        result = self.user_table.source_model.result
+        if self.user_index is not None and any(result[key][result_row] != user[key] for key in SEARCH_KEYS):
+            self.user_index.update(result_row, [user[key] for key in SEARCH_KEYS])
+        self.user_table.update_row("user_id", user["user_id"], user)
+        self.role_rows = {}
+        if self.role_filter.currentText() != "All Roles" and not self.server_search:
+            # The user may have left (or joined) the role shown
+            self.search_users()
 
     def get_selected_user_id(self):
         """Get the user_id of the selected row using row selection."""
-        row_idx = self.user_table.currentRow()
+        row_idx = self.user_table.current_row()
         if row_idx < 0:
             return None
-        # user_id is in column 0
-        return int(self.user_table.item(row_idx, 0).text())
+        return self.user_table.value(row_idx, "user_id")
 
     def promote_user_to_admin(self):
         """Promote the selected user to admin role."""
@@ -229,13 +295,14 @@ class UserManagement(QWidget):
                 query = "CALL promote_user_to_admin(%s, %s, %s)"
                 cursor.execute(query, (user_id, admin_level, department))
                 conn.commit()
+                db.invalidate_tables("users", "admins")
 
                 QMessageBox.information(
                     self, 
                     "Success", 
                     f"User has been promoted to Admin ({admin_level}, {department})."
                 )
-                self.load_users()
+                self.refresh_user(user_id)
 
             except Exception as e:
                 QMessageBox.critical(self, "Database Error", f"Failed to promote user: {e}")
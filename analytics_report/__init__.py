@@ -1,8 +1,14 @@
-from .stock_analysis import StockAnalysis
-from .sales_performance import SalesPerformance
-from .product_insights import ProductInsights
-from .customer_orders import CustomerOrders
-from .market_trends import MarketTrends
+# The analytics pages depend on matplotlib, seaborn, pandas and NumPy. Their modules
+# are imported on first attribute access so importing this package stays cheap.
+import importlib
+
+_PAGE_MODULES = {
+    "StockAnalysis": ".stock_analysis",
+    "SalesPerformance": ".sales_performance",
+    "ProductInsights": ".product_insights",
+    "CustomerOrders": ".customer_orders",
+    "MarketTrends": ".market_trends",
+}
 
 __all__ = [
     "StockAnalysis",
@@ -11,3 +17,15 @@ __all__ = [
     "CustomerOrders",
     "MarketTrends"
 ]
+
+
+def __getattr__(name):
+    if name not in _PAGE_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    page = getattr(importlib.import_module(_PAGE_MODULES[name], __name__), name)
+    globals()[name] = page  # Later lookups skip __getattr__
+    return page
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
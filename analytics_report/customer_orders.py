@@ -7,10 +7,12 @@ from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QPushButton, QHBoxLayout,
     QStackedWidget, QTableWidget, QTableWidgetItem, QHeaderView
 )
-from database import db
+from database.rollups import fetch_rollup
+from .lazy_tabs import LazyTabsMixin
+from .sales_cube import cube_view
 
 
-class CustomerOrders(QWidget):
+class CustomerOrders(LazyTabsMixin, QWidget):
     def __init__(self):
         super().__init__()
         self.initUI()
@@ -45,6 +47,14 @@ class CustomerOrders(QWidget):
             button.clicked.connect(lambda _, index=i: self.switch_content(index))
             button_layout.addWidget(button)
 
+        # Each tab runs its query the first time it is shown
+        refreshed_label = self.init_lazy_tabs([
+            ("quarterly_moving_avg", self.load_quarterly_moving_avg),
+            ("sales_difference", self.load_sales_difference),
+            ("sales_distribution", self.load_sales_distribution),
+            ("top_customers", self.load_top_customers),
+        ])
+
         # Content Area (QStackedWidget)
         self.stacked_widget = QStackedWidget()
         self.moving_avg_page = self.create_moving_avg_page()
@@ -66,22 +76,13 @@ class CustomerOrders(QWidget):
 
         # Add Components to Layout
         main_layout.addLayout(button_layout)
+        main_layout.addWidget(refreshed_label)
         main_layout.addWidget(content_wrapper)
         self.setLayout(main_layout)
 
-        # Load all data on login
-        self.load_all_data()
-
         # Set Default View
         self.switch_content(0)  # Default to Moving Avg Analysis
 
-    def load_all_data(self):
-        """Load data for all sections."""
-        self.load_quarterly_moving_avg()
-        self.load_sales_difference()
-        self.load_sales_distribution()
-        self.load_top_customers()
-
     # ─────────────────── TAB 1. Quarterly Moving Average Analysis of Orders ───────────────────
     def create_moving_avg_page(self):
         """Create UI section for quarterly moving average analysis."""
@@ -101,41 +102,47 @@ class CustomerOrders(QWidget):
         """Load and display quarterly moving average of orders and update graph."""
         query = """
         SELECT 
-            YEAR(order_date) AS order_year,
-            QUARTER(order_date) AS order_quarter,
-            SUM(total_amount) AS total_amount,  
+            YEAR(sales_date) AS order_year,
+            QUARTER(sales_date) AS order_quarter,
+            SUM(order_amount) AS total_amount,  
             ROUND(
-                AVG(SUM(total_amount)) OVER (
-                    PARTITION BY YEAR(order_date) 
-                    ORDER BY QUARTER(order_date) 
+                AVG(SUM(order_amount)) OVER (
+                    PARTITION BY YEAR(sales_date) 
+                    ORDER BY QUARTER(sales_date) 
                     ROWS BETWEEN 1 PRECEDING AND 1 FOLLOWING
                 ), 2
             ) AS moving_avg_amount
-        FROM orders
+        FROM sales_daily_customer
         GROUP BY order_year, order_quarter
         ORDER BY order_year, order_quarter;
         """
-        data = db.execute_query(query)
+        self.submit_tab_query("quarterly_moving_avg", query, self.populate_quarterly_moving_avg, fetch=fetch_rollup)
 
+    def populate_quarterly_moving_avg(self, data):
+        """Display quarterly moving avg query results."""
         if data:
-            self.moving_avg_table.setRowCount(len(data))
+            order_years = data.text("order_year")
+            order_quarters = data.text("order_quarter")
+            moving_avg_amounts = data.text("moving_avg_amount")
+
+            self.moving_avg_table.setRowCount(data.row_count)
             self.moving_avg_table.setColumnCount(3)  
             self.moving_avg_table.setHorizontalHeaderLabels(
                 ["Year", "Quarter", "Moving Avg Amount"]
             )
 
-            for row_idx, row in enumerate(data):
-                self.moving_avg_table.setItem(row_idx, 0, QTableWidgetItem(str(row["order_year"])))
-                self.moving_avg_table.setItem(row_idx, 1, QTableWidgetItem(str(row["order_quarter"])))
-                self.moving_avg_table.setItem(row_idx, 2, QTableWidgetItem(str(row["moving_avg_amount"])))
+            for row_idx in range(data.row_count):
+                self.moving_avg_table.setItem(row_idx, 0, QTableWidgetItem(order_years[row_idx]))
+                self.moving_avg_table.setItem(row_idx, 1, QTableWidgetItem(order_quarters[row_idx]))
+                self.moving_avg_table.setItem(row_idx, 2, QTableWidgetItem(moving_avg_amounts[row_idx]))
 
             self.moving_avg_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
             self.plot_moving_avg(data)
 
     def plot_moving_avg(self, data):
         """Plot the quarterly moving average of order amounts inside the UI."""
-        quarters = [f"{row['order_year']} Q{row['order_quarter']}" for row in data]
-        moving_avg = [row["moving_avg_amount"] for row in data]
+        quarters = [f"{year} Q{quarter}" for year, quarter in zip(data.text("order_year"), data.text("order_quarter"))]
+        moving_avg = data["moving_avg_amount"]
 
         self.moving_avg_plot.figure.clear()
         ax = self.moving_avg_plot.figure.add_subplot(111)
@@ -171,11 +178,11 @@ class CustomerOrders(QWidget):
         query = """
         WITH DailySales AS (
             SELECT 
-                DATE(o.order_date) AS order_date,
-                SUM(oi.total_price) AS current_sales  
-            FROM order_items oi
-            JOIN orders o ON oi.order_id = o.order_id
-            GROUP BY DATE(o.order_date)  
+                sales_date AS order_date,
+                SUM(total_sales) AS current_sales  
+            FROM sales_daily_customer
+            GROUP BY sales_date
+            HAVING SUM(line_count) > 0
         )
         SELECT 
             order_date,
@@ -185,20 +192,27 @@ class CustomerOrders(QWidget):
         FROM DailySales
         ORDER BY order_date;
         """
-        data = db.execute_query(query)
+        self.submit_tab_query("sales_difference", query, self.populate_sales_difference, fetch=fetch_rollup)
 
+    def populate_sales_difference(self, data):
+        """Display sales difference query results."""
         if data:
-            self.sales_diff_table.setRowCount(len(data))
+            order_dates = data.text("order_date")
+            current_sales = data.text("current_sales")
+            previous_sales = data.text("previous_sales")
+            sales_differences = data.text("sales_difference")
+
+            self.sales_diff_table.setRowCount(data.row_count)
             self.sales_diff_table.setColumnCount(4)
             self.sales_diff_table.setHorizontalHeaderLabels(
                 ["Order Date", "Current Sales", "Previous Sales", "Sales Difference"]
             )
 
-            for row_idx, row in enumerate(data):
-                self.sales_diff_table.setItem(row_idx, 0, QTableWidgetItem(str(row["order_date"])))
-                self.sales_diff_table.setItem(row_idx, 1, QTableWidgetItem(str(row["current_sales"])))
-                self.sales_diff_table.setItem(row_idx, 2, QTableWidgetItem(str(row["previous_sales"])))
-                self.sales_diff_table.setItem(row_idx, 3, QTableWidgetItem(str(row["sales_difference"])))
+            for row_idx in range(data.row_count):
+                self.sales_diff_table.setItem(row_idx, 0, QTableWidgetItem(order_dates[row_idx]))
+                self.sales_diff_table.setItem(row_idx, 1, QTableWidgetItem(current_sales[row_idx]))
+                self.sales_diff_table.setItem(row_idx, 2, QTableWidgetItem(previous_sales[row_idx]))
+                self.sales_diff_table.setItem(row_idx, 3, QTableWidgetItem(sales_differences[row_idx]))
 
             self.sales_diff_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
 
@@ -206,8 +220,8 @@ class CustomerOrders(QWidget):
 
     def plot_sales_diff(self, data):
         """Plot the sales difference trend over time inside the UI."""
-        dates = [row["order_date"] for row in data]
-        diffs = [row["sales_difference"] for row in data]
+        dates = data["order_date"]
+        diffs = data["sales_difference"]
 
         self.sales_diff_plot.figure.clear()
         ax = self.sales_diff_plot.figure.add_subplot(111)
@@ -240,39 +254,29 @@ class CustomerOrders(QWidget):
         widget = QWidget()
         widget.setLayout(layout)
 
-        self.load_sales_distribution()
         return widget
 
     def load_sales_distribution(self):
         """Load and display product sales distribution and update graph."""
-        query = """
-        WITH ProductSales AS (
-            SELECT p.product_name, SUM(oi.total_price) AS total_sales
-            FROM order_items oi
-            JOIN products p ON oi.product_id = p.product_id
-            GROUP BY p.product_name
-        ),
-        TotalSales AS (
-            SELECT SUM(total_sales) AS overall_sales FROM ProductSales
-        )
-        SELECT ps.product_name, ps.total_sales, ts.overall_sales, ROUND((ps.total_sales * 100.0 / ts.overall_sales), 2) AS sales_percentage
-        FROM ProductSales ps
-        CROSS JOIN TotalSales ts
-        ORDER BY sales_percentage DESC;
-        """
-        data = db.execute_query(query)
+        self.submit_tab_task("sales_distribution", cube_view, self.populate_sales_distribution, "sales_distribution")
 
+    def populate_sales_distribution(self, data):
+        """Display sales distribution query results."""
         if data:
-            self.sales_distribution_table.setRowCount(len(data))
+            product_names = data["product_name"]
+            total_sales = data.text("total_sales")
+            sales_percentages = data.text("sales_percentage")
+
+            self.sales_distribution_table.setRowCount(data.row_count)
             self.sales_distribution_table.setColumnCount(3)
             self.sales_distribution_table.setHorizontalHeaderLabels(
                 ["Product Name", "Total Sales", "Sales Percentage"]
             )
 
-            for row_idx, row in enumerate(data):
-                self.sales_distribution_table.setItem(row_idx, 0, QTableWidgetItem(row["product_name"]))
-                self.sales_distribution_table.setItem(row_idx, 1, QTableWidgetItem(str(row["total_sales"])))
-                self.sales_distribution_table.setItem(row_idx, 2, QTableWidgetItem(f"{row['sales_percentage']}%"))
+            for row_idx in range(data.row_count):
+                self.sales_distribution_table.setItem(row_idx, 0, QTableWidgetItem(product_names[row_idx]))
+                self.sales_distribution_table.setItem(row_idx, 1, QTableWidgetItem(total_sales[row_idx]))
+                self.sales_distribution_table.setItem(row_idx, 2, QTableWidgetItem(f"{sales_percentages[row_idx]}%"))
 
             self.sales_distribution_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
 
@@ -283,8 +287,8 @@ class CustomerOrders(QWidget):
         self.sales_distribution_plot.figure.clear()
         ax = self.sales_distribution_plot.figure.add_subplot(111)
 
-        product_names = [row["product_name"] for row in data]
-        sales_percentages = [row["sales_percentage"] for row in data]
+        product_names = data["product_name"]
+        sales_percentages = data["sales_percentage"]
 
         if chart_type == "pie":
             
@@ -297,8 +301,8 @@ class CustomerOrders(QWidget):
             ax.set_ylabel("Product")
             ax.set_title("Product Sales Distribution (Bar Chart)")
             ax.invert_yaxis()  
-            for i, v in enumerate(sales_percentages):
-                ax.text(v + 1, i, f"{v}%", color="black", va="center", fontsize=9)
+            for i, (v, label) in enumerate(zip(sales_percentages, data.text("sales_percentage"))):
+                ax.text(v + 1, i, f"{label}%", color="black", va="center", fontsize=9)
 
         self.sales_distribution_plot.draw()      
 
@@ -316,7 +320,6 @@ class CustomerOrders(QWidget):
         widget = QWidget()
         widget.setLayout(layout)
 
-        self.load_top_customers()
         return widget
 
     def load_top_customers(self):
@@ -326,31 +329,37 @@ class CustomerOrders(QWidget):
             SELECT 
                 u.username,  
                 CONCAT(u.first_name, ' ', u.last_name) AS customer_name,
-                SUM(oi.total_price) AS total_spent,
-                DENSE_RANK() OVER (ORDER BY SUM(oi.total_price) DESC) AS spending_rank
-            FROM order_items oi
-            JOIN orders o ON oi.order_id = o.order_id
-            JOIN users u ON o.user_id = u.user_id
+                SUM(r.total_sales) AS total_spent,
+                DENSE_RANK() OVER (ORDER BY SUM(r.total_sales) DESC) AS spending_rank
+            FROM sales_daily_customer r
+            JOIN users u ON r.user_id = u.user_id
             WHERE u.role = 'customer'  
             GROUP BY u.username, customer_name
+            HAVING SUM(r.line_count) > 0
         )
         SELECT * FROM CustomerSpending
         WHERE spending_rank <= 10  
         ORDER BY spending_rank;
         """
-        data = db.execute_query(query)
+        self.submit_tab_query("top_customers", query, self.populate_top_customers, fetch=fetch_rollup)
 
+    def populate_top_customers(self, data):
+        """Display top customers query results."""
         if data:
-            self.top_customers_table.setRowCount(len(data))
+            usernames = data["username"]
+            customer_names = data.text("customer_name")
+            total_spent = data.text("total_spent")
+
+            self.top_customers_table.setRowCount(data.row_count)
             self.top_customers_table.setColumnCount(3)
             self.top_customers_table.setHorizontalHeaderLabels(
                 ["Username", "Customer Name", "Total Spent"]
             )
 
-            for row_idx, row in enumerate(data):
-                self.top_customers_table.setItem(row_idx, 0, QTableWidgetItem(row["username"]))
-                self.top_customers_table.setItem(row_idx, 1, QTableWidgetItem(row["customer_name"]))
-                self.top_customers_table.setItem(row_idx, 2, QTableWidgetItem(str(row["total_spent"])))
+            for row_idx in range(data.row_count):
+                self.top_customers_table.setItem(row_idx, 0, QTableWidgetItem(usernames[row_idx]))
+                self.top_customers_table.setItem(row_idx, 1, QTableWidgetItem(customer_names[row_idx]))
+                self.top_customers_table.setItem(row_idx, 2, QTableWidgetItem(total_spent[row_idx]))
 
             self.top_customers_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
 
@@ -361,8 +370,8 @@ class CustomerOrders(QWidget):
         self.top_customers_plot.figure.clear()
         ax = self.top_customers_plot.figure.add_subplot(111)
 
-        usernames = [row["username"] for row in data]
-        total_spent = [row["total_spent"] for row in data]
+        usernames = data["username"]
+        total_spent = data["total_spent"]
 
         ax.barh(usernames, total_spent, color="skyblue")
         ax.set_xlabel("Total Spent")
@@ -379,6 +388,7 @@ class CustomerOrders(QWidget):
     def switch_content(self, index):
         """Switch content when a button is clicked and update button styles."""
         self.stacked_widget.setCurrentIndex(index)
+        self.load_tab(index)
 
         # Reset all buttons
         for button in self.buttons:
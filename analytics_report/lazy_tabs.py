@@ -0,0 +1,74 @@
+from datetime import datetime
+from PyQt5.QtWidgets import QLabel
+from PyQt5.QtCore import Qt
+from config import DEBUG_LOGGING
+from database import db, db_async
+
+
+class LazyTabsMixin:
+    """Load an analytics tab's query the first time the tab is shown.
+
+    A page calls `init_lazy_tabs` with one (name, loader) pair per stacked-widget
+    index, calls `load_tab(index)` from `switch_content`, and has its loaders submit
+    through `submit_tab_query` (SQL) or `submit_tab_task` (any callable). A tab that
+    is still loading is not submitted again.
+    """
+
+    def init_lazy_tabs(self, tabs):
+        """Register the tabs and return the "last refreshed" label to place in the page."""
+        self.tab_names = [name for name, _ in tabs]
+        self.tab_loaders = [loader for _, loader in tabs]
+        self.tab_requested = [False] * len(tabs)
+        self.tab_refreshed = {}  # tab name -> datetime of the last delivered result
+        self.current_tab = 0
+
+        self.refreshed_label = QLabel()
+        self.refreshed_label.setAlignment(Qt.AlignRight)
+        return self.refreshed_label
+
+    def load_tab(self, index):
+        """Make `index` the current tab and run its loader if it has never been loaded."""
+        self.current_tab = index
+        if not self.tab_requested[index]:
+            self.tab_requested[index] = True
+            self.tab_loaders[index]()
+        self.update_refreshed_label()
+
+    def submit_tab_query(self, name, query, on_result, params=None, fetch=None):
+        """Run a tab's query in the background unless the same tab is already loading.
+
+        `fetch` defaults to db.fetch_columns_cached.
+        """
+        self.submit_tab_task(name, fetch or db.fetch_columns_cached, on_result, query, params)
+
+    def submit_tab_task(self, name, fn, on_result, *args):
+        """Run `fn(*args)` for a tab in the background unless the same tab is already loading."""
+        key = (self, name)
+        if db_async.is_pending(key):
+            return
+
+        def deliver(data):
+            self.tab_refreshed[name] = datetime.now()
+            on_result(data)
+            self.update_refreshed_label()
+
+        def failed(message):
+            if DEBUG_LOGGING:
+                print(f"[DEBUG] Failed to load {name}: {message}")
+            # Let the next visit to the tab try again
+            if name in self.tab_names:
+                self.tab_requested[self.tab_names.index(name)] = False
+            self.update_refreshed_label()
+
+        db_async.run(fn, *args, on_result=deliver, on_error=failed, key=key)
+
+    def update_refreshed_label(self):
+        """Show when the current tab's data was last loaded."""
+        name = self.tab_names[self.current_tab]
+        refreshed = self.tab_refreshed.get(name)
+        if refreshed is not None:
+            self.refreshed_label.setText(f"Last refreshed: {refreshed:%Y-%m-%d %H:%M:%S}")
+        elif db_async.is_pending((self, name)):
+            self.refreshed_label.setText("Loading...")
+        else:
+            self.refreshed_label.setText("Not loaded")
@@ -7,9 +7,10 @@ from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QPushButton, QTableWidget, QTableWidgetItem,
     QHeaderView, QHBoxLayout, QStackedWidget
 )
-from database import db
+from .lazy_tabs import LazyTabsMixin
+from .sales_cube import cube_view
 
-class MarketTrends(QWidget):
+class MarketTrends(LazyTabsMixin, QWidget):
     def __init__(self):
         super().__init__()
         self.initUI()
@@ -41,6 +42,13 @@ class MarketTrends(QWidget):
             button.clicked.connect(lambda _, index=i: self.switch_content(index))
             button_layout.addWidget(button)
 
+        # Each tab runs its query the first time it is shown
+        refreshed_label = self.init_lazy_tabs([
+            ("top_selling", self.load_top_selling),
+            ("pareto_sales", self.load_pareto_sales),
+            ("price_tier", self.load_price_tier),
+        ])
+
         # Content Area (QStackedWidget)
         self.stacked_widget = QStackedWidget()
         self.top_selling_page = self.create_top_selling_section()
@@ -60,20 +68,13 @@ class MarketTrends(QWidget):
 
         # Add Components to Layout
         main_layout.addLayout(button_layout)
+        main_layout.addWidget(refreshed_label)
         main_layout.addWidget(content_wrapper)
         self.setLayout(main_layout)
 
-        self.load_all_data()
-
         # Set Default View
         self.switch_content(0)
 
-    def load_all_data(self):
-        """Load data for all sections."""
-        self.load_top_selling(self.top_selling_table)
-        self.load_pareto_sales(self.pareto_sales_table)
-        self.load_price_tier(self.price_tier_table)        
-
     # ──────────────────── TAB 1: Top-Selling Products by State ────────────────────
     def create_top_selling_section(self):
         """Create UI section for top-selling products per state."""
@@ -88,58 +89,30 @@ class MarketTrends(QWidget):
         widget = QWidget()
         widget.setLayout(layout)
 
-        self.load_top_selling()
         return widget
 
     def load_top_selling(self, table=None):
         """Load and display top-selling products per state and update the grouped bar chart."""
-        query = """
-        WITH ProductSales AS (
-            SELECT 
-                a.state, 
-                p.product_name, 
-                SUM(oi.total_price) AS total_sales,
-                RANK() OVER (PARTITION BY a.state ORDER BY SUM(oi.total_price) DESC) AS sales_rank
-            FROM order_items oi
-            JOIN orders o ON oi.order_id = o.order_id
-            JOIN products p ON oi.product_id = p.product_id
-            JOIN addresses a ON o.shipping_address_id = a.address_id
-            GROUP BY a.state, p.product_name
-        )
-        SELECT 
-            ps1.state,
-            COALESCE(ps1.product_name, 'None') AS Product_1, COALESCE(ps1.total_sales, 0) AS Sales_1,
-            COALESCE(ps2.product_name, 'None') AS Product_2, COALESCE(ps2.total_sales, 0) AS Sales_2,
-            COALESCE(ps3.product_name, 'None') AS Product_3, COALESCE(ps3.total_sales, 0) AS Sales_3
-        FROM 
-            (SELECT * FROM ProductSales WHERE sales_rank = 1) ps1
-        LEFT JOIN 
-            (SELECT * FROM ProductSales WHERE sales_rank = 2) ps2 ON ps1.state = ps2.state
-        LEFT JOIN 
-            (SELECT * FROM ProductSales WHERE sales_rank = 3) ps3 ON ps1.state = ps3.state
-        ORDER BY ps1.state;
-        """
-
         if table is None:
             table = self.top_selling_table  
 
-        data = db.execute_query(query)
+        self.submit_tab_task("top_selling", cube_view, self.populate_top_selling, "top3_per_state")
 
+    def populate_top_selling(self, data):
+        """Display top selling query results."""
         if data:
-            self.top_selling_table.setRowCount(len(data))
+            columns = ["state", "Product_1", "Sales_1", "Product_2", "Sales_2", "Product_3", "Sales_3"]
+            column_texts = [data.text(name) for name in columns]
+
+            self.top_selling_table.setRowCount(data.row_count)
             self.top_selling_table.setColumnCount(7)
             self.top_selling_table.setHorizontalHeaderLabels(
                 ["State", "Product 1", "Sales 1", "Product 2", "Sales 2", "Product 3", "Sales 3"]
             )
 
-            for row_idx, row in enumerate(data):
-                self.top_selling_table.setItem(row_idx, 0, QTableWidgetItem(row["state"]))
-                self.top_selling_table.setItem(row_idx, 1, QTableWidgetItem(row["Product_1"]))
-                self.top_selling_table.setItem(row_idx, 2, QTableWidgetItem(str(row["Sales_1"])))
-                self.top_selling_table.setItem(row_idx, 3, QTableWidgetItem(row["Product_2"]))
-                self.top_selling_table.setItem(row_idx, 4, QTableWidgetItem(str(row["Sales_2"])))
-                self.top_selling_table.setItem(row_idx, 5, QTableWidgetItem(row["Product_3"]))
-                self.top_selling_table.setItem(row_idx, 6, QTableWidgetItem(str(row["Sales_3"])))
+            for row_idx in range(data.row_count):
+                for col_idx, texts in enumerate(column_texts):
+                    self.top_selling_table.setItem(row_idx, col_idx, QTableWidgetItem(texts[row_idx]))
 
             self.top_selling_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
 
@@ -151,12 +124,12 @@ class MarketTrends(QWidget):
         ax = self.top_selling_plot.figure.add_subplot(111)
 
         # Extracting Data
-        states = [row["state"] for row in data]
-        product_1 = [row["Sales_1"] for row in data]
-        product_2 = [row["Sales_2"] for row in data]
-        product_3 = [row["Sales_3"] for row in data]
+        states = data["state"]
+        product_1 = data["Sales_1"]
+        product_2 = data["Sales_2"]
+        product_3 = data["Sales_3"]
 
-        labels = [row["Product_1"] for row in data], [row["Product_2"] for row in data], [row["Product_3"] for row in data]
+        labels = data["Product_1"], data["Product_2"], data["Product_3"]
 
         # Unique Products (For Legend Colors)
         unique_products = set([p for row in labels for p in row if p != "None"])
@@ -203,55 +176,34 @@ class MarketTrends(QWidget):
         widget = QWidget()
         widget.setLayout(layout)
 
-        self.load_pareto_sales()
         return widget  
 
     def load_pareto_sales(self, table=None):
         """Load Pareto sales distribution data and update the table and graph."""
-        query = """
-        WITH ProductSales AS (
-            SELECT 
-                p.product_name, 
-                SUM(oi.total_price) AS total_sales
-            FROM order_items oi
-            JOIN orders o ON oi.order_id = o.order_id  
-            JOIN products p ON oi.product_id = p.product_id  
-            GROUP BY p.product_name
-        ),
-        RankedProducts AS (
-            SELECT 
-                product_name,
-                total_sales,
-                SUM(total_sales) OVER (ORDER BY total_sales DESC) AS cumulative_sales,
-                ROUND((SUM(total_sales) OVER (ORDER BY total_sales DESC) * 100.0) / SUM(total_sales) OVER (), 2) AS cumulative_percentage
-            FROM ProductSales
-        )
-        SELECT 
-            product_name,
-            total_sales,
-            cumulative_sales,
-            cumulative_percentage,
-            CASE WHEN cumulative_percentage <= 80 THEN 'Top 80%' ELSE 'Bottom 20%' END AS pareto_classification
-        FROM RankedProducts
-        ORDER BY cumulative_sales DESC;  
-        """
-
         if table is None:
             table = self.pareto_sales_table  
 
-        data = db.execute_query(query)
+        self.submit_tab_task("pareto_sales", cube_view, self.populate_pareto_sales, "pareto_sales")
 
+    def populate_pareto_sales(self, data):
+        """Display pareto sales query results."""
         if data:
-            self.pareto_sales_table.setRowCount(len(data))
+            product_names = data["product_name"]
+            total_sales = data.text("total_sales")
+            cumulative_sales = data.text("cumulative_sales")
+            cumulative_percentages = data.text("cumulative_percentage")
+            classifications = data["pareto_classification"]
+
+            self.pareto_sales_table.setRowCount(data.row_count)
             self.pareto_sales_table.setColumnCount(5)  # Pareto Classification
             self.pareto_sales_table.setHorizontalHeaderLabels(["Product Name", "Total Sales", "Cumulative Sales", "Cumulative Percentage", "Pareto Classification"])
 
-            for row_idx, row in enumerate(data):
-                self.pareto_sales_table.setItem(row_idx, 0, QTableWidgetItem(row["product_name"]))
-                self.pareto_sales_table.setItem(row_idx, 1, QTableWidgetItem(str(row["total_sales"])))
-                self.pareto_sales_table.setItem(row_idx, 2, QTableWidgetItem(str(row["cumulative_sales"])))
-                self.pareto_sales_table.setItem(row_idx, 3, QTableWidgetItem(f"{row['cumulative_percentage']}%"))
-                self.pareto_sales_table.setItem(row_idx, 4, QTableWidgetItem(row["pareto_classification"]))  # Pareto Classification 
+            for row_idx in range(data.row_count):
+                self.pareto_sales_table.setItem(row_idx, 0, QTableWidgetItem(product_names[row_idx]))
+                self.pareto_sales_table.setItem(row_idx, 1, QTableWidgetItem(total_sales[row_idx]))
+                self.pareto_sales_table.setItem(row_idx, 2, QTableWidgetItem(cumulative_sales[row_idx]))
+                self.pareto_sales_table.setItem(row_idx, 3, QTableWidgetItem(f"{cumulative_percentages[row_idx]}%"))
+                self.pareto_sales_table.setItem(row_idx, 4, QTableWidgetItem(classifications[row_idx]))  # Pareto Classification 
 
             self.pareto_sales_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
 
@@ -261,11 +213,11 @@ class MarketTrends(QWidget):
         """Plot Pareto sales distribution using the 80/20 rule with reduced gaps between bars."""
         # Prepare data
         product_names = [
-            row["product_name"] if len(row["product_name"]) <= 6 
-            else row["product_name"][:6] + "..." 
-            for row in data
+            name if len(name) <= 6 
+            else name[:6] + "..." 
+            for name in data["product_name"]
         ]
-        cumulative_percentages = [row["cumulative_percentage"] for row in data]
+        cumulative_percentages = data["cumulative_percentage"]
 
         self.pareto_sales_plot.figure.clear()
         ax = self.pareto_sales_plot.figure.add_subplot(111)
@@ -274,7 +226,7 @@ class MarketTrends(QWidget):
         x_vals = np.arange(len(product_names))
         # Set bar width very close to the spacing (e.g., 0.98 for minimal gap)
         bar_width = 0.98
-        colors = ['#FFA07A' if round(perc, 2) < 80.00 else '#4682B4' for perc in cumulative_percentages]
+        colors = np.where(np.round(cumulative_percentages, 2) < 80.00, '#FFA07A', '#4682B4').tolist()
 
         bars = ax.bar(x_vals, cumulative_percentages, width=bar_width, color=colors)
 
@@ -317,54 +269,23 @@ class MarketTrends(QWidget):
         widget = QWidget()
         widget.setLayout(layout)
 
-        self.load_price_tier()
         return widget  
 
     def load_price_tier(self, table=None):
         """Load data for top N products in each price tier, with Best Seller emphasis."""
-        query = """
-        WITH ProductSales AS (
-            SELECT 
-                p.product_name,
-                p.price,
-                SUM(oi.total_price) AS total_sales
-            FROM order_items oi
-            JOIN products p ON oi.product_id = p.product_id
-            GROUP BY p.product_name, p.price
-        ),
-        PriceTieredProducts AS (
-            SELECT 
-                product_name,
-                price,
-                total_sales,
-                NTILE(5) OVER (ORDER BY price DESC) AS price_tier
-            FROM ProductSales
-        )
-        SELECT 
-            product_name,
-            price,
-            total_sales,
-            price_tier,
-            DENSE_RANK() OVER (PARTITION BY price_tier ORDER BY total_sales DESC) AS rank_within_tier
-        FROM PriceTieredProducts
-        ORDER BY price_tier, rank_within_tier;
-        """
-
         if table is None:
             table = self.price_tier_table  
 
-        data = db.execute_query(query)
+        self.submit_tab_task("price_tier", cube_view, self.populate_price_tier, "price_tier_ranking")
 
+    def populate_price_tier(self, data):
+        """Display price tier query results."""
         if data:
-            self.price_tier_table.setRowCount(len(data))
+            self.price_tier_table.setRowCount(data.row_count)
             self.price_tier_table.setColumnCount(5)
             self.price_tier_table.setHorizontalHeaderLabels(["Product Name", "Price", "Total Sales", "Price Tier", "Rank"])
 
-            tiers = sorted(set(row["price_tier"] for row in data))
-            sales_by_tier = {
-                tier: [float(row["total_sales"]) for row in data if row["price_tier"] == tier]  
-                for tier in tiers
-            }
+            sales_by_tier = self.sales_by_price_tier(data)
             iqr_bounds = {}
 
             # IQR value calculation
@@ -376,44 +297,56 @@ class MarketTrends(QWidget):
                 upper_bound = q3 + 1.5 * iqr
                 iqr_bounds[tier] = (lower_bound, upper_bound)
 
-            for row_idx, row in enumerate(data):
-                product_name = row["product_name"]
-                price = str(row["price"])
-                total_sales = float(row["total_sales"])  
-                price_tier = str(row["price_tier"])
-                rank = str(row["rank_within_tier"])
+            # Per-row bounds, so outliers are flagged for the whole column at once
+            row_tiers = data["price_tier"]
+            lower = np.array([iqr_bounds[tier][0] for tier in row_tiers.tolist()])
+            upper = np.array([iqr_bounds[tier][1] for tier in row_tiers.tolist()])
+            total_sales = data["total_sales"].astype(float)
+            above = total_sales > upper
+            below = total_sales < lower
+
+            product_names = data["product_name"]
+            prices = data.text("price")
+            total_sales_texts = [str(sales) for sales in total_sales.tolist()]
+            price_tiers = data.text("price_tier")
+            ranks = data.text("rank_within_tier")
 
-                lower, upper = iqr_bounds[row["price_tier"]]
-                is_outlier = total_sales < lower or total_sales > upper
+            for row_idx in range(data.row_count):
+                product_name = product_names[row_idx]
+                is_outlier = above[row_idx] or below[row_idx]
 
                 star_color = "🟡"
-                if total_sales > upper:
+                if above[row_idx]:
                     star_color = "🔴"  
-                elif total_sales < lower:
+                elif below[row_idx]:
                     star_color = "🔵"  
 
                 product_display = f'{product_name} {star_color}' if is_outlier else product_name
 
                 self.price_tier_table.setItem(row_idx, 0, QTableWidgetItem(product_display))
-                self.price_tier_table.setItem(row_idx, 1, QTableWidgetItem(price))
-                self.price_tier_table.setItem(row_idx, 2, QTableWidgetItem(str(total_sales)))
-                self.price_tier_table.setItem(row_idx, 3, QTableWidgetItem(price_tier))
-                self.price_tier_table.setItem(row_idx, 4, QTableWidgetItem(rank))
+                self.price_tier_table.setItem(row_idx, 1, QTableWidgetItem(prices[row_idx]))
+                self.price_tier_table.setItem(row_idx, 2, QTableWidgetItem(total_sales_texts[row_idx]))
+                self.price_tier_table.setItem(row_idx, 3, QTableWidgetItem(price_tiers[row_idx]))
+                self.price_tier_table.setItem(row_idx, 4, QTableWidgetItem(ranks[row_idx]))
 
             self.price_tier_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
 
             self.plot_price_tier(data, iqr_bounds)
 
+    @staticmethod
+    def sales_by_price_tier(data):
+        """Group the total_sales column by price tier: {tier: float array}."""
+        tiers = data["price_tier"]
+        total_sales = data["total_sales"].astype(float)
+        return {tier: total_sales[tiers == tier] for tier in np.unique(tiers).tolist()}
+
     def plot_price_tier(self, data, iqr_bounds):
         """Plot box plot for top products in each price tier, emphasizing outliers."""
         self.price_tier_plot.figure.clear()
         ax = self.price_tier_plot.figure.add_subplot(111)
 
-        tiers = sorted(set(row["price_tier"] for row in data))
-        sales_by_tier = {
-            tier: [float(row["total_sales"]) for row in data if row["price_tier"] == tier]  
-            for tier in tiers
-        }
+        sales_by_tier = self.sales_by_price_tier(data)
+        tiers = list(sales_by_tier.keys())
 
         box = ax.boxplot(
             list(sales_by_tier.values()),  
@@ -453,6 +386,7 @@ class MarketTrends(QWidget):
     def switch_content(self, index):
         """Switch content when a button is clicked and update button styles."""
         self.stacked_widget.setCurrentIndex(index)
+        self.load_tab(index)
 
         # Reset all buttons
         for button in self.buttons:
@@ -9,9 +9,10 @@ from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QApplication,
     QTableWidget, QTableWidgetItem, QStackedWidget, QHeaderView
 )
-from database import db
+from .lazy_tabs import LazyTabsMixin
+from .sales_cube import cube_view
 
-class ProductInsights(QWidget):
+class ProductInsights(LazyTabsMixin, QWidget):
     def __init__(self):
         super().__init__()
         self.initUI()
@@ -39,6 +40,13 @@ class ProductInsights(QWidget):
             button.clicked.connect(lambda _, index=i: self.switch_content(index))
             button_layout.addWidget(button)
 
+        # Each tab runs its query the first time it is shown
+        refreshed_label = self.init_lazy_tabs([
+            ("cheapest_expensive_products", self.load_cheapest_expensive_products),
+            ("price_tiers", self.load_price_tiers),
+            ("top_n_sales", self.load_top_n_sales),
+        ])
+
         self.stacked_widget = QStackedWidget()
         self.cheapest_expensive_page = self.create_cheapest_expensive_section()
         self.price_tiers_page = self.create_price_tiers_section()
@@ -49,18 +57,12 @@ class ProductInsights(QWidget):
         self.stacked_widget.addWidget(self.top_n_sales_page)
 
         main_layout.addLayout(button_layout)
+        main_layout.addWidget(refreshed_label)
         main_layout.addWidget(self.stacked_widget)
         self.setLayout(main_layout)
 
-        self.load_all_data()  
         self.switch_content(0)
 
-    def load_all_data(self):
-        """Load all data at startup to ensure faster UI switching."""
-        self.load_cheapest_expensive_products()
-        self.load_price_tiers()
-        self.load_top_n_sales()
-
     # ──────────────────── TAB 1: Cheapest & Most Expensive Products by Brand ────────────────────
     def create_cheapest_expensive_section(self):
         """Create UI for finding the cheapest and most expensive products by brand."""
@@ -99,19 +101,21 @@ class ProductInsights(QWidget):
         WHERE row_num = 1
         ORDER BY brand_name;
         """
-        data = db.execute_query(query)
+        self.submit_tab_query("cheapest_expensive_products", query, self.populate_cheapest_expensive_products)
 
+    def populate_cheapest_expensive_products(self, data):
+        """Display cheapest expensive products query results."""
         if data:
-            self.cheapest_expensive_table.setRowCount(len(data))
+            columns = ["brand_name", "cheapest_product", "cheapest_price", "expensive_product", "expensive_price"]
+            column_texts = [data.text(name) for name in columns]
+
+            self.cheapest_expensive_table.setRowCount(data.row_count)
             self.cheapest_expensive_table.setColumnCount(5)
             self.cheapest_expensive_table.setHorizontalHeaderLabels(["Brand Name", "Cheapest Product", "Price", "Most Expensive Product", "Price"])
 
-            for row_idx, row in enumerate(data):
-                self.cheapest_expensive_table.setItem(row_idx, 0, QTableWidgetItem(row["brand_name"]))
-                self.cheapest_expensive_table.setItem(row_idx, 1, QTableWidgetItem(row["cheapest_product"]))
-                self.cheapest_expensive_table.setItem(row_idx, 2, QTableWidgetItem(str(row["cheapest_price"])))
-                self.cheapest_expensive_table.setItem(row_idx, 3, QTableWidgetItem(row["expensive_product"]))
-                self.cheapest_expensive_table.setItem(row_idx, 4, QTableWidgetItem(str(row["expensive_price"])))
+            for row_idx in range(data.row_count):
+                for col_idx, texts in enumerate(column_texts):
+                    self.cheapest_expensive_table.setItem(row_idx, col_idx, QTableWidgetItem(texts[row_idx]))
 
             self.cheapest_expensive_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
             self.plot_cheapest_expensive(data)  # Ensure proper data handling
@@ -121,9 +125,9 @@ class ProductInsights(QWidget):
         self.cheapest_expensive_plot.figure.clear()
         ax = self.cheapest_expensive_plot.figure.add_subplot(111)
 
-        brands = [row["brand_name"] for row in data]
-        min_prices = [row["cheapest_price"] for row in data]
-        max_prices = [row["expensive_price"] for row in data]
+        brands = data["brand_name"]
+        min_prices = data["cheapest_price"]
+        max_prices = data["expensive_price"]
 
         bar_colors = []
         for i in range(len(brands)):
@@ -168,17 +172,23 @@ class ProductInsights(QWidget):
         SELECT product_name, price, NTILE(4) OVER (ORDER BY price ASC) AS price_tier
         FROM Products;
         """
-        data = db.execute_query(query)
+        self.submit_tab_query("price_tiers", query, self.populate_price_tiers)
 
+    def populate_price_tiers(self, data):
+        """Display price tiers query results."""
         if data:
-            self.price_tiers_table.setRowCount(len(data))
+            product_names = data["product_name"]
+            prices = data.text("price")
+            price_tiers = data.text("price_tier")
+
+            self.price_tiers_table.setRowCount(data.row_count)
             self.price_tiers_table.setColumnCount(3)
             self.price_tiers_table.setHorizontalHeaderLabels(["Product Name", "Price", "Price Tier"])
 
-            for row_idx, row in enumerate(data):
-                self.price_tiers_table.setItem(row_idx, 0, QTableWidgetItem(row["product_name"]))
-                self.price_tiers_table.setItem(row_idx, 1, QTableWidgetItem(str(row["price"])))
-                self.price_tiers_table.setItem(row_idx, 2, QTableWidgetItem(str(row["price_tier"])))
+            for row_idx in range(data.row_count):
+                self.price_tiers_table.setItem(row_idx, 0, QTableWidgetItem(product_names[row_idx]))
+                self.price_tiers_table.setItem(row_idx, 1, QTableWidgetItem(prices[row_idx]))
+                self.price_tiers_table.setItem(row_idx, 2, QTableWidgetItem(price_tiers[row_idx]))
 
             self.price_tiers_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
 
@@ -189,14 +199,13 @@ class ProductInsights(QWidget):
         self.price_tiers_plot.figure.clear()
         ax = self.price_tiers_plot.figure.add_subplot(111)
 
-        tiers = [row["price_tier"] for row in data]
-        tier_counts = {tier: tiers.count(tier) for tier in set(tiers)}
+        tiers, counts = np.unique(data["price_tier"], return_counts=True)
 
-        ax.bar(tier_counts.keys(), tier_counts.values(), color="blue")
+        ax.bar(tiers, counts, color="blue")
         ax.set_xlabel("Price Tier")
         ax.set_ylabel("Number of Products")
         ax.set_title("Product Distribution Across Price Tiers")
-        ax.set_xticks(list(tier_counts.keys()))
+        ax.set_xticks(tiers)
 
         self.price_tiers_plot.draw()
 
@@ -217,33 +226,23 @@ class ProductInsights(QWidget):
     
     def load_top_n_sales(self):
         """Load and display top N products in each price tier."""
-        query = """
-        WITH ProductSales AS (
-            SELECT p.product_name, p.price, SUM(oi.total_price) AS total_sales
-            FROM order_items oi
-            JOIN products p ON oi.product_id = p.product_id
-            GROUP BY p.product_name, p.price
-        ),
-        PriceTiered AS (
-            SELECT product_name, price, total_sales, NTILE(5) OVER (ORDER BY price DESC) AS price_tier
-            FROM ProductSales
-        )
-        SELECT product_name, price, total_sales, price_tier,
-            DENSE_RANK() OVER (PARTITION BY price_tier ORDER BY total_sales DESC) AS rank_within_tier
-        FROM PriceTiered
-        ORDER BY price_tier, rank_within_tier;
-        """
-        data = db.execute_query(query)
+        self.submit_tab_task("top_n_sales", cube_view, self.populate_top_n_sales, "price_tier_ranking")
 
+    def populate_top_n_sales(self, data):
+        """Display top n sales query results."""
         if data:
-            self.top_n_sales_table.setRowCount(len(data))
+            product_names = data["product_name"]
+            price_tiers = data.text("price_tier")
+            ranks = data.text("rank_within_tier")
+
+            self.top_n_sales_table.setRowCount(data.row_count)
             self.top_n_sales_table.setColumnCount(3)
             self.top_n_sales_table.setHorizontalHeaderLabels(["Product Name", "Price Tier", "Rank"])
 
-            for row_idx, row in enumerate(data):
-                self.top_n_sales_table.setItem(row_idx, 0, QTableWidgetItem(row["product_name"]))
-                self.top_n_sales_table.setItem(row_idx, 1, QTableWidgetItem(str(row["price_tier"])))
-                self.top_n_sales_table.setItem(row_idx, 2, QTableWidgetItem(str(row["rank_within_tier"])))
+            for row_idx in range(data.row_count):
+                self.top_n_sales_table.setItem(row_idx, 0, QTableWidgetItem(product_names[row_idx]))
+                self.top_n_sales_table.setItem(row_idx, 1, QTableWidgetItem(price_tiers[row_idx]))
+                self.top_n_sales_table.setItem(row_idx, 2, QTableWidgetItem(ranks[row_idx]))
 
             self.top_n_sales_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
 
@@ -254,13 +253,11 @@ class ProductInsights(QWidget):
         self.top_n_sales_plot.figure.clear()
         ax = self.top_n_sales_plot.figure.add_subplot(111)  
 
-        heatmap_data = {}
-        for row in data:
-            if row["price_tier"] not in heatmap_data:
-                heatmap_data[row["price_tier"]] = {}
-            heatmap_data[row["price_tier"]][row["product_name"]] = row["rank_within_tier"]
-
-        heatmap_df = pd.DataFrame.from_dict(heatmap_data, orient='index').fillna(np.nan)
+        # Tiers as rows, products as columns (in first-seen order, like the query result)
+        frame = data.to_frame()
+        heatmap_df = frame.pivot_table(index="price_tier", columns="product_name",
+                                       values="rank_within_tier", aggfunc="first")
+        heatmap_df = heatmap_df.reindex(columns=pd.unique(frame["product_name"]))
 
         truncated_labels = [name[:10] + "…" if len(name) > 10 else name for name in heatmap_df.T.index]
 
@@ -283,6 +280,7 @@ class ProductInsights(QWidget):
     def switch_content(self, index):
         """Switch content when a button is clicked and update button styles."""
         self.stacked_widget.setCurrentIndex(index)
+        self.load_tab(index)
 
         # Reset all buttons
         for button in self.buttons:
@@ -0,0 +1,374 @@
+import threading
+import time
+from itertools import product as cartesian_product
+import numpy as np
+from config import DEBUG_LOGGING
+from database import db
+from database.columnar import ColumnarResult
+from database.rollups import refresh_if_due
+
+FACTS_QUERY = """
+SELECT sales_date, product_id, state, line_count, total_sales, max_line_total
+FROM sales_daily_product_state
+"""
+
+PRODUCTS_QUERY = "SELECT product_id, product_name, price FROM products"
+
+# Money measures are held as integer cents
+MEASURES = ("line_count", "total_sales", "max_line_total")
+
+_cube_lock = threading.Lock()
+_cube = None
+_cube_sources = (None, None)
+
+
+def collation_order(labels):
+    """Sort labels roughly the way MySQL's case-insensitive collation orders them."""
+    return sorted(labels, key=lambda label: (label.lower(), label))
+
+
+def ranks_within(groups, values, dense=False):
+    """RANK() (or DENSE_RANK()) by descending `values` within each of `groups`.
+
+    Both arrays must already be sorted by group, then by value descending.
+    """
+    count = len(values)
+    if not count:
+        return np.zeros(0, dtype=np.int64)
+    positions = np.arange(count)
+    new_group = np.r_[True, groups[1:] != groups[:-1]]
+    new_value = new_group | np.r_[True, values[1:] != values[:-1]]
+    group_start = np.maximum.accumulate(np.where(new_group, positions, 0))
+    if dense:
+        # Number of distinct values seen so far in the group
+        distinct = np.cumsum(new_value)
+        return (distinct - distinct[group_start] + 1).astype(np.int64)
+    run_start = np.maximum.accumulate(np.where(new_value, positions, 0))
+    return (run_start - group_start + 1).astype(np.int64)
+
+
+def round_half_up(numerator, denominator):
+    """Integer division of non-negative int arrays, rounding halves up like SQL ROUND()."""
+    return (2 * numerator + denominator) // (2 * denominator)
+
+
+class SalesCube:
+    """Daily product x state sales from the rollup, held in memory as NumPy arrays.
+
+    Facts are stored sparsely as one row per non-empty (product, state, day) cell with
+    integer codes for each dimension (-1 for a NULL state or day) and money in exact
+    integer cents. Every view aggregates those arrays with bincount and returns a
+    ColumnarResult shaped like the SQL query it replaces, so the pages' populate
+    methods work on either.
+    """
+
+    def __init__(self, facts, products):
+        price_scale = products.scales.get("price", 2) if products else 2
+        self.money_scale = facts.scales.get("total_sales", 2) if facts else 2
+
+        # Product dimension: distinct (name, price), as the SQL views group by name and price
+        catalog = {}
+        if products:
+            catalog = dict(zip(products["product_id"].tolist(),
+                               zip(products["product_name"].tolist(), products["price"].tolist())))
+        keys = sorted(set(catalog.values()), key=lambda key: (key[0].lower(), key[0], key[1]))
+        key_code = {key: code for code, key in enumerate(keys)}
+        product_code = {product_id: key_code[key] for product_id, key in catalog.items()}
+
+        self.product_names = np.array([key[0] for key in keys], dtype=object)
+        self.product_prices = np.array([key[1] for key in keys], dtype=np.int64)
+        self.price_scale = price_scale
+        self.names = np.array(collation_order(set(self.product_names.tolist())), dtype=object)
+        name_code = {name: code for code, name in enumerate(self.names.tolist())}
+        self.name_of_product = np.array([name_code[name] for name in self.product_names.tolist()], dtype=np.intp)
+
+        if not facts:
+            empty = np.zeros(0, dtype=np.intp)
+            self.p = self.s = self.d = empty
+            self.states = np.zeros(0, dtype=object)
+            self.days = np.zeros(0, dtype="datetime64[D]")
+            self.measures = {name: np.zeros(0, dtype=np.int64) for name in MEASURES}
+            return
+
+        # Lines of products deleted since the rollup was built drop out, as in the SQL joins
+        codes = np.fromiter((product_code.get(product_id, -1) for product_id in facts["product_id"].tolist()),
+                            np.intp, facts.row_count)
+        keep = codes >= 0
+        self.p = codes[keep]
+
+        states = facts["state"][keep]
+        known = states != None  # noqa: E711 (element-wise on an object array)
+        self.states = np.array(collation_order(set(states[known].tolist())), dtype=object)
+        state_code = {state: code for code, state in enumerate(self.states.tolist())}
+        self.s = np.full(len(self.p), -1, dtype=np.intp)
+        self.s[known] = [state_code[state] for state in states[known].tolist()]
+
+        days = facts["sales_date"][keep]
+        known = ~np.isnat(days)
+        self.days, day_codes = np.unique(days[known], return_inverse=True)
+        self.d = np.full(len(self.p), -1, dtype=np.intp)
+        self.d[known] = day_codes
+
+        self.measures = {name: facts[name][keep].astype(np.int64) for name in MEASURES}
+
+    @property
+    def cell_count(self):
+        return len(self.p)
+
+    def money(self, cents):
+        """Integer cents -> float, the dtype fetch_columns uses for DECIMAL columns."""
+        return np.asarray(cents, dtype=np.float64) / 10 ** self.money_scale
+
+    # ──────────────────── Aggregation ────────────────────
+    def _codes(self, dimension):
+        if dimension == "product":
+            return self.p, len(self.product_names)
+        if dimension == "name":
+            return self.name_of_product[self.p], len(self.names)
+        if dimension == "state":
+            return self.s, len(self.states)
+        if dimension == "day":
+            return self.d, len(self.days)
+        raise ValueError(f"Unknown dimension: {dimension}")
+
+    def rollup(self, by, measure="total_sales", how="sum", start=None, end=None):
+        """Aggregate `measure` over every dimension not in `by`.
+
+        `by` is a tuple of "product", "name", "state" and "day". Cells whose state or
+        day is NULL are left out when that dimension is in `by`. `start`/`end` slice
+        the day range (inclusive). Returns ({dimension: codes}, values) for the
+        non-empty groups, in code order.
+        """
+        values = self.measures[measure]
+        mask = np.ones(len(values), dtype=bool)
+        if start is not None or end is not None:
+            in_range = np.ones(len(self.days), dtype=bool)
+            if start is not None:
+                in_range &= self.days >= np.datetime64(start, "D")
+            if end is not None:
+                in_range &= self.days <= np.datetime64(end, "D")
+            mask &= (self.d >= 0) & np.append(in_range, False)[self.d]  # code -1 picks the False
+
+        codes = []
+        sizes = []
+        for dimension in by:
+            dimension_codes, size = self._codes(dimension)
+            mask &= dimension_codes >= 0
+            codes.append(dimension_codes)
+            sizes.append(max(size, 1))
+
+        flat = np.ravel_multi_index([c[mask] for c in codes], sizes) if by else np.zeros(mask.sum(), np.intp)
+        cells = int(np.prod(sizes)) if by else 1
+        present = np.bincount(flat, minlength=cells) > 0
+        if how == "sum":
+            # float64 sums of integer cents are exact below 2**53
+            totals = np.rint(np.bincount(flat, weights=values[mask], minlength=cells)).astype(np.int64)
+        elif how == "max":
+            totals = np.zeros(cells, dtype=np.int64)
+            np.maximum.at(totals, flat, values[mask])
+        else:
+            raise ValueError(f"Unknown aggregate: {how}")
+
+        groups = np.flatnonzero(present)
+        keys = np.unravel_index(groups, sizes) if by else ()
+        return dict(zip(by, keys)), totals[groups]
+
+    def dense(self, by, measure="total_sales", start=None, end=None):
+        """Sum `measure` into a dense array with one axis per dimension in `by` (empty cells are 0)."""
+        keys, values = self.rollup(by, measure, start=start, end=end)
+        array = np.zeros([max(self._codes(dimension)[1], 1) for dimension in by], dtype=np.int64)
+        array[tuple(keys[dimension] for dimension in by)] = values
+        return array
+
+    def top_k(self, group, k, measure="total_sales", item="name"):
+        """Rows with RANK() <= k of `item` by `measure` within each `group`, ties kept.
+
+        Returns (group codes, item codes, values, ranks) sorted by group, then rank.
+        """
+        keys, values = self.rollup((group, item), measure)
+        group_codes, item_codes = keys[group], keys[item]
+        order = np.lexsort((item_codes, -values, group_codes))
+        group_codes, item_codes, values = group_codes[order], item_codes[order], values[order]
+        ranks = ranks_within(group_codes, values)
+        keep = ranks <= k
+        return group_codes[keep], item_codes[keep], values[keep], ranks[keep]
+
+    def shares(self, item="name", measure="total_sales"):
+        """Per-item totals sorted descending, with running totals (ties share one) and the overall total."""
+        keys, values = self.rollup((item,), measure)
+        codes = keys[item]
+        order = np.lexsort((codes, -values))
+        codes, values = codes[order], values[order]
+        running = np.cumsum(values)
+        if len(values):
+            # SUM() OVER (ORDER BY total DESC) gives tied rows their peer group's running total
+            last_of_run = np.r_[values[1:] != values[:-1], True]
+            run_end = np.minimum.accumulate(np.where(last_of_run, np.arange(len(values)), len(values))[::-1])[::-1]
+            running = running[run_end]
+        return codes, values, running, int(values.sum())
+
+    # ──────────────────── Views (shaped like the queries they replace) ────────────────────
+    def highest_sales(self):
+        """Largest single order line per product."""
+        keys, values = self.rollup(("name",), "max_line_total", how="max")
+        order = np.argsort(-values, kind="stable")
+        return ColumnarResult({
+            "product_name": self.names[keys["name"][order]],
+            "highest_sales_amount": self.money(values[order]),
+        }, {"highest_sales_amount": self.money_scale}, len(values))
+
+    def total_sales(self):
+        """Sales per product plus a 'Grand Total' row, largest first (GROUP BY ... WITH ROLLUP)."""
+        keys, values = self.rollup(("name",))
+        if not len(values):
+            return ColumnarResult()
+        names = np.append(self.names[keys["name"]], "Grand Total").astype(object)
+        values = np.append(values, values.sum())
+        order = np.argsort(-values, kind="stable")
+        return ColumnarResult({
+            "product_name": names[order],
+            "total_sales": self.money(values[order]),
+        }, {"total_sales": self.money_scale}, len(values))
+
+    def top_selling_per_state(self):
+        """Best-selling product(s) in each state; ties are all kept."""
+        states, names, values, _ = self.top_k("state", 1)
+        order = np.lexsort((names, states, -values))
+        return ColumnarResult({
+            "state": self.states[states[order]],
+            "product_name": self.names[names[order]],
+            "total_sales": self.money(values[order]),
+        }, {"total_sales": self.money_scale}, len(values))
+
+    def aggregated_sales(self):
+        """Sales per (product, state) with per-product and overall subtotals."""
+        keys, values = self.rollup(("name", "state"))
+        if not len(values):
+            return ColumnarResult()
+        names, states = keys["name"], keys["state"]
+        per_name = np.bincount(names, weights=values, minlength=len(self.names))
+
+        rows = [(self.names[n], self.states[s], v) for n, s, v in zip(names.tolist(), states.tolist(), values.tolist())]
+        rows += [(self.names[n], "All States", int(round(per_name[n]))) for n in np.unique(names).tolist()]
+        rows.append(("All Products", "All States", int(values.sum())))
+        rows.sort(key=lambda row: (row[0].lower(), row[0], row[1] == "All States", row[1].lower()))
+
+        return ColumnarResult({
+            "product_name": np.array([row[0] for row in rows], dtype=object),
+            "state": np.array([row[1] for row in rows], dtype=object),
+            "total_sales": self.money([row[2] for row in rows]),
+        }, {"total_sales": self.money_scale}, len(rows))
+
+    def top_n_sales(self):
+        """Order lines per product with their DENSE_RANK(), most ordered first."""
+        keys, counts = self.rollup(("name",), "line_count")
+        order = np.lexsort((keys["name"], -counts))
+        counts = counts[order]
+        return ColumnarResult({
+            "product_name": self.names[keys["name"][order]],
+            "order_count": counts,
+            "sales_rank": ranks_within(np.zeros(len(counts), np.intp), counts, dense=True),
+        }, {}, len(counts))
+
+    def top3_per_state(self):
+        """Top three products per state side by side, one row per combination of ties."""
+        states, names, values, ranks = self.top_k("state", 3)
+        rows = []
+        for state in np.unique(states).tolist():
+            in_state = states == state
+            by_rank = []
+            for rank in (1, 2, 3):
+                picked = in_state & (ranks == rank)
+                entries = list(zip(self.names[names[picked]].tolist(), values[picked].tolist()))
+                by_rank.append(entries or [("None", 0)])
+            for combination in cartesian_product(*by_rank):
+                rows.append((self.states[state],) + tuple(value for entry in combination for value in entry))
+
+        columns = ["state", "Product_1", "Sales_1", "Product_2", "Sales_2", "Product_3", "Sales_3"]
+        result = {}
+        for index, name in enumerate(columns):
+            values_at = [row[index] for row in rows]
+            result[name] = self.money(values_at) if name.startswith("Sales") else np.array(values_at, dtype=object)
+        scales = {name: self.money_scale for name in columns if name.startswith("Sales")}
+        return ColumnarResult(result, scales, len(rows))
+
+    def pareto_sales(self):
+        """Products by sales with running share of the total and an 80/20 classification."""
+        codes, values, running, overall = self.shares()
+        if not overall:
+            return ColumnarResult()
+        percentage = round_half_up(running * 10000, overall)  # hundredths of a percent
+        running_order = np.argsort(-running, kind="stable")
+        return ColumnarResult({
+            "product_name": self.names[codes[running_order]],
+            "total_sales": self.money(values[running_order]),
+            "cumulative_sales": self.money(running[running_order]),
+            "cumulative_percentage": percentage[running_order] / 100,
+            "pareto_classification": np.where(percentage[running_order] <= 8000, "Top 80%", "Bottom 20%").astype(object),
+        }, {"total_sales": self.money_scale, "cumulative_sales": self.money_scale, "cumulative_percentage": 2},
+            len(values))
+
+    def sales_distribution(self):
+        """Each product's share of total sales, largest first."""
+        codes, values, _, overall = self.shares()
+        if not overall:
+            return ColumnarResult()
+        percentage = round_half_up(values * 10000, overall)
+        return ColumnarResult({
+            "product_name": self.names[codes],
+            "total_sales": self.money(values),
+            "overall_sales": self.money(np.full(len(values), overall)),
+            "sales_percentage": percentage / 100,
+        }, {"total_sales": self.money_scale, "overall_sales": self.money_scale, "sales_percentage": 2},
+            len(values))
+
+    def price_tier_ranking(self, tiers=5):
+        """NTILE(tiers) over price (highest first) and DENSE_RANK() of sales within each tier."""
+        keys, values = self.rollup(("product",))
+        products = keys["product"]
+        count = len(products)
+        if not count:
+            return ColumnarResult()
+        prices = self.product_prices[products]
+        order = np.lexsort((products, -prices))
+        products, prices, values = products[order], prices[order], values[order]
+
+        # NTILE: the first (count % tiers) tiers get one extra row
+        size, extra = divmod(count, tiers)
+        bounds = np.cumsum([size + 1 if tier < extra else size for tier in range(tiers)])
+        price_tier = np.searchsorted(bounds, np.arange(count), side="right") + 1
+
+        order = np.lexsort((products, -values, price_tier))
+        products, prices, values, price_tier = products[order], prices[order], values[order], price_tier[order]
+        return ColumnarResult({
+            "product_name": self.product_names[products],
+            "price": prices / 10 ** self.price_scale,
+            "total_sales": self.money(values),
+            "price_tier": price_tier.astype(np.int64),
+            "rank_within_tier": ranks_within(price_tier, values, dense=True),
+        }, {"price": self.price_scale, "total_sales": self.money_scale}, count)
+
+
+def sales_cube():
+    """Return the shared SalesCube, rebuilt only when the rollup or products have changed.
+
+    Both source queries go through the query cache, so an unchanged cache entry (the
+    same result object) means the current cube is still valid.
+    """
+    global _cube, _cube_sources
+    refresh_if_due()
+    facts = db.fetch_columns(FACTS_QUERY, exact_decimals=True, cache=True)
+    products = db.fetch_columns(PRODUCTS_QUERY, exact_decimals=True, cache=True)
+    with _cube_lock:
+        if _cube is None or _cube_sources[0] is not facts or _cube_sources[1] is not products:
+            start = time.perf_counter()
+            _cube = SalesCube(facts, products)
+            _cube_sources = (facts, products)
+            if DEBUG_LOGGING:
+                print(f"[TIMING] Built sales cube ({_cube.cell_count} cells) in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return _cube
+
+
+def cube_view(view, *args):
+    """Run a SalesCube view by name; used as a background task by the analytics pages."""
+    return getattr(sales_cube(), view)(*args)
@@ -7,10 +7,11 @@ from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableWidget, QTableWidgetItem,
     QHeaderView, QStackedWidget, QApplication
 )
-from database import db
+from .lazy_tabs import LazyTabsMixin
+from .sales_cube import cube_view
 
 
-class SalesPerformance(QWidget):
+class SalesPerformance(LazyTabsMixin, QWidget):
     def __init__(self):
         super().__init__()
         self.initUI()
@@ -42,6 +43,15 @@ class SalesPerformance(QWidget):
             button.clicked.connect(lambda _, index=i: self.switch_content(index))
             button_layout.addWidget(button)
 
+        # Each tab runs its query the first time it is shown
+        refreshed_label = self.init_lazy_tabs([
+            ("highest_sales", self.load_highest_sales),
+            ("total_sales", self.load_total_sales),
+            ("top_selling", self.load_top_selling),
+            ("aggregated_sales", self.load_aggregated_sales),
+            ("top_n_sales", self.load_top_n_sales),
+        ])
+
         # Content Area
         self.stacked_widget = QStackedWidget()
         self.highest_sales_page = self.create_highest_sales_section()
@@ -57,23 +67,13 @@ class SalesPerformance(QWidget):
         self.stacked_widget.addWidget(self.top_n_sales_page)
 
         main_layout.addLayout(button_layout)
+        main_layout.addWidget(refreshed_label)
         main_layout.addWidget(self.stacked_widget)
         self.setLayout(main_layout)
 
-        # Load Data on Start
-        self.load_all_data()
-
         # Set Default View
         self.switch_content(0)
 
-    def load_all_data(self):
-        """Load all data."""
-        self.load_highest_sales()
-        self.load_total_sales()
-        self.load_top_selling()
-        self.load_aggregated_sales()
-        self.load_top_n_sales()
-
     # ──────────────────── TAB 1: Highest Sales per Product ────────────────────
     def create_highest_sales_section(self):
         """Create UI for Highest Sales per Product."""
@@ -93,23 +93,21 @@ class SalesPerformance(QWidget):
 
     def load_highest_sales(self):
         """Load and display highest sales per product."""
-        query = """
-        SELECT p.product_name, MAX(oi.total_price) AS highest_sales_amount
-        FROM order_items oi
-        JOIN products p ON oi.product_id = p.product_id
-        GROUP BY p.product_name
-        ORDER BY highest_sales_amount DESC;
-        """
-        data = db.execute_query(query)
+        self.submit_tab_task("highest_sales", cube_view, self.populate_highest_sales, "highest_sales")
 
+    def populate_highest_sales(self, data):
+        """Display highest sales query results."""
         if data:
-            self.highest_sales_table.setRowCount(len(data))
+            product_names = data["product_name"]
+            sales_amounts = data.text("highest_sales_amount")
+
+            self.highest_sales_table.setRowCount(data.row_count)
             self.highest_sales_table.setColumnCount(2)
             self.highest_sales_table.setHorizontalHeaderLabels(["Product Name", "Highest Sales Amount"])
 
-            for row_idx, row in enumerate(data):
-                self.highest_sales_table.setItem(row_idx, 0, QTableWidgetItem(row["product_name"]))
-                self.highest_sales_table.setItem(row_idx, 1, QTableWidgetItem(str(row["highest_sales_amount"])))
+            for row_idx in range(data.row_count):
+                self.highest_sales_table.setItem(row_idx, 0, QTableWidgetItem(product_names[row_idx]))
+                self.highest_sales_table.setItem(row_idx, 1, QTableWidgetItem(sales_amounts[row_idx]))
 
             self.highest_sales_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
 
@@ -117,8 +115,8 @@ class SalesPerformance(QWidget):
 
     def plot_highest_sales(self, data):
         """Plot highest sales per product inside the UI."""
-        product_names = [row["product_name"] for row in data]
-        sales_amounts = [row["highest_sales_amount"] for row in data]
+        product_names = data["product_name"]
+        sales_amounts = data["highest_sales_amount"]
 
         self.highest_sales_plot.figure.clear()
         ax = self.highest_sales_plot.figure.add_subplot(111)
@@ -152,37 +150,31 @@ class SalesPerformance(QWidget):
 
     def load_total_sales(self):
         """Load and display total and grand total sales."""
-        query = """
-        SELECT COALESCE(p.product_name, 'Grand Total') AS product_name, SUM(oi.total_price) AS total_sales
-        FROM order_items oi
-        JOIN products p ON oi.product_id = p.product_id
-        GROUP BY p.product_name WITH ROLLUP
-        ORDER BY total_sales DESC;
-        """
-        data = db.execute_query(query)
+        self.submit_tab_task("total_sales", cube_view, self.populate_total_sales, "total_sales")
 
+    def populate_total_sales(self, data):
+        """Display total sales query results."""
         if data:
-            self.total_sales_table.setRowCount(len(data))
+            self.total_sales_table.setRowCount(data.row_count)
             self.total_sales_table.setColumnCount(2)
             self.total_sales_table.setHorizontalHeaderLabels(["Product Name", "Total Sales"])
 
-            self.grand_total = None
-            filtered_data = []
-
-            for row in data:
-                if row["product_name"] == "Grand Total":
-                    self.grand_total = row  # Grand Total
-                else:
-                    filtered_data.append(row)
+            # Grand Total row (from WITH ROLLUP) goes last and is kept out of the plot
+            is_grand_total = data["product_name"] == "Grand Total"
+            filtered_data = data.take(~is_grand_total)
+            grand_total = data.take(is_grand_total)
+            self.grand_total = grand_total.text("total_sales")[0] if grand_total else None
 
-            for row_idx, row in enumerate(filtered_data):
-                self.total_sales_table.setItem(row_idx, 0, QTableWidgetItem(row["product_name"]))
-                self.total_sales_table.setItem(row_idx, 1, QTableWidgetItem(str(row["total_sales"])))
+            product_names = filtered_data["product_name"]
+            total_sales = filtered_data.text("total_sales")
+            for row_idx in range(filtered_data.row_count):
+                self.total_sales_table.setItem(row_idx, 0, QTableWidgetItem(product_names[row_idx]))
+                self.total_sales_table.setItem(row_idx, 1, QTableWidgetItem(total_sales[row_idx]))
 
             if self.grand_total:
-                row_idx = len(filtered_data)
-                self.total_sales_table.setItem(row_idx, 0, QTableWidgetItem(self.grand_total["product_name"]))
-                self.total_sales_table.setItem(row_idx, 1, QTableWidgetItem(str(self.grand_total["total_sales"])))
+                row_idx = filtered_data.row_count
+                self.total_sales_table.setItem(row_idx, 0, QTableWidgetItem("Grand Total"))
+                self.total_sales_table.setItem(row_idx, 1, QTableWidgetItem(self.grand_total))
 
             self.total_sales_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
 
@@ -194,8 +186,8 @@ class SalesPerformance(QWidget):
         self.total_sales_plot.figure.clear()
         ax = self.total_sales_plot.figure.add_subplot(111)
 
-        product_names = [row["product_name"] for row in data]
-        total_sales = [row["total_sales"] for row in data]
+        product_names = data["product_name"]
+        total_sales = data["total_sales"]
 
         max_label_length = 12 
         shortened_names = [name if len(name) <= max_label_length else name[:max_label_length] + "..." for name in product_names]
@@ -210,7 +202,7 @@ class SalesPerformance(QWidget):
         # Display Grand Total as a separate text annotation
         if self.grand_total:
             ax.text(
-                0.95, 0.95, f"Grand Total: {self.grand_total['total_sales']}", 
+                0.95, 0.95, f"Grand Total: {self.grand_total}", 
                 transform=ax.transAxes, fontsize=10, verticalalignment='top', 
                 horizontalalignment='right', bbox=dict(facecolor='white', alpha=0.6)
             )
@@ -233,45 +225,28 @@ class SalesPerformance(QWidget):
 
         page.setLayout(layout)
 
-        self.load_top_selling()
 
         return page
 
     def load_top_selling(self):
         """Load and display top-selling products per state."""
-        query = """
-        SELECT a.state, p.product_name, SUM(oi.total_price) AS total_sales
-        FROM order_items oi
-        JOIN orders o ON oi.order_id = o.order_id
-        JOIN addresses a ON o.shipping_address_id = a.address_id
-        JOIN products p ON oi.product_id = p.product_id
-        GROUP BY a.state, p.product_name
-        HAVING 
-            total_sales = (
-                SELECT MAX(state_sales)
-                FROM (
-                    SELECT a_inner.state AS state, p_inner.product_name AS product_name, SUM(oi_inner.total_price) AS state_sales
-                    FROM order_items oi_inner    
-                    JOIN orders o_inner ON oi_inner.order_id = o_inner.order_id   
-                    JOIN addresses a_inner ON o_inner.shipping_address_id = a_inner.address_id    
-                    JOIN products p_inner ON oi_inner.product_id = p_inner.product_id    
-                    WHERE a_inner.state = a.state    
-                    GROUP BY a_inner.state, p_inner.product_name
-                ) AS state_sales_table
-            )
-        ORDER BY total_sales DESC;    
-        """
-        data = db.execute_query(query)
+        self.submit_tab_task("top_selling", cube_view, self.populate_top_selling, "top_selling_per_state")
 
+    def populate_top_selling(self, data):
+        """Display top selling query results."""
         if data:
-            self.top_selling_table.setRowCount(len(data))
+            states = data["state"]
+            product_names = data["product_name"]
+            total_sales = data.text("total_sales")
+
+            self.top_selling_table.setRowCount(data.row_count)
             self.top_selling_table.setColumnCount(3)
             self.top_selling_table.setHorizontalHeaderLabels(["State", "Product Name", "Total Sales"])
 
-            for row_idx, row in enumerate(data):
-                self.top_selling_table.setItem(row_idx, 0, QTableWidgetItem(row["state"]))
-                self.top_selling_table.setItem(row_idx, 1, QTableWidgetItem(row["product_name"]))
-                self.top_selling_table.setItem(row_idx, 2, QTableWidgetItem(str(row["total_sales"])))
+            for row_idx in range(data.row_count):
+                self.top_selling_table.setItem(row_idx, 0, QTableWidgetItem(states[row_idx]))
+                self.top_selling_table.setItem(row_idx, 1, QTableWidgetItem(product_names[row_idx]))
+                self.top_selling_table.setItem(row_idx, 2, QTableWidgetItem(total_sales[row_idx]))
 
             self.top_selling_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
 
@@ -279,9 +254,9 @@ class SalesPerformance(QWidget):
 
     def plot_top_selling(self, data):
         """Plot top-selling products per state inside the UI."""
-        states = [row["state"] for row in data]
-        sales = [row["total_sales"] for row in data]
-        products = [row["product_name"] for row in data]
+        states = data["state"]
+        sales = data["total_sales"]
+        products = data["product_name"]
 
         self.top_selling_plot.figure.clear()
         ax = self.top_selling_plot.figure.add_subplot(111)
@@ -318,32 +293,28 @@ class SalesPerformance(QWidget):
 
         page.setLayout(layout)
 
-        self.load_aggregated_sales()
 
         return page
 
     def load_aggregated_sales(self):
         """Load aggregated product sales data by state."""
-        query = """
-        SELECT COALESCE(p.product_name, 'All Products') AS product_name, COALESCE(a.state, 'All States') AS state, SUM(oi.total_price) AS total_sales                       
-        FROM order_items oi
-        JOIN products p ON oi.product_id = p.product_id
-        JOIN orders o ON oi.order_id = o.order_id
-        JOIN addresses a ON o.shipping_address_id = a.address_id
-        GROUP BY p.product_name, a.state WITH ROLLUP                      
-        ORDER BY product_name, CASE WHEN state = 'All States' THEN 1 ELSE 0 END, CASE WHEN state = 'All States' THEN NULL ELSE state END;
-        """
-        data = db.execute_query(query)
+        self.submit_tab_task("aggregated_sales", cube_view, self.populate_aggregated_sales, "aggregated_sales")
 
+    def populate_aggregated_sales(self, data):
+        """Display aggregated sales query results."""
         if data:
-            self.aggregated_sales_table.setRowCount(len(data))
+            product_names = data["product_name"]
+            states = data["state"]
+            total_sales = data.text("total_sales")
+
+            self.aggregated_sales_table.setRowCount(data.row_count)
             self.aggregated_sales_table.setColumnCount(3)
             self.aggregated_sales_table.setHorizontalHeaderLabels(["Product Name", "State", "Total Sales"])
 
-            for row_idx, row in enumerate(data):
-                self.aggregated_sales_table.setItem(row_idx, 0, QTableWidgetItem(row["product_name"]))
-                self.aggregated_sales_table.setItem(row_idx, 1, QTableWidgetItem(row["state"]))
-                self.aggregated_sales_table.setItem(row_idx, 2, QTableWidgetItem(str(row["total_sales"])))
+            for row_idx in range(data.row_count):
+                self.aggregated_sales_table.setItem(row_idx, 0, QTableWidgetItem(product_names[row_idx]))
+                self.aggregated_sales_table.setItem(row_idx, 1, QTableWidgetItem(states[row_idx]))
+                self.aggregated_sales_table.setItem(row_idx, 2, QTableWidgetItem(total_sales[row_idx]))
 
             self.aggregated_sales_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
 
@@ -355,26 +326,28 @@ class SalesPerformance(QWidget):
         ax = self.aggregated_sales_plot.figure.add_subplot(111)
 
         # Filter out 'All States'
-        filtered_data = [row for row in data if row["state"] != "All States"]
+        filtered_data = data.take(data["state"] != "All States")
 
         # Extract unique product names and states
-        product_names = sorted(set(row["product_name"] for row in filtered_data), key=lambda x: x.lower())
-        states = sorted(set(row["state"] for row in filtered_data))
+        product_names = sorted(set(filtered_data["product_name"]), key=lambda x: x.lower())
+        states = sorted(set(filtered_data["state"]))
 
-        # Prepare sales data for stacking
-        sales_data = {state: [0] * len(product_names) for state in states}
-        for row in filtered_data:
-            product_index = product_names.index(row["product_name"])
-            sales_data[row["state"]][product_index] = float(row["total_sales"])  # Ensure conversion to float
+        # Scatter sales into a (state, product) matrix for stacking
+        product_index = {name: i for i, name in enumerate(product_names)}
+        state_index = {state: i for i, state in enumerate(states)}
+        rows = np.fromiter((state_index[s] for s in filtered_data["state"]), dtype=np.intp, count=filtered_data.row_count)
+        cols = np.fromiter((product_index[p] for p in filtered_data["product_name"]), dtype=np.intp, count=filtered_data.row_count)
+        sales_data = np.zeros((len(states), len(product_names)), dtype=float)
+        sales_data[rows, cols] = filtered_data["total_sales"]
 
         # Plot stacked bar chart
         bottom = np.zeros(len(product_names), dtype=float)  # Explicit float dtype
         colors = plt.cm.get_cmap('tab20', len(states)).colors
 
-        for state, color in zip(states, colors):
-            sales_values = np.array(sales_data[state], dtype=float)  # Convert to float array
+        for state_idx, (state, color) in enumerate(zip(states, colors)):
+            sales_values = sales_data[state_idx]
             ax.bar(product_names, sales_values, bottom=bottom, label=state, color=color)
-            bottom += sales_values  # Ensure float addition
+            bottom += sales_values
 
         ax.set_xlabel("Product Name")
         ax.set_ylabel("Total Sales")
@@ -404,24 +377,23 @@ class SalesPerformance(QWidget):
 
     def load_top_n_sales(self):
         """Load and display Top N Best-Selling Products by Order Count."""
-        query = """
-        SELECT p.product_name, COUNT(oi.order_id) AS order_count, DENSE_RANK() OVER (ORDER BY COUNT(oi.order_id) DESC) AS sales_rank
-        FROM order_items oi
-        JOIN products p ON oi.product_id = p.product_id
-        GROUP BY p.product_name
-        ORDER BY sales_rank;
-        """
-        data = db.execute_query(query)
+        self.submit_tab_task("top_n_sales", cube_view, self.populate_top_n_sales, "top_n_sales")
 
+    def populate_top_n_sales(self, data):
+        """Display top n sales query results."""
         if data:
-            self.top_n_sales_table.setRowCount(len(data))
+            product_names = data["product_name"]
+            order_counts = data.text("order_count")
+            sales_ranks = data.text("sales_rank")
+
+            self.top_n_sales_table.setRowCount(data.row_count)
             self.top_n_sales_table.setColumnCount(3)
             self.top_n_sales_table.setHorizontalHeaderLabels(["Product Name", "Order Count", "Sales Rank"])
 
-            for row_idx, row in enumerate(data):
-                self.top_n_sales_table.setItem(row_idx, 0, QTableWidgetItem(row["product_name"]))
-                self.top_n_sales_table.setItem(row_idx, 1, QTableWidgetItem(str(row["order_count"])))
-                self.top_n_sales_table.setItem(row_idx, 2, QTableWidgetItem(str(row["sales_rank"])))
+            for row_idx in range(data.row_count):
+                self.top_n_sales_table.setItem(row_idx, 0, QTableWidgetItem(product_names[row_idx]))
+                self.top_n_sales_table.setItem(row_idx, 1, QTableWidgetItem(order_counts[row_idx]))
+                self.top_n_sales_table.setItem(row_idx, 2, QTableWidgetItem(sales_ranks[row_idx]))
 
             self.top_n_sales_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
 
@@ -429,14 +401,14 @@ class SalesPerformance(QWidget):
 
     def plot_top_n_sales(self, data):
         """Plot Top N Best-Selling Products by Order Count inside the UI."""
-        product_names = [row["product_name"] for row in data]
-        order_counts = [row["order_count"] for row in data]
-        sales_ranks = [row["sales_rank"] for row in data]
+        product_names = data["product_name"]
+        order_counts = data["order_count"]
+        sales_ranks = data["sales_rank"]
 
         self.top_n_sales_plot.figure.clear()
         ax = self.top_n_sales_plot.figure.add_subplot(111)
 
-        colors = plt.cm.viridis([rank / max(sales_ranks) for rank in sales_ranks])
+        colors = plt.cm.viridis(sales_ranks / sales_ranks.max())
         ax.bar(product_names, order_counts, color=colors)
         ax.set_xlabel("Product Name")
         ax.set_ylabel("Order Count")
@@ -452,6 +424,7 @@ class SalesPerformance(QWidget):
     def switch_content(self, index):
         """Switch content when a button is clicked and update button styles."""
         self.stacked_widget.setCurrentIndex(index)
+        self.load_tab(index)
 
         # Reset all buttons
         for button in self.buttons:
@@ -5,10 +5,10 @@ from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QPushButton, QHBoxLayout,
     QStackedWidget, QTableWidget, QTableWidgetItem, QHeaderView
 )
-from database import db
+from .lazy_tabs import LazyTabsMixin
 
 
-class StockAnalysis(QWidget):
+class StockAnalysis(LazyTabsMixin, QWidget):
     def __init__(self):
         super().__init__()
         self.initUI()
@@ -40,6 +40,13 @@ class StockAnalysis(QWidget):
             button.clicked.connect(lambda _, index=i: self.switch_content(index))
             button_layout.addWidget(button)
 
+        # Each tab runs its query the first time it is shown
+        refreshed_label = self.init_lazy_tabs([
+            ("rank_products", self.load_rank_products),
+            ("total_stock", self.load_total_stock),
+            ("ntile_stock", self.load_ntile_stock),
+        ])
+
         # Content Area (QStackedWidget)
         self.stacked_widget = QStackedWidget()
         self.rank_page = self.create_rank_section()
@@ -58,21 +65,13 @@ class StockAnalysis(QWidget):
 
         # Add Components to Layout
         main_layout.addLayout(button_layout)
+        main_layout.addWidget(refreshed_label)
         main_layout.addWidget(content_wrapper)
 
         self.setLayout(main_layout)
 
-        # Load Data on Start
-        self.load_all_data()
-
         self.switch_content(0)
 
-    def load_all_data(self):
-        # Load data automatically
-        self.load_rank_products()
-        self.load_total_stock()
-        self.load_ntile_stock()
-
     # ──────────────────── TAB 1: Rank Products by Stock Levels ────────────────────
     def create_rank_section(self):
         """Create the Rank Products by Stock Levels page."""
@@ -96,17 +95,23 @@ class StockAnalysis(QWidget):
         FROM products p
         JOIN inventory i ON p.product_id = i.product_id;
         """
-        data = db.execute_query(query)
+        self.submit_tab_query("rank_products", query, self.populate_rank_products)
 
+    def populate_rank_products(self, data):
+        """Display rank products query results."""
         if data:
-            self.rank_table.setRowCount(len(data))
+            product_names = data["product_name"]
+            stock_quantities = data.text("stock_quantity")
+            stock_ranks = data.text("stock_rank")
+
+            self.rank_table.setRowCount(data.row_count)
             self.rank_table.setColumnCount(3)
             self.rank_table.setHorizontalHeaderLabels(["Product Name", "Stock Quantity", "Stock Rank"])
 
-            for row_idx, row in enumerate(data):
-                self.rank_table.setItem(row_idx, 0, QTableWidgetItem(row["product_name"]))
-                self.rank_table.setItem(row_idx, 1, QTableWidgetItem(str(row["stock_quantity"])))
-                self.rank_table.setItem(row_idx, 2, QTableWidgetItem(str(row["stock_rank"])))
+            for row_idx in range(data.row_count):
+                self.rank_table.setItem(row_idx, 0, QTableWidgetItem(product_names[row_idx]))
+                self.rank_table.setItem(row_idx, 1, QTableWidgetItem(stock_quantities[row_idx]))
+                self.rank_table.setItem(row_idx, 2, QTableWidgetItem(stock_ranks[row_idx]))
 
             self.rank_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
 
@@ -117,13 +122,13 @@ class StockAnalysis(QWidget):
         
         self.rank_plot.figure.clear()
         
-        num_products = len(data)
+        num_products = data.row_count
         self.rank_plot.figure.set_size_inches(8, max(6, num_products * 0.3))  
         
         ax = self.rank_plot.figure.add_subplot(111)
 
-        product_names = [row["product_name"] for row in data]
-        stock_levels = [row["stock_quantity"] for row in data]
+        product_names = data["product_name"]
+        stock_levels = data["stock_quantity"]
 
         max_label_length = 12 
         shortened_names = [name if len(name) <= max_label_length else name[:max_label_length] + "..." for name in product_names]
@@ -167,16 +172,21 @@ class StockAnalysis(QWidget):
         GROUP BY b.brand_name
         ORDER BY total_stock DESC;
         """
-        data = db.execute_query(query)
+        self.submit_tab_query("total_stock", query, self.populate_total_stock)
 
+    def populate_total_stock(self, data):
+        """Display total stock query results."""
         if data:
-            self.total_stock_table.setRowCount(len(data))
+            brand_names = data["brand_name"]
+            total_stocks = data.text("total_stock")
+
+            self.total_stock_table.setRowCount(data.row_count)
             self.total_stock_table.setColumnCount(2)
             self.total_stock_table.setHorizontalHeaderLabels(["Brand Name", "Total Stock"])
 
-            for row_idx, row in enumerate(data):
-                self.total_stock_table.setItem(row_idx, 0, QTableWidgetItem(row["brand_name"]))
-                self.total_stock_table.setItem(row_idx, 1, QTableWidgetItem(str(row["total_stock"])))
+            for row_idx in range(data.row_count):
+                self.total_stock_table.setItem(row_idx, 0, QTableWidgetItem(brand_names[row_idx]))
+                self.total_stock_table.setItem(row_idx, 1, QTableWidgetItem(total_stocks[row_idx]))
 
             self.total_stock_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
 
@@ -187,8 +197,8 @@ class StockAnalysis(QWidget):
         self.total_stock_plot.figure.clear()
         ax = self.total_stock_plot.figure.add_subplot(111)
 
-        brand_names = [row["brand_name"] for row in data]
-        total_stocks = [row["total_stock"] for row in data]
+        brand_names = data["brand_name"]
+        total_stocks = data["total_stock"]
 
         ax.bar(brand_names, total_stocks, color="lightcoral")
 
@@ -199,7 +209,7 @@ class StockAnalysis(QWidget):
         ax.set_ylabel("Total Stock")
         ax.set_title("Total Stock Per Brand")
 
-        ax.set_ylim(0, float(max(total_stocks)) * 1.1)
+        ax.set_ylim(0, float(total_stocks.max()) * 1.1)
 
         self.total_stock_plot.draw()
 
@@ -217,7 +227,6 @@ class StockAnalysis(QWidget):
 
         page.setLayout(layout)
 
-        self.load_ntile_stock()
         return page
 
     def load_ntile_stock(self):
@@ -228,17 +237,23 @@ class StockAnalysis(QWidget):
         FROM products p
         JOIN inventory i ON p.product_id = i.product_id;
         """
-        data = db.execute_query(query)
+        self.submit_tab_query("ntile_stock", query, self.populate_ntile_stock)
 
+    def populate_ntile_stock(self, data):
+        """Display ntile stock query results."""
         if data:
-            self.ntile_table.setRowCount(len(data))
+            product_names = data["product_name"]
+            stock_quantities = data.text("stock_quantity")
+            stock_tiers = data.text("stock_tier")
+
+            self.ntile_table.setRowCount(data.row_count)
             self.ntile_table.setColumnCount(3)
             self.ntile_table.setHorizontalHeaderLabels(["Product Name", "Stock Quantity", "Stock Tier"])
 
-            for row_idx, row in enumerate(data):
-                self.ntile_table.setItem(row_idx, 0, QTableWidgetItem(row["product_name"]))
-                self.ntile_table.setItem(row_idx, 1, QTableWidgetItem(str(row["stock_quantity"])))
-                self.ntile_table.setItem(row_idx, 2, QTableWidgetItem(str(row["stock_tier"])))
+            for row_idx in range(data.row_count):
+                self.ntile_table.setItem(row_idx, 0, QTableWidgetItem(product_names[row_idx]))
+                self.ntile_table.setItem(row_idx, 1, QTableWidgetItem(stock_quantities[row_idx]))
+                self.ntile_table.setItem(row_idx, 2, QTableWidgetItem(stock_tiers[row_idx]))
 
             self.ntile_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
 
@@ -246,8 +261,8 @@ class StockAnalysis(QWidget):
 
     def plot_stock_tiers_by_product(self, data):
         """Plot each product's stock tier."""
-        product_names = [row["product_name"] for row in data]
-        stock_tiers = [row["stock_tier"] for row in data]
+        product_names = data["product_name"]
+        stock_tiers = data["stock_tier"]
 
         self.stock_tier_plot.figure.clear()
 
@@ -276,6 +291,7 @@ class StockAnalysis(QWidget):
     def switch_content(self, index):
         """Switch content when a button is clicked and update button styles."""
         self.stacked_widget.setCurrentIndex(index)
+        self.load_tab(index)
 
         # Reset all buttons
         for button in self.buttons:
@@ -1,4 +1,5 @@
 from .login import LoginWidget
 from .register import RegisterWidget
+from .session import UserSession, load_session
 
-__all__ = ["LoginWidget", "RegisterWidget"]
+__all__ = ["LoginWidget", "RegisterWidget", "UserSession", "load_session"]
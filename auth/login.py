@@ -3,10 +3,11 @@ from PyQt5.QtWidgets import QApplication, QWidget, QLabel, QLineEdit, QPushButto
 from PyQt5.QtCore import Qt, pyqtSignal
 from config import WINDOW_X, WINDOW_Y, WINDOW_WIDTH, WINDOW_HEIGHT # Import common UI settings
 from database import db
+from auth.session import SESSION_QUERY, UserSession
 
 class LoginWidget(QWidget):
     createAccountClicked = pyqtSignal()
-    loginSuccessful = pyqtSignal(str, str)
+    loginSuccessful = pyqtSignal(object)  # UserSession
 
     def __init__(self):
         super().__init__()
@@ -80,7 +81,7 @@ class LoginWidget(QWidget):
 
         cursor = conn.cursor(dictionary=True)
         
-        query = "SELECT username, role FROM users WHERE username = %s AND password = %s"
+        query = SESSION_QUERY + " AND password = %s"
         cursor.execute(query, (username, password))
         user = cursor.fetchone()
 
@@ -89,7 +90,7 @@ class LoginWidget(QWidget):
         if user:
             QMessageBox.information(self, "Success", f"Login successful! \n\n(Role: {user['role']})")
             
-            self.loginSuccessful.emit(user['username'], user['role'])
+            self.loginSuccessful.emit(UserSession.from_row(user))
 
         else:
             QMessageBox.warning(self, "Error", "Invalid username or password.")
@@ -133,6 +133,7 @@ class RegisterWidget(QWidget):
         try:
             cursor.execute(query, (username, password, email, first_name, last_name, phone_number))
             conn.commit()
+            db.invalidate_tables("users")
             QMessageBox.information(self, "Success", "Account created successfully! Please log in.")
             self.goToLoginClicked.emit()
         except Exception as e:
@@ -0,0 +1,44 @@
+from database import db
+
+# Columns a session is built from; the login query adds the password check
+SESSION_QUERY = """
+SELECT user_id, username, role, email, first_name, last_name, phone_number
+FROM users
+WHERE username = %s
+"""
+
+PROFILE_KEYS = ["email", "first_name", "last_name", "phone_number"]
+
+
+class UserSession:
+    """The logged-in user, resolved once at login and handed to the dashboard and its pages.
+
+    Pages filter by `user_id` directly instead of looking the username up again in
+    every statement. `profile` caches the user's contact details as of login; My
+    Account displays it, and update_profile (called after saving) is the only way it
+    changes.
+    """
+
+    def __init__(self, user_id, username, role, profile=None):
+        self.user_id = user_id
+        self.username = username
+        self.role = role
+        self.profile = profile or {}
+
+    @classmethod
+    def from_row(cls, row):
+        """Build a session from a users row holding the SESSION_QUERY columns."""
+        return cls(row["user_id"], row["username"], row["role"], {key: row.get(key) for key in PROFILE_KEYS})
+
+    def is_admin(self):
+        return self.role.lower() == "admin"
+
+    def update_profile(self, **values):
+        """Record profile changes the user has just saved."""
+        self.profile.update(values)
+
+
+def load_session(username):
+    """Return the session of `username` without a password check (for scripts and test windows), or None."""
+    rows = db.execute_query(SESSION_QUERY, (username,))
+    return UserSession.from_row(rows[0]) if rows else None
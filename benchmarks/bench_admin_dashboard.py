@@ -0,0 +1,69 @@
+"""Measure admin login time-to-interactive with lazy vs eager page construction.
+
+Each run builds AdminDashboard in a fresh interpreter (offscreen Qt platform) and
+reports the time until the event loop is free with the first page shown. Eager mode
+builds all ten pages up front, as the dashboard used to, e.g.
+
+    python benchmarks/bench_admin_dashboard.py --runs 3
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DASHBOARD_SCRIPT = """
+import sys, time
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QTimer
+from config import load_stylesheet
+
+app = QApplication(sys.argv)
+app.setStyleSheet(load_stylesheet())
+start = time.perf_counter()
+
+from auth.session import UserSession
+from dashboard.admin_dashboard import AdminDashboard
+dashboard = AdminDashboard(UserSession(0, "bench_admin", "admin"), prefetch=False)
+if sys.argv[1] == "eager":
+    for index in range(len(dashboard.pages)):
+        dashboard.ensure_page(index)
+dashboard.show()
+
+def ready():
+    print(f"INTERACTIVE_MS {(time.perf_counter() - start) * 1000:.3f}", flush=True)
+    app.quit()
+
+QTimer.singleShot(0, ready)
+app.exec_()
+"""
+
+
+def time_to_interactive(mode, env):
+    """Return milliseconds until the dashboard is interactive in a fresh interpreter."""
+    output = subprocess.run(
+        [sys.executable, "-c", DASHBOARD_SCRIPT, mode],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    for line in output.splitlines():
+        if line.startswith("INTERACTIVE_MS "):
+            return float(line.split()[1])
+    raise RuntimeError(f"Dashboard script did not report readiness:\n{output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    print(f"{'mode':<8} {'median (ms)':>12} {'min (ms)':>10} {'max (ms)':>10}")
+    for mode in ("eager", "lazy"):
+        samples = [time_to_interactive(mode, env) for _ in range(args.runs)]
+        print(f"{mode:<8} {statistics.median(samples):>12.1f} {min(samples):>10.1f} {max(samples):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Time bulk order status changes against one-order-at-a-time updates.
+
+A scratch schema holds an orders table (just the columns a status change touches)
+with --orders rows. "single" updates each selected order with its own UPDATE and
+commit, as OrderManagement used to; "bulk" runs transition_orders over all of them
+in one transaction. Each run moves a fresh random sample of orders to the next status.
+The application's own tables are never touched, e.g.
+
+    python benchmarks/bench_bulk_status.py --selected 100 1000 5000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import mysql.connector
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from database.database import DB_CONFIG  # noqa: E402
+from admin.order_management import transition_orders  # noqa: E402
+
+STATUSES = ["Pending", "Shipped", "Delivered"]
+
+SCHEMA = """
+CREATE TABLE orders (
+    order_id INT AUTO_INCREMENT PRIMARY KEY,
+    delivery_status ENUM('Pending', 'Shipped', 'Delivered', 'Cancelled') NOT NULL DEFAULT 'Pending',
+    status_updated_date DATETIME NULL
+)
+"""
+
+INSERT_BATCH = 5000
+
+
+def single(conn, cursor, order_ids, status):
+    for order_id in order_ids:
+        cursor.execute("UPDATE orders SET delivery_status = %s, status_updated_date = NOW() WHERE order_id = %s",
+                       (status, order_id))
+        conn.commit()
+
+
+def bulk(conn, cursor, order_ids, status):
+    transition_orders(cursor, order_ids, status)
+    conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=200000, help="Rows in the scratch orders table.")
+    parser.add_argument("--selected", type=int, nargs="+", default=[100, 1000, 5000],
+                        help="Numbers of orders changed per run.")
+    parser.add_argument("--schema", default="bench_bulk_status", help="Scratch database, dropped afterwards.")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch database.")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    conn = mysql.connector.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+    cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{args.schema}`")
+    cursor.execute(f"USE `{args.schema}`")
+
+    try:
+        cursor.execute("DROP TABLE IF EXISTS orders")
+        cursor.execute(SCHEMA)
+        for start in range(0, args.orders, INSERT_BATCH):
+            count = min(INSERT_BATCH, args.orders - start)
+            cursor.executemany("INSERT INTO orders (delivery_status) VALUES (%s)", [("Pending",)] * count)
+        conn.commit()
+
+        print(f"{'orders':>8} {'single (ms)':>12} {'bulk (ms)':>10}")
+        run = 0
+        for selected in args.selected:
+            timings = {}
+            for name, update in (("single", single), ("bulk", bulk)):
+                run += 1
+                order_ids = rng.sample(range(1, args.orders + 1), min(selected, args.orders))
+                start = time.perf_counter()
+                update(conn, cursor, order_ids, STATUSES[run % len(STATUSES)])
+                timings[name] = (time.perf_counter() - start) * 1000
+            print(f"{selected:>8} {timings['single']:>12.1f} {timings['bulk']:>10.1f}")
+    finally:
+        if not args.keep:
+            cursor.execute(f"DROP DATABASE IF EXISTS `{args.schema}`")
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
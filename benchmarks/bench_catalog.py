@@ -0,0 +1,122 @@
+"""Time opening and filtering the customer product catalog.
+
+Each (mode, size) runs in a fresh interpreter on the offscreen Qt platform, with
+generated products shaped like Orders' PRODUCTS_QUERY. "widget" builds a
+QTableWidget with a QWidget/QHBoxLayout/QCheckBox per row, as the Orders page used
+to; "model" hands a ColumnarResult to the checkable ColumnTableView. The script
+reports the time until the catalog is painted and, for the model, the time to build
+the name and facet indexes (in the background on the page) and the slowest of a few
+searches and brand/price selections, e.g.
+
+    python benchmarks/bench_catalog.py --sizes 10000 100000
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CATALOG_SCRIPT = """
+import sys, time
+import numpy as np
+from PyQt5.QtWidgets import QApplication, QTableWidget, QTableWidgetItem, QWidget, QHBoxLayout, QCheckBox
+from PyQt5.QtCore import Qt
+from database.columnar import ColumnarResult
+from models import ColumnTableView
+from customer_site.orders import build_catalog_index
+
+mode, count = sys.argv[1], int(sys.argv[2])
+app = QApplication(sys.argv)
+rng = np.random.default_rng(1)
+words = np.array(["wireless", "mouse", "keyboard", "desk", "lamp", "chair", "cable", "pro", "mini", "max"], dtype=object)
+names = [" ".join(rng.choice(words, 3)) + f" {i}" for i in range(count)]
+brands = np.array([f"Brand {i}" for i in range(200)] + [None], dtype=object)
+products = ColumnarResult({
+    "product_id": np.arange(1, count + 1, dtype=np.int64),
+    "product_name": np.array(names, dtype=object),
+    "brand_name": brands[rng.integers(0, len(brands), count)],
+    "price": rng.integers(100, 100000, count) / 100,
+}, {"price": 2}, count)
+
+start = time.perf_counter()
+if mode == "widget":
+    table = QTableWidget()
+    table.setColumnCount(4)
+    table.setRowCount(count)
+    for row_idx in range(count):
+        checkbox_widget = QWidget()
+        layout = QHBoxLayout()
+        layout.setAlignment(Qt.AlignCenter)
+        layout.addWidget(QCheckBox())
+        layout.setContentsMargins(0, 0, 0, 0)
+        checkbox_widget.setLayout(layout)
+        table.setCellWidget(row_idx, 0, checkbox_widget)
+        table.setItem(row_idx, 1, QTableWidgetItem(names[row_idx]))
+        table.setItem(row_idx, 2, QTableWidgetItem(f"${products['price'][row_idx]:.2f}"))
+        table.setItem(row_idx, 3, QTableWidgetItem(str(row_idx + 1)))
+else:
+    table = ColumnTableView([("product_name", "Product Name"), ("brand_name", "Brand"), ("price", "Price")],
+                            formatters={"price": lambda price: f"${price:.2f}"}, check_key="product_id")
+    table.set_result(products)
+table.resize(1000, 800)
+table.show()
+app.processEvents()
+opened = (time.perf_counter() - start) * 1000
+
+index_ms = filter_ms = 0.0
+if mode == "model":
+    start = time.perf_counter()
+    name_index, facet_index = build_catalog_index(products)
+    index_ms = (time.perf_counter() - start) * 1000
+    for text, brand, low, high in (("wire", None, None, None), ("m", None, None, None),
+                                   ("desk lamp", "Brand 7", None, None), ("", None, 10.0, 50.0),
+                                   ("pro", "Brand 3", 100.0, None)):
+        start = time.perf_counter()
+        rows = name_index.search(text)
+        mask = facet_index.select({"brand_name": [brand]} if brand else None, {"price": (low, high)})
+        rows = np.flatnonzero(mask) if rows is None else rows[mask[rows]]
+        table.set_row_filter(rows)
+        app.processEvents()
+        filter_ms = max(filter_ms, (time.perf_counter() - start) * 1000)
+
+print(f"RESULT {opened:.3f} {index_ms:.3f} {filter_ms:.3f}", flush=True)
+"""
+
+
+def run_catalog(mode, count, env):
+    """Return (open ms, index build ms, slowest filter ms) for one mode in a fresh interpreter."""
+    output = subprocess.run(
+        [sys.executable, "-c", CATALOG_SCRIPT, mode, str(count)],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    for line in output.splitlines():
+        if line.startswith("RESULT "):
+            open_ms, index_ms, filter_ms = map(float, line.split()[1:])
+            return open_ms, index_ms, filter_ms
+    raise RuntimeError(f"Catalog script did not report a result:\n{output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--widget-max-rows", type=int, default=20000,
+                        help="Skip the checkbox-widget run above this many products.")
+    args = parser.parse_args()
+
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    print(f"{'products':>9} {'mode':<7} {'open (ms)':>10} {'index (ms)':>11} {'filter (ms)':>12}")
+    for count in args.sizes:
+        for mode in ("widget", "model"):
+            if mode == "widget" and count > args.widget_max_rows:
+                print(f"{count:>9} {mode:<7} {'skipped':>10}")
+                continue
+            open_ms, index_ms, filter_ms = run_catalog(mode, count, env)
+            if mode == "model":
+                print(f"{count:>9} {mode:<7} {open_ms:>10.1f} {index_ms:>11.1f} {filter_ms:>12.1f}")
+            else:
+                print(f"{count:>9} {mode:<7} {open_ms:>10.1f} {'-':>11} {'-':>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Measure checkout latency against cart size: one INSERT per line vs one multi-row INSERT.
+
+Every run is rolled back, so stock levels and order history are left untouched, e.g.
+
+    python benchmarks/bench_checkout.py --sizes 1 5 10 25 50 --runs 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from database import db  # noqa: E402
+from customer_site.checkout import ORDER_QUERY, order_total, place_order  # noqa: E402
+
+PER_ROW_ITEM_QUERY = """
+INSERT INTO order_items (order_id, product_id, quantity, unit_price, total_price)
+VALUES (%s, %s, %s, %s, %s)
+"""
+
+
+def place_order_per_row(conn, user_id, address_id, cart, commit=True):
+    """Previous checkout: one round trip per order line."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(ORDER_QUERY, (user_id, order_total(cart), address_id))
+        order_id = cursor.lastrowid
+        for product_id, item in cart.items():
+            cursor.execute(PER_ROW_ITEM_QUERY, (order_id, product_id, item["quantity"],
+                                                item["price"], item["price"] * item["quantity"]))
+        if commit:
+            conn.commit()
+        return order_id
+    finally:
+        cursor.close()
+
+
+def checkout_fixture(conn, max_items):
+    """Pick a customer with an address and up to `max_items` products for the cart."""
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("""
+        SELECT u.user_id, a.address_id
+        FROM users u JOIN addresses a ON a.user_id = u.user_id
+        LIMIT 1
+    """)
+    customer = cursor.fetchone()
+    cursor.execute("SELECT product_id, product_name, price FROM products ORDER BY product_id LIMIT %s", (max_items,))
+    products = cursor.fetchall()
+    cursor.close()
+    conn.rollback()
+    if customer is None or not products:
+        raise SystemExit("Need at least one customer with an address and one product.")
+    return customer["user_id"], customer["address_id"], products
+
+
+def time_checkout(conn, checkout, user_id, address_id, cart):
+    """Return seconds taken by one checkout, rolled back afterwards."""
+    start = time.perf_counter()
+    checkout(conn, user_id, address_id, cart, commit=False)
+    elapsed = time.perf_counter() - start
+    conn.rollback()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 5, 10, 25, 50])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with db.connection() as conn:
+        user_id, address_id, products = checkout_fixture(conn, max(args.sizes))
+        print(f"{'cart size':>10} {'per-row (ms)':>14} {'batched (ms)':>14} {'speedup':>8}")
+        for size in args.sizes:
+            cart = {
+                p["product_id"]: {"product_name": p["product_name"], "price": float(p["price"]), "quantity": 1}
+                for p in products[:size]
+            }
+            per_row = statistics.median(
+                time_checkout(conn, place_order_per_row, user_id, address_id, cart) for _ in range(args.runs))
+            batched = statistics.median(
+                time_checkout(conn, place_order, user_id, address_id, cart) for _ in range(args.runs))
+            print(f"{len(cart):>10} {per_row * 1000:>14.2f} {batched * 1000:>14.2f} {per_row / batched:>7.1f}x")
+    db.close_connection()
+
+
+if __name__ == "__main__":
+    main()
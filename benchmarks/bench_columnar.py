@@ -0,0 +1,56 @@
+"""Compare dict rows (execute_query) against NumPy columns (fetch_columns).
+
+Each mode fetches the same result and extracts one numeric column as floats, the way
+the analytics plots do, e.g.
+
+    python benchmarks/bench_columnar.py --query "SELECT order_item_id, total_price FROM order_items"
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from database import db  # noqa: E402
+
+
+def measure(label, consume):
+    """Run `consume()` and print its row count, elapsed time and peak traced memory."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = consume()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<12} {rows:>10} {elapsed * 1000:>12.1f} {peak / (1024 * 1024):>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--query", default="SELECT order_item_id, product_id, quantity, total_price FROM order_items")
+    parser.add_argument("--column", default="total_price")
+    args = parser.parse_args()
+
+    def dict_rows():
+        rows = db.execute_query(args.query)
+        values = [float(row[args.column]) for row in rows]
+        return len(values)
+
+    def columns():
+        data = db.fetch_columns(args.query)
+        return len(data[args.column]) if data else 0
+
+    # Warm the connection so neither mode pays for the connect
+    db.execute_query("SELECT 1")
+
+    print(f"{'mode':<12} {'rows':>10} {'time (ms)':>12} {'peak (MiB)':>12}")
+    measure("dict rows", dict_rows)
+    measure("columns", columns)
+    db.close_connection()
+
+
+if __name__ == "__main__":
+    main()
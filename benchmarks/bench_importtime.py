@@ -0,0 +1,80 @@
+"""Profile imports on the path from a cold start to the login window.
+
+Runs the same startup script as bench_startup.py under `python -X importtime`
+(offscreen Qt platform), then reports the wall time, the total import time, the
+slowest top-level imports and whether any analytics-only dependency was loaded, e.g.
+
+    python benchmarks/bench_importtime.py --top 15 --log importtime.txt
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from bench_startup import ROOT_DIR, STARTUP_SCRIPT
+
+# Only the analytics pages need these; none should be imported before login
+HEAVY_MODULES = ("matplotlib", "seaborn", "pandas", "numpy")
+
+
+def parse_importtime(stderr):
+    """Return [(module, self_us, cumulative_us, depth)] from -X importtime output."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def run_startup(env):
+    """Start the app under -X importtime; return (wall seconds, stderr)."""
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-X", "importtime", "-c", STARTUP_SCRIPT],
+        cwd=ROOT_DIR, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+    )
+    elapsed = None
+    for line in proc.stdout:
+        if line.strip() == "LOGIN_WINDOW_READY":
+            elapsed = time.perf_counter() - start
+            break
+    proc.kill()
+    _, stderr = proc.communicate()
+    if elapsed is None:
+        raise RuntimeError("Startup script exited before the login window was shown.")
+    return elapsed, stderr
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest top-level imports to list.")
+    parser.add_argument("--log", help="Also write the raw -X importtime output to this file.")
+    args = parser.parse_args()
+
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    elapsed, stderr = run_startup(env)
+    if args.log:
+        with open(args.log, "w", encoding="utf-8") as f:
+            f.write(stderr)
+
+    entries = parse_importtime(stderr)
+    top_level = [entry for entry in entries if entry[3] == 0]
+    total_ms = sum(entry[2] for entry in top_level) / 1000
+    print(f"Login window shown after {elapsed * 1000:.1f} ms "
+          f"({total_ms:.1f} ms importing {len(entries)} modules)")
+
+    print(f"\n{'module':<40} {'cumulative (ms)':>16}")
+    for name, _, cumulative_us, _ in sorted(top_level, key=lambda entry: entry[2], reverse=True)[:args.top]:
+        print(f"{name:<40} {cumulative_us / 1000:>16.1f}")
+
+    loaded = sorted({name for name, _, _, _ in entries if name.split(".")[0] in HEAVY_MODULES})
+    roots = sorted({name.split(".")[0] for name in loaded})
+    print(f"\nAnalytics dependencies imported before login: {', '.join(roots) if roots else 'none'}")
+
+
+if __name__ == "__main__":
+    main()
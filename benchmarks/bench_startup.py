@@ -0,0 +1,82 @@
+"""Measure time from process start to the login window being shown.
+
+Runs the application's startup path in a fresh interpreter (offscreen Qt platform)
+with the configured database host and with an unreachable one, e.g.
+
+    python benchmarks/bench_startup.py --runs 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Mirrors main.py, then reports as soon as the login window has been shown
+STARTUP_SCRIPT = """
+import sys
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QTimer
+from config import load_stylesheet
+from database import db
+from database.database import DB_WARM_UP
+from main_window import MainWindow
+
+app = QApplication(sys.argv)
+app.setStyleSheet(load_stylesheet())
+main_win = MainWindow()
+main_win.show()
+if DB_WARM_UP:
+    db.warm_up()
+
+def ready():
+    print("LOGIN_WINDOW_READY", flush=True)
+    app.quit()
+
+QTimer.singleShot(0, ready)
+app.exec_()
+"""
+
+
+def time_to_login_window(env):
+    """Return seconds from spawning the interpreter until the login window is shown."""
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-c", STARTUP_SCRIPT],
+        cwd=ROOT_DIR, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+    )
+    elapsed = None
+    for line in proc.stdout:
+        if line.strip() == "LOGIN_WINDOW_READY":
+            elapsed = time.perf_counter() - start
+            break
+    proc.kill()
+    proc.wait()
+    if elapsed is None:
+        raise RuntimeError("Startup script exited before the login window was shown.")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--unreachable-host", default="10.255.255.1",
+                        help="Non-routable address used to simulate an unreachable server.")
+    args = parser.parse_args()
+
+    base_env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    scenarios = [
+        ("reachable", base_env),
+        ("unreachable", dict(base_env, DB_HOST=args.unreachable_host)),
+    ]
+
+    print(f"{'scenario':<12} {'median (ms)':>12} {'min (ms)':>10} {'max (ms)':>10}")
+    for name, env in scenarios:
+        samples = [time_to_login_window(env) * 1000 for _ in range(args.runs)]
+        print(f"{name:<12} {statistics.median(samples):>12.1f} {min(samples):>10.1f} {max(samples):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Simulate N concurrent buyers checking out overlapping carts and report throughput.
+
+Compares the per-row stock path (one SELECT + UPDATE per order line, as the
+update_stock_after_order trigger does) against the set-based reserve_stock path.
+Each buyer uses its own connection and every checkout is rolled back, so stock and
+order history are left untouched, e.g.
+
+    python benchmarks/bench_stock_concurrency.py --buyers 8 --orders 50 --cart-size 5
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+import mysql.connector
+from mysql.connector import Error, errorcode
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from database.database import DB_CONFIG  # noqa: E402
+from customer_site.checkout import (  # noqa: E402
+    ORDER_ITEM_PLACEHOLDER, ORDER_ITEMS_QUERY, ORDER_QUERY, STOCK_TRIGGER_QUERY,
+    order_total, reserve_stock,
+)
+
+PER_ROW_ITEM_QUERY = """
+INSERT INTO order_items (order_id, product_id, quantity, unit_price, total_price)
+VALUES (%s, %s, %s, %s, %s)
+"""
+
+CONTENTION_ERRORS = {errorcode.ER_LOCK_DEADLOCK, errorcode.ER_LOCK_WAIT_TIMEOUT}
+
+
+def checkout_per_row(cursor, user_id, address_id, cart, trigger_installed):
+    """Per-line stock check and decrement in cart order, like the trigger."""
+    cursor.execute(ORDER_QUERY, (user_id, order_total(cart), address_id))
+    order_id = cursor.lastrowid
+    for product_id, item in cart.items():
+        if not trigger_installed:
+            # Do what the trigger did for each row, from the client
+            cursor.execute("SELECT stock_quantity FROM inventory WHERE product_id = %s", (product_id,))
+            cursor.fetchall()
+            cursor.execute("UPDATE inventory SET stock_quantity = stock_quantity - %s WHERE product_id = %s",
+                           (item["quantity"], product_id))
+        cursor.execute(PER_ROW_ITEM_QUERY, (order_id, product_id, item["quantity"],
+                                            item["price"], item["price"] * item["quantity"]))
+
+
+def checkout_set_based(cursor, user_id, address_id, cart, trigger_installed):
+    """Lock the whole cart in product_id order, one UPDATE, one multi-row INSERT."""
+    reserve_stock(cursor, cart)
+    cursor.execute(ORDER_QUERY, (user_id, order_total(cart), address_id))
+    order_id = cursor.lastrowid
+    params = []
+    for product_id, item in cart.items():
+        params.extend((order_id, product_id, item["quantity"], item["price"], item["price"] * item["quantity"]))
+    cursor.execute(ORDER_ITEMS_QUERY.format(rows=", ".join([ORDER_ITEM_PLACEHOLDER] * len(cart))), params)
+
+
+def load_fixture(hot_products):
+    conn = mysql.connector.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT u.user_id, a.address_id
+        FROM users u JOIN addresses a ON a.user_id = u.user_id
+        LIMIT 1
+    """)
+    customer = cursor.fetchone()
+    cursor.execute("""
+        SELECT p.product_id, p.price
+        FROM products p JOIN inventory i ON i.product_id = p.product_id
+        WHERE i.stock_quantity > 0
+        ORDER BY p.product_id
+        LIMIT %s
+    """, (hot_products,))
+    products = cursor.fetchall()
+    cursor.execute(STOCK_TRIGGER_QUERY)
+    trigger_installed = cursor.fetchone()[0] > 0
+    cursor.close()
+    conn.close()
+    if customer is None or not products:
+        raise SystemExit("Need a customer with an address and products in stock.")
+    return customer, products, trigger_installed
+
+
+def run_buyers(checkout, args, customer, products, trigger_installed):
+    """Run all buyers to completion; return (completed, contention errors, seconds)."""
+    completed = [0]
+    conflicts = [0]
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(args.buyers)
+
+    def buyer(seed):
+        rng = random.Random(seed)
+        conn = mysql.connector.connect(**DB_CONFIG)
+        cursor = conn.cursor()
+        start_barrier.wait()
+        for _ in range(args.orders):
+            picked = rng.sample(products, min(args.cart_size, len(products)))
+            # Insertion order is random, as a real cart would be
+            cart = {product_id: {"price": price, "quantity": 1} for product_id, price in picked}
+            try:
+                conn.start_transaction()
+                checkout(cursor, customer[0], customer[1], cart, trigger_installed)
+                if args.hold_ms:
+                    time.sleep(args.hold_ms / 1000)
+                conn.rollback()
+                with lock:
+                    completed[0] += 1
+            except Error as e:
+                conn.rollback()
+                if e.errno not in CONTENTION_ERRORS:
+                    raise
+                with lock:
+                    conflicts[0] += 1
+        cursor.close()
+        conn.close()
+
+    threads = [threading.Thread(target=buyer, args=(seed,)) for seed in range(args.buyers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return completed[0], conflicts[0], time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--buyers", type=int, default=8)
+    parser.add_argument("--orders", type=int, default=50, help="Checkouts per buyer.")
+    parser.add_argument("--cart-size", type=int, default=5)
+    parser.add_argument("--hot-products", type=int, default=10, help="Size of the product set carts draw from.")
+    parser.add_argument("--hold-ms", type=float, default=0.0, help="Time each transaction holds its locks.")
+    parser.add_argument("--mode", choices=["both", "per-row", "set-based"], default="both")
+    args = parser.parse_args()
+
+    customer, products, trigger_installed = load_fixture(args.hot_products)
+    modes = [("per-row", checkout_per_row), ("set-based", checkout_set_based)]
+    if args.mode != "both":
+        modes = [mode for mode in modes if mode[0] == args.mode]
+
+    print(f"{'mode':<10} {'orders':>8} {'conflicts':>10} {'seconds':>9} {'orders/s':>10}")
+    for name, checkout in modes:
+        if name == "set-based" and trigger_installed:
+            print("set-based  skipped: apply migration 001 first (the trigger would decrement twice)")
+            continue
+        completed, conflicts, elapsed = run_buyers(checkout, args, customer, products, trigger_installed)
+        print(f"{name:<10} {completed:>8} {conflicts:>10} {elapsed:>9.2f} {completed / elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Compare peak Python memory of execute_query (fetchall) against stream_query.
+
+Both walk the same result set and sum a column, e.g.
+
+    python benchmarks/bench_stream.py --query "SELECT * FROM order_items" --chunk-size 1000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from database import db  # noqa: E402
+
+
+def measure(label, consume):
+    """Run `consume()` and print its row count, elapsed time and peak traced memory."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = consume()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<20} {rows:>10} {elapsed * 1000:>12.1f} {peak / (1024 * 1024):>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--query", default="SELECT * FROM order_items")
+    parser.add_argument("--column", default="total_price")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    def fetch_all():
+        total = 0
+        rows = db.execute_query(args.query)
+        for row in rows:
+            total += row[args.column] or 0
+        return len(rows)
+
+    def stream(batches):
+        def consume():
+            count = total = 0
+            for item in db.stream_query(args.query, chunk_size=args.chunk_size, batches=batches):
+                for row in (item if batches else (item,)):
+                    total += row[args.column] or 0
+                    count += 1
+            return count
+        return consume
+
+    print(f"{'mode':<20} {'rows':>10} {'time (ms)':>12} {'peak (MiB)':>12}")
+    measure("fetchall", fetch_all)
+    measure("stream rows", stream(False))
+    measure("stream batches", stream(True))
+    db.close_connection()
+
+
+if __name__ == "__main__":
+    main()
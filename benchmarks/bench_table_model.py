@@ -0,0 +1,119 @@
+"""Compare QTableWidget against ColumnTableView for an orders-sized admin table.
+
+Each (mode, size) runs in a fresh interpreter on the offscreen Qt platform, with
+generated rows shaped like OrderManagement's query. "widget" fills a QTableWidget
+with one QTableWidgetItem per cell from dict rows, as the admin pages used to;
+"model" hands a ColumnarResult to a ColumnTableView. The script reports the time
+until the table is painted, the peak resident memory added by the table, and for
+the model the time to sort every row by username, e.g.
+
+    python benchmarks/bench_table_model.py --sizes 10000 100000 1000000
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TABLE_SCRIPT = """
+import resource, sys, time
+from datetime import datetime, timedelta
+import numpy as np
+from PyQt5.QtWidgets import QApplication, QTableWidget, QTableWidgetItem
+from PyQt5.QtCore import Qt
+from database.columnar import ColumnarResult
+from models import ColumnTableView
+
+mode, count = sys.argv[1], int(sys.argv[2])
+app = QApplication(sys.argv)
+rng = np.random.default_rng(1)
+statuses = np.array(["Pending", "Shipped", "Delivered", "Canceled"], dtype=object)
+columns = {
+    "order_id": np.arange(1, count + 1, dtype=np.int64),
+    "username": np.array([f"user{i:06d}" for i in rng.integers(0, 50000, count)], dtype=object),
+    "total_amount": rng.integers(100, 100000, count) / 100,
+    "order_date": np.datetime64("2024-01-01T00:00:00", "us") + rng.integers(0, 365 * 86400, count).astype("timedelta64[s]"),
+    "shipping_address": np.array([f"{i} Main St Springfield US 12345" for i in rng.integers(1, 9999, count)], dtype=object),
+    "delivery_status": statuses[rng.integers(0, 4, count)],
+    "status_updated_date": np.full(count, np.datetime64("NaT"), dtype="datetime64[us]"),
+}
+keys = list(columns)
+
+if mode == "widget":
+    # What execute_query returned: one dict per row
+    data = [dict(zip(keys, values)) for values in zip(*(columns[key].tolist() for key in keys))]
+else:
+    data = ColumnarResult(columns, {"total_amount": 2}, count)
+
+def peak_kib():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+baseline = peak_kib()
+start = time.perf_counter()
+if mode == "widget":
+    table = QTableWidget()
+    table.setColumnCount(len(keys))
+    table.setRowCount(len(data))
+    for row_idx, row in enumerate(data):
+        table.setItem(row_idx, 0, QTableWidgetItem(str(row["order_id"])))
+        table.setItem(row_idx, 1, QTableWidgetItem(row["username"]))
+        table.setItem(row_idx, 2, QTableWidgetItem(f"${row['total_amount']:.2f}"))
+        table.setItem(row_idx, 3, QTableWidgetItem(str(row["order_date"])))
+        table.setItem(row_idx, 4, QTableWidgetItem(row["shipping_address"]))
+        table.setItem(row_idx, 5, QTableWidgetItem(row["delivery_status"]))
+        table.setItem(row_idx, 6, QTableWidgetItem(str(row["status_updated_date"])))
+else:
+    table = ColumnTableView([(key, key) for key in keys],
+                            formatters={"total_amount": lambda amount: f"${amount:.2f}"})
+    table.set_result(data)
+table.resize(1400, 800)
+table.show()
+app.processEvents()
+loaded = (time.perf_counter() - start) * 1000
+
+sort_ms = 0.0
+if mode == "model":
+    start = time.perf_counter()
+    table.sortByColumn(1, Qt.AscendingOrder)
+    app.processEvents()
+    sort_ms = (time.perf_counter() - start) * 1000
+
+print(f"RESULT {loaded:.3f} {(peak_kib() - baseline) / 1024:.1f} {sort_ms:.3f}", flush=True)
+"""
+
+
+def run_table(mode, count, env):
+    """Return (load ms, added peak MiB, sort ms) for one mode in a fresh interpreter."""
+    output = subprocess.run(
+        [sys.executable, "-c", TABLE_SCRIPT, mode, str(count)],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    for line in output.splitlines():
+        if line.startswith("RESULT "):
+            load_ms, peak_mib, sort_ms = map(float, line.split()[1:])
+            return load_ms, peak_mib, sort_ms
+    raise RuntimeError(f"Table script did not report a result:\n{output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--widget-max-rows", type=int, default=100000,
+                        help="Skip the QTableWidget run above this many rows (it takes minutes and GBs).")
+    args = parser.parse_args()
+
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    print(f"{'rows':>9} {'mode':<7} {'load (ms)':>11} {'peak (MiB)':>11} {'sort (ms)':>10}")
+    for count in args.sizes:
+        for mode in ("widget", "model"):
+            if mode == "widget" and count > args.widget_max_rows:
+                print(f"{count:>9} {mode:<7} {'skipped':>11}")
+                continue
+            load_ms, peak_mib, sort_ms = run_table(mode, count, env)
+            sort_text = f"{sort_ms:.1f}" if mode == "model" else "-"
+            print(f"{count:>9} {mode:<7} {load_ms:>11.1f} {peak_mib:>11.1f} {sort_text:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""Compare the "Top-Selling Product per State" plans on generated data.
+
+For each size, a scratch schema (orders, order_items, addresses, products with the
+columns the queries read, plus a sales_daily_product_state rollup built from them) is
+filled with random data. The old correlated-subquery plan and the single-pass ranked
+plan execute against it, and a SalesCube (what SalesPerformance now answers from) is
+built from the rollup. The script asserts that all three return the same rows (ties
+included), then reports the timings; the cube is timed building and answering. The
+application's own tables are never touched, e.g.
+
+    python benchmarks/bench_top_selling.py --sizes 10000 100000 1000000 --states 50
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from decimal import Decimal
+
+import mysql.connector
+from mysql.connector import Error, errorcode
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from database.database import DB_CONFIG  # noqa: E402
+from database.columnar import build_columns  # noqa: E402
+from analytics_report.sales_cube import SalesCube  # noqa: E402
+
+# The plan SalesPerformance used originally: the HAVING subquery re-aggregates a state's
+# sales for every (state, product) group
+LEGACY_QUERY = """
+SELECT a.state, p.product_name, SUM(oi.total_price) AS total_sales
+FROM order_items oi
+JOIN orders o ON oi.order_id = o.order_id
+JOIN addresses a ON o.shipping_address_id = a.address_id
+JOIN products p ON oi.product_id = p.product_id
+GROUP BY a.state, p.product_name
+HAVING
+    total_sales = (
+        SELECT MAX(state_sales)
+        FROM (
+            SELECT a_inner.state AS state, p_inner.product_name AS product_name, SUM(oi_inner.total_price) AS state_sales
+            FROM order_items oi_inner
+            JOIN orders o_inner ON oi_inner.order_id = o_inner.order_id
+            JOIN addresses a_inner ON o_inner.shipping_address_id = a_inner.address_id
+            JOIN products p_inner ON oi_inner.product_id = p_inner.product_id
+            WHERE a_inner.state = a.state
+            GROUP BY a_inner.state, p_inner.product_name
+        ) AS state_sales_table
+    )
+ORDER BY total_sales DESC
+"""
+
+# Single-pass plan over the base tables: aggregate once, keep RANK() = 1 per state
+RANKED_QUERY = """
+SELECT state, product_name, total_sales
+FROM (
+    SELECT
+        a.state,
+        p.product_name,
+        SUM(oi.total_price) AS total_sales,
+        RANK() OVER (PARTITION BY a.state ORDER BY SUM(oi.total_price) DESC) AS sales_rank
+    FROM order_items oi
+    JOIN orders o ON oi.order_id = o.order_id
+    JOIN addresses a ON o.shipping_address_id = a.address_id
+    JOIN products p ON oi.product_id = p.product_id
+    GROUP BY a.state, p.product_name
+) ranked
+WHERE sales_rank = 1
+"""
+
+# The scratch orders carry no dates, so the rollup holds a single (NULL) day
+BUILD_ROLLUP = """
+INSERT INTO sales_daily_product_state (product_id, state, total_sales)
+SELECT oi.product_id, a.state, SUM(oi.total_price)
+FROM order_items oi
+JOIN orders o ON o.order_id = oi.order_id
+LEFT JOIN addresses a ON a.address_id = o.shipping_address_id
+GROUP BY oi.product_id, a.state
+"""
+
+# The scratch rollup only carries total_sales; the other cube measures are filled in
+CUBE_FACTS_QUERY = """
+SELECT sales_date, product_id, state, 0 AS line_count, total_sales, total_sales AS max_line_total
+FROM sales_daily_product_state
+"""
+
+CUBE_PRODUCTS_QUERY = "SELECT product_id, product_name, 0.00 AS price FROM products"
+
+SCHEMA = [
+    """CREATE TABLE products (
+        product_id INT AUTO_INCREMENT PRIMARY KEY,
+        product_name VARCHAR(100) NOT NULL
+    )""",
+    """CREATE TABLE addresses (
+        address_id INT AUTO_INCREMENT PRIMARY KEY,
+        state VARCHAR(100) NOT NULL
+    )""",
+    """CREATE TABLE orders (
+        order_id INT AUTO_INCREMENT PRIMARY KEY,
+        shipping_address_id INT,
+        KEY (shipping_address_id)
+    )""",
+    """CREATE TABLE order_items (
+        order_item_id INT AUTO_INCREMENT PRIMARY KEY,
+        order_id INT NOT NULL,
+        product_id INT,
+        total_price DECIMAL(10, 2) NOT NULL,
+        KEY (order_id),
+        KEY (product_id)
+    )""",
+    """CREATE TABLE sales_daily_product_state (
+        rollup_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+        sales_date DATE NULL,
+        product_id INT NOT NULL,
+        state VARCHAR(100) NULL,
+        total_sales DECIMAL(14, 2) NOT NULL,
+        KEY (product_id, state)
+    )""",
+]
+
+INSERT_BATCH = 5000
+
+
+def insert_rows(conn, cursor, query, rows):
+    for start in range(0, len(rows), INSERT_BATCH):
+        cursor.executemany(query, rows[start:start + INSERT_BATCH])
+    conn.commit()
+
+
+def generate(conn, cursor, items, args, rng):
+    """Recreate the scratch tables and fill them with `items` order lines."""
+    for table in ("sales_daily_product_state", "order_items", "orders", "addresses", "products"):
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+    for statement in SCHEMA:
+        cursor.execute(statement)
+
+    orders = max(1, items // args.items_per_order)
+    insert_rows(conn, cursor, "INSERT INTO products (product_name) VALUES (%s)",
+                [(f"Product {i:04d}",) for i in range(1, args.products + 1)])
+    insert_rows(conn, cursor, "INSERT INTO addresses (state) VALUES (%s)",
+                [(f"State {rng.randrange(args.states):02d}",) for _ in range(args.addresses)])
+    insert_rows(conn, cursor, "INSERT INTO orders (shipping_address_id) VALUES (%s)",
+                [(rng.randint(1, args.addresses),) for _ in range(orders)])
+    # Prices in whole multiples of 5 so per-state totals tie now and then
+    insert_rows(conn, cursor, "INSERT INTO order_items (order_id, product_id, total_price) VALUES (%s, %s, %s)",
+                [(rng.randint(1, orders), rng.randint(1, args.products), Decimal(rng.randrange(5, 205, 5)))
+                 for _ in range(items)])
+    cursor.execute(BUILD_ROLLUP)
+    conn.commit()
+    cursor.execute("ANALYZE TABLE products, addresses, orders, order_items, sales_daily_product_state")
+    cursor.fetchall()
+
+
+def run_plan(cursor, query, max_seconds):
+    """Return (sorted rows, seconds), or (None, None) if the plan hit the time limit."""
+    cursor.execute(f"SET SESSION max_execution_time = {int(max_seconds * 1000)}")
+    start = time.perf_counter()
+    try:
+        cursor.execute(query)
+        rows = cursor.fetchall()
+    except Error as e:
+        if e.errno == errorcode.ER_QUERY_TIMEOUT:
+            return None, None
+        raise
+    return sorted(rows), time.perf_counter() - start
+
+
+def fetch_columns(cursor, query):
+    cursor.execute(query)
+    return build_columns(cursor.description, cursor.fetchall(), exact_decimals=True)
+
+
+def run_cube(cursor):
+    """Return (sorted rows, seconds) for the cube view, including loading and building the cube."""
+    start = time.perf_counter()
+    cube = SalesCube(fetch_columns(cursor, CUBE_FACTS_QUERY), fetch_columns(cursor, CUBE_PRODUCTS_QUERY))
+    result = cube.top_selling_per_state()
+    cents = 10 ** cube.money_scale
+    rows = [(state, name, Decimal(round(sales * cents)) / cents)
+            for state, name, sales in zip(result["state"], result["product_name"], result["total_sales"].tolist())]
+    return sorted(rows), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000],
+                        help="Numbers of order_items rows to generate.")
+    parser.add_argument("--states", type=int, default=50)
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--addresses", type=int, default=5000)
+    parser.add_argument("--items-per-order", type=int, default=3)
+    parser.add_argument("--max-seconds", type=float, default=600, help="Per-query time limit.")
+    parser.add_argument("--schema", default="bench_top_selling", help="Scratch database, dropped afterwards.")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch database.")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    conn = mysql.connector.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+    cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{args.schema}`")
+    cursor.execute(f"USE `{args.schema}`")
+
+    print(f"{'order_items':>12} {'rows':>6} {'ties':>5} {'old (ms)':>10} {'ranked (ms)':>12} {'cube (ms)':>10}")
+    try:
+        for items in args.sizes:
+            generate(conn, cursor, items, args, rng)
+            new_rows, new_time = run_plan(cursor, RANKED_QUERY, args.max_seconds)
+            cube_rows, cube_time = run_cube(cursor)
+            old_rows, old_time = run_plan(cursor, LEGACY_QUERY, args.max_seconds)
+            if new_rows is None:
+                raise SystemExit(f"Ranked plan exceeded {args.max_seconds:.0f}s at {items} rows.")
+
+            assert cube_rows == new_rows, f"Sales cube disagrees with the ranked plan at {items} rows"
+            if old_rows is not None:
+                assert old_rows == new_rows, (
+                    f"Plans disagree at {items} rows: "
+                    f"only old {sorted(set(old_rows) - set(new_rows))[:5]}, "
+                    f"only new {sorted(set(new_rows) - set(old_rows))[:5]}"
+                )
+            ties = len(new_rows) - len({row[0] for row in new_rows})
+            old_ms = f"{old_time * 1000:.1f}" if old_rows is not None else "timeout"
+            print(f"{items:>12} {len(new_rows):>6} {ties:>5} {old_ms:>10} "
+                  f"{new_time * 1000:>12.1f} {cube_time * 1000:>10.1f}")
+    finally:
+        if not args.keep:
+            cursor.execute(f"DROP DATABASE IF EXISTS `{args.schema}`")
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,11 @@
-from .config import WINDOW_X, WINDOW_Y, WINDOW_WIDTH, WINDOW_HEIGHT
+from .config import (
+    WINDOW_X, WINDOW_Y, WINDOW_WIDTH, WINDOW_HEIGHT, ADMIN_PREFETCH, ADMIN_PREFETCH_DELAY_MS, TABLE_FETCH_BATCH,
+    SEARCH_DEBOUNCE_MS, USER_INDEX_MAX_ROWS, DEBUG_LOGGING,
+)
 from .settings import load_stylesheet
 
-__all__ = ["WINDOW_X", "WINDOW_Y", "WINDOW_WIDTH", "WINDOW_HEIGHT", "load_stylesheet"]
+__all__ = [
+    "WINDOW_X", "WINDOW_Y", "WINDOW_WIDTH", "WINDOW_HEIGHT",
+    "ADMIN_PREFETCH", "ADMIN_PREFETCH_DELAY_MS", "TABLE_FETCH_BATCH",
+    "SEARCH_DEBOUNCE_MS", "USER_INDEX_MAX_ROWS", "DEBUG_LOGGING", "load_stylesheet",
+]
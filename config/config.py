@@ -2,3 +2,22 @@ WINDOW_X = 100
 WINDOW_Y = 100    
 WINDOW_WIDTH = 1440  
 WINDOW_HEIGHT = 900  
+
+# Print [TIMING]/[DEBUG] diagnostics (page and sales cube build times, failed analytics
+# tab loads, the switch to server-side user search)
+DEBUG_LOGGING = False
+
+# Admin dashboard pages are built on first visit; after each switch the next
+# sidebar page is built once the UI has been idle for this long
+ADMIN_PREFETCH = True
+ADMIN_PREFETCH_DELAY_MS = 300
+
+# Rows handed to an admin table view per fetchMore (the rest load as it scrolls)
+TABLE_FETCH_BATCH = 500
+
+# Search boxes (User Management, the product catalog) search as you type once the
+# input has been idle this long
+SEARCH_DEBOUNCE_MS = 150
+# Above this many users (table statistics' estimate) the search runs on the server
+# (FULLTEXT) instead of over an in-memory index of the whole user list
+USER_INDEX_MAX_ROWS = 2000000
@@ -9,11 +9,13 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt
 from config import WINDOW_X, WINDOW_Y, WINDOW_WIDTH, WINDOW_HEIGHT
 from database import db 
+from database.rollups import reset_sales_watermark
+from auth.session import load_session
 
 class AddressManagement(QWidget):
-    def __init__(self, username):
+    def __init__(self, session):
         super().__init__()
-        self.username = username
+        self.session = session
         self.current_address_id = None  # For tracking the address being edited
         self.initUI()
 
@@ -113,10 +115,10 @@ class AddressManagement(QWidget):
         query = """
         SELECT address_id, street, city, state, postal_code, country
         FROM addresses
-        WHERE user_id = (SELECT user_id FROM users WHERE username = %s)
+        WHERE user_id = %s
         ORDER BY address_id;
         """
-        cursor.execute(query, (self.username,))
+        cursor.execute(query, (self.session.user_id,))
         rows = cursor.fetchall()
 
         self.address_table.setRowCount(len(rows))
@@ -175,20 +177,23 @@ class AddressManagement(QWidget):
         cursor = conn.cursor()
 
         if self.current_address_id:
+            conn.start_transaction()
             query = """
             UPDATE addresses
             SET street = %s, city = %s, state = %s, postal_code = %s, country = %s
             WHERE address_id = %s
             """
             cursor.execute(query, (street, city, state, postal_code, country, self.current_address_id))
+            reset_sales_watermark(cursor)  # past orders may now ship to another state
         else:
             query = """
             INSERT INTO addresses (user_id, street, city, state, postal_code, country)
-            VALUES ((SELECT user_id FROM users WHERE username = %s), %s, %s, %s, %s, %s)
+            VALUES (%s, %s, %s, %s, %s, %s)
             """
-            cursor.execute(query, (self.username, street, city, state, postal_code, country))
+            cursor.execute(query, (self.session.user_id, street, city, state, postal_code, country))
 
         conn.commit()
+        db.invalidate_tables("addresses")
         QMessageBox.information(self, "Success", "Address saved successfully.")
         self.load_addresses()
         self.clear_fields()
@@ -214,8 +219,11 @@ class AddressManagement(QWidget):
         if reply == QMessageBox.Yes:
             conn = db.get_db_connection()
             cursor = conn.cursor()
+            conn.start_transaction()
             cursor.execute("DELETE FROM addresses WHERE address_id = %s", (address_id,))
+            reset_sales_watermark(cursor)
             conn.commit()
+            db.invalidate_tables("addresses")
             QMessageBox.information(self, "Deleted", "Address deleted successfully.")
             self.load_addresses()
             cursor.close()
@@ -223,6 +231,6 @@ class AddressManagement(QWidget):
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
-    window = AddressManagement("test_user")
+    window = AddressManagement(load_session("test_user"))
     window.show()
     sys.exit(app.exec_())
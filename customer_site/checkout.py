@@ -0,0 +1,147 @@
+from decimal import Decimal
+
+ORDER_QUERY = """
+INSERT INTO orders (user_id, total_amount, shipping_address_id, delivery_status, status_updated_date)
+VALUES (%s, %s, %s, 'Pending', NOW())
+"""
+
+ORDER_ITEMS_QUERY = """
+INSERT INTO order_items (order_id, product_id, quantity, unit_price, total_price)
+VALUES {rows}
+"""
+
+ORDER_ITEM_PLACEHOLDER = "(%s, %s, %s, %s, %s)"
+
+# Rows are locked in product_id order so concurrent checkouts cannot deadlock each other
+LOCK_STOCK_QUERY = """
+SELECT inventory_id, product_id, stock_quantity
+FROM inventory
+WHERE product_id IN ({ids})
+ORDER BY product_id, inventory_id
+FOR UPDATE
+"""
+
+DECREMENT_STOCK_QUERY = """
+UPDATE inventory i
+JOIN ({rows}) d ON d.inventory_id = i.inventory_id
+SET i.stock_quantity = i.stock_quantity - d.quantity
+"""
+
+DECREMENT_ROW = "SELECT %s AS inventory_id, %s AS quantity"
+
+STOCK_TRIGGER_QUERY = """
+SELECT COUNT(*) FROM information_schema.TRIGGERS
+WHERE TRIGGER_SCHEMA = DATABASE() AND TRIGGER_NAME = 'update_stock_after_order'
+"""
+
+# Set once the trigger has been seen missing; nothing creates it again after migration 001
+_stock_trigger_dropped = False
+
+class OutOfStockError(Exception):
+    """Raised when a cart line asks for more units than are in stock. Nothing is written."""
+
+    def __init__(self, shortages):
+        self.shortages = shortages  # {product_id: (requested, available)}
+        products = ", ".join(str(product_id) for product_id in shortages)
+        super().__init__(f"Not enough stock available for product(s) {products}")
+
+
+def order_total(cart):
+    """Return the total amount of a cart ({product_id: {"price", "quantity", ...}})."""
+    return sum((Decimal(str(item["price"])) * item["quantity"] for item in cart.values()), Decimal("0"))
+
+
+def stock_trigger_installed(cursor):
+    """Return True while the update_stock_after_order trigger (dropped by migration 001) exists.
+
+    Only the trigger's absence is cached. Migration 001 may run while the app is up,
+    so while the trigger exists every checkout checks again; once it is gone, no
+    checkout queries information_schema.
+    """
+    global _stock_trigger_dropped
+    if _stock_trigger_dropped:
+        return False
+    cursor.execute(STOCK_TRIGGER_QUERY)
+    installed = cursor.fetchone()[0] > 0
+    _stock_trigger_dropped = not installed
+    return installed
+
+
+def reserve_stock(cursor, cart):
+    """Lock the cart's inventory rows and decrement them with one UPDATE.
+
+    Raises OutOfStockError, before anything is changed, if any line is short.
+    """
+    product_ids = sorted(cart)
+    cursor.execute(LOCK_STOCK_QUERY.format(ids=", ".join(["%s"] * len(product_ids))), product_ids)
+
+    stock_rows = {}
+    for inventory_id, product_id, stock_quantity in cursor.fetchall():
+        stock_rows.setdefault(product_id, []).append((inventory_id, stock_quantity))
+
+    shortages = {}
+    decrements = []
+    for product_id in product_ids:
+        needed = cart[product_id]["quantity"]
+        rows = stock_rows.get(product_id, [])
+        available = sum(max(0, stock) for _, stock in rows)
+        if available < needed:
+            shortages[product_id] = (needed, available)
+            continue
+        # A product may have several inventory records; take from them in order
+        for inventory_id, stock in rows:
+            take = min(needed, max(0, stock))
+            if take:
+                decrements.append((inventory_id, take))
+                needed -= take
+            if not needed:
+                break
+
+    if shortages:
+        raise OutOfStockError(shortages)
+
+    if decrements:
+        params = [value for decrement in decrements for value in decrement]
+        derived = " UNION ALL ".join([DECREMENT_ROW] * len(decrements))
+        cursor.execute(DECREMENT_STOCK_QUERY.format(rows=derived), params)
+
+
+def place_order(conn, user_id, address_id, cart, commit=True):
+    """Reserve stock, then insert an order and all of its lines; return the new order_id.
+
+    Everything happens in one transaction: stock for the whole cart is locked and
+    decremented set-based, and the order lines go in a single multi-row INSERT. On
+    any error (including OutOfStockError) the transaction is rolled back and the
+    error re-raised.
+    """
+    if not cart:
+        raise ValueError("Cannot place an order with an empty cart.")
+
+    cursor = conn.cursor()
+    try:
+        if conn.in_transaction:
+            conn.rollback()  # Drop the implicit read snapshot before starting a write transaction
+        conn.start_transaction()
+        legacy_trigger = stock_trigger_installed(cursor)
+
+        if not legacy_trigger:
+            reserve_stock(cursor, cart)
+
+        cursor.execute(ORDER_QUERY, (user_id, order_total(cart), address_id))
+        order_id = cursor.lastrowid
+
+        params = []
+        for product_id, item in cart.items():
+            unit_price = Decimal(str(item["price"]))
+            params.extend((order_id, product_id, item["quantity"], unit_price, unit_price * item["quantity"]))
+        placeholders = ", ".join([ORDER_ITEM_PLACEHOLDER] * len(cart))
+        cursor.execute(ORDER_ITEMS_QUERY.format(rows=placeholders), params)
+
+        if commit:
+            conn.commit()
+        return order_id
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
@@ -4,15 +4,15 @@ from PyQt5.QtWidgets import (
     QTableWidget, QTableWidgetItem, QHeaderView, QLineEdit, QFormLayout,
     QMessageBox
 )
-from PyQt5.QtCore import Qt
 from database import db
+from database.rollups import reset_sales_watermark
+from auth.session import load_session
 
 
 class MyAccount(QWidget):
-    def __init__(self, username):
+    def __init__(self, session):
         super().__init__()
-        self.username = username
-        self.current_user_id = None  # 유저 ID 저장용
+        self.session = session
         self.initUI()
 
     def initUI(self):
@@ -54,6 +54,7 @@ class MyAccount(QWidget):
 
         self.password_input = QLineEdit()
         self.password_input.setEchoMode(QLineEdit.Password)
+        self.password_input.setPlaceholderText("Leave blank to keep the current password")
         self.password_input.setFixedWidth(400)
         form_layout.addRow("Password:", self.password_input)
 
@@ -86,48 +87,24 @@ class MyAccount(QWidget):
         self.save_button.clicked.connect(self.save_changes)
 
     def load_user_info(self):
-        """Load user information from the database into the table."""
-        conn = db.get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-
-        query = """
-        SELECT user_id, username, password, email, first_name, last_name, phone_number
-        FROM users WHERE username = %s
-        """
-        cursor.execute(query, (self.username,))
-        user = cursor.fetchone()
-        cursor.close()
-
-        if not user:
-            QMessageBox.warning(self, "Error", "Failed to fetch user data from the database.")
-            print("[DEBUG] No user data found in database.")  # Debugging
-            return
-
-        print(f"[DEBUG] Loaded user: {user}")  # Debugging
-
+        """Show the user's details from the session profile (no database round trip)."""
+        profile = self.session.profile
         self.user_table.setRowCount(1)
-        self.current_user_id = user["user_id"]
 
         user_data = [
-            str(user["user_id"]),
-            user["username"],
-            "*" * len(user["password"]),  # Display masked password
-            user["email"],
-            user["first_name"],
-            user["last_name"],
-            user["phone_number"]
+            str(self.session.user_id),
+            self.session.username,
+            "********",  # The password is not kept in the session
+            profile.get("email"),
+            profile.get("first_name"),
+            profile.get("last_name"),
+            profile.get("phone_number")
         ]
 
         for col, value in enumerate(user_data):
             if value is None:
                 value = ""  # Handle None values to prevent issues
-
-            item = QTableWidgetItem(value)
-
-            if col == 2:  # Password column: Store real password in UserRole
-                item.setData(Qt.UserRole, user["password"])
-
-            self.user_table.setItem(0, col, item)
+            self.user_table.setItem(0, col, QTableWidgetItem(value))
 
     def load_selected_info(self):
         if self.user_table.rowCount() == 0:
@@ -153,8 +130,7 @@ class MyAccount(QWidget):
                 print("[DEBUG] One or more user_table items are None.")
                 return
 
-            raw_pw = password_item.data(Qt.UserRole)
-            self.password_input.setText(raw_pw if raw_pw else "")
+            self.password_input.clear()
             self.email_input.setText(email_item.text())
             self.first_name_input.setText(first_name_item.text())
             self.last_name_input.setText(last_name_item.text())
@@ -183,13 +159,16 @@ class MyAccount(QWidget):
         cursor = conn.cursor(dictionary=True)
 
         try:
-            query = """
-            UPDATE users
-            SET email = %s, password = %s, first_name = %s, last_name = %s, phone_number = %s
-            WHERE user_id = %s
-            """
-            cursor.execute(query, (email, password, first_name, last_name, phone, self.current_user_id))
+            fields = ["email = %s", "first_name = %s", "last_name = %s", "phone_number = %s"]
+            values = [email, first_name, last_name, phone]
+            if password:  # Blank keeps the current password
+                fields.append("password = %s")
+                values.append(password)
+            query = f"UPDATE users SET {', '.join(fields)} WHERE user_id = %s"
+            cursor.execute(query, (*values, self.session.user_id))
             conn.commit()
+            db.invalidate_tables("users")
+            self.session.update_profile(email=email, first_name=first_name, last_name=last_name, phone_number=phone)
             QMessageBox.information(self, "Success", "User details updated successfully.")
             self.load_user_info()  # Reload table with updated data
             self.clear_fields()    # Clear the form fields
@@ -217,11 +196,15 @@ class MyAccount(QWidget):
         cursor = conn.cursor()
         
         try:
-            cursor.execute("DELETE FROM users WHERE user_id = %s", (self.current_user_id,))
+            conn.start_transaction()
+            cursor.execute("DELETE FROM users WHERE user_id = %s", (self.session.user_id,))
+            reset_sales_watermark(cursor)  # the user's orders lose their customer and address
             conn.commit()
+            db.invalidate_tables("users")
             QMessageBox.information(self, "Account Deleted", "Your account has been successfully deleted.")
             self.logout()
         except Exception as e:
+            conn.rollback()
             QMessageBox.critical(self, "Error", f"Failed to delete account: {e}")
         finally:
             cursor.close()
@@ -241,10 +224,9 @@ class MyAccount(QWidget):
         self.first_name_input.clear()
         self.last_name_input.clear()
         self.phone_input.clear()
-        self.current_user_id = None
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
-    account = MyAccount("test_user")
+    account = MyAccount(load_session("test_user"))
     account.show()
     sys.exit(app.exec_())
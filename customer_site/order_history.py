@@ -4,13 +4,24 @@ from PyQt5.QtWidgets import (
     QPushButton, QHBoxLayout, QLabel, QHeaderView, QMessageBox
 )
 from PyQt5.QtGui import QFont
-from database import db
+from database import db, db_async
+from auth.session import load_session
+
+# Served by idx_orders_user_date (migration 004) without a filesort
+ORDER_HISTORY_QUERY = """
+SELECT o.order_id, o.total_amount, o.order_date, o.delivery_status,
+       CONCAT(a.street, ', ', a.city, ', ', a.state, ', ', a.country) AS shipping_address
+FROM orders o
+JOIN addresses a ON o.shipping_address_id = a.address_id
+WHERE o.user_id = %s
+ORDER BY o.order_date DESC
+"""
 
 
 class OrderHistory(QWidget):
-    def __init__(self, username):
+    def __init__(self, session):
         super().__init__()
-        self.username = username
+        self.session = session
         self.selected_order_id = None  
         self.selected_order_status = None  
         self.initUI()
@@ -25,7 +36,8 @@ class OrderHistory(QWidget):
         self.orders_table.setHorizontalHeaderLabels(["Order ID", "Total", "Date", "Status", "Shipping Address"])
         self.orders_table.setSelectionBehavior(QTableWidget.SelectRows) 
         self.orders_table.setFixedHeight(500)  
-        self.orders_table.cellClicked.connect(self.load_order_items)  
+        # Follows clicks and arrow keys alike
+        self.orders_table.currentCellChanged.connect(lambda row, column, *_: self.load_order_items(row, column))
         
         header_orders = self.orders_table.horizontalHeader()
         header_orders.setSectionResizeMode(QHeaderView.ResizeToContents)  
@@ -73,15 +85,7 @@ class OrderHistory(QWidget):
         conn = db.get_db_connection()
         cursor = conn.cursor(dictionary=True)
 
-        query = """
-        SELECT o.order_id, o.total_amount, o.order_date, o.delivery_status,
-               CONCAT(a.street, ', ', a.city, ', ', a.state, ', ', a.country) AS shipping_address
-        FROM orders o
-        JOIN addresses a ON o.shipping_address_id = a.address_id
-        WHERE o.user_id = (SELECT user_id FROM users WHERE username = %s)
-        ORDER BY o.order_date DESC
-        """
-        cursor.execute(query, (self.username,))
+        cursor.execute(ORDER_HISTORY_QUERY, (self.session.user_id,))
         orders = cursor.fetchall()
 
         self.orders_table.setRowCount(len(orders))
@@ -95,8 +99,15 @@ class OrderHistory(QWidget):
 
         cursor.close()
 
+        if orders:
+            # Load every order's line items in one query so moving between orders is instant
+            db_async.run(db.order_items.fetch, [order["order_id"] for order in orders],
+                         key=(self, "order_items_prefetch"))
+
     def load_order_items(self, row, _):
-        """Load order items from the database based on the selected order."""
+        """Show the selected order's items, from the order items cache when possible."""
+        if row < 0 or self.orders_table.item(row, 0) is None:
+            return  # Nothing selected, or the table is being refilled
         self.selected_order_id = int(self.orders_table.item(row, 0).text())
         self.selected_order_status = self.orders_table.item(row, 3).text()
 
@@ -105,18 +116,16 @@ class OrderHistory(QWidget):
         else:
             self.cancel_order_btn.setEnabled(False)
 
-        conn = db.get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-
-        query = """
-        SELECT p.product_name, oi.quantity, oi.unit_price, oi.total_price
-        FROM order_items oi
-        JOIN products p ON oi.product_id = p.product_id
-        WHERE oi.order_id = %s
-        """
-        cursor.execute(query, (self.selected_order_id,))
-        order_items = cursor.fetchall()
+        items = db.order_items.get(self.selected_order_id)
+        if items is not None:
+            db_async.cancel((self, "order_items"))
+            self.populate_order_items(items)
+        else:
+            db_async.run(db.order_items.items, self.selected_order_id,
+                         on_result=self.populate_order_items, key=(self, "order_items"))
 
+    def populate_order_items(self, order_items):
+        """Fill the order items table."""
         self.order_items_table.setRowCount(len(order_items))
 
         for row_idx, item in enumerate(order_items):
@@ -125,8 +134,6 @@ class OrderHistory(QWidget):
             self.order_items_table.setItem(row_idx, 2, QTableWidgetItem(f"${item['unit_price']:.2f}"))
             self.order_items_table.setItem(row_idx, 3, QTableWidgetItem(f"${item['total_price']:.2f}"))
 
-        cursor.close()
-
     def cancel_order(self):
         """Cancel the selected order if it is still Pending.  
         This method deletes the associated order items and updates the orders table:
@@ -146,6 +153,7 @@ class OrderHistory(QWidget):
         cursor = conn.cursor()
 
         try:
+            conn.start_transaction()
             # Delete all order items for the selected order.
             delete_items_query = "DELETE FROM order_items WHERE order_id = %s"
             cursor.execute(delete_items_query, (self.selected_order_id,))
@@ -160,6 +168,8 @@ class OrderHistory(QWidget):
             """
             cursor.execute(update_order_query, (self.selected_order_id,))
             conn.commit()
+            db.invalidate_tables("orders", "order_items")
+            db.order_items.invalidate(self.selected_order_id)
 
             QMessageBox.information(self, "Order Cancelled", "The order has been successfully cancelled.")
         except Exception as e:
@@ -175,6 +185,6 @@ class OrderHistory(QWidget):
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
-    window = OrderHistory("test_user")
+    window = OrderHistory(load_session("test_user"))
     window.show()
     sys.exit(app.exec_())
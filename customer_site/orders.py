@@ -1,20 +1,48 @@
 import sys
+import numpy as np
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-    QTableWidget, QTableWidgetItem, QMessageBox, QCheckBox, QLabel, QStackedWidget, QSpinBox,
-    QSpacerItem, QSizePolicy, QHeaderView
+    QTableWidget, QTableWidgetItem, QMessageBox, QCheckBox, QLabel, QStackedWidget,
+    QSpacerItem, QSizePolicy, QHeaderView, QLineEdit, QComboBox, QDoubleSpinBox, QTableView,
+    QAbstractItemView
 )
-from PyQt5.QtCore import Qt
-from database import db  
+from PyQt5.QtCore import Qt, QTimer
+from config import SEARCH_DEBOUNCE_MS
+from database import db, db_async
+from models import ColumnTableView, PrefixIndex, FacetIndex, CartModel, QuantityDelegate, RemoveButtonDelegate
+from auth.session import load_session
+from customer_site.checkout import OutOfStockError, place_order
+
+# Available products only (stock_quantity > 0)
+PRODUCTS_QUERY = """
+SELECT p.product_id, p.product_name, b.brand_name, p.price
+FROM products p
+LEFT JOIN inventory i ON p.product_id = i.product_id
+LEFT JOIN brands b ON p.brand_id = b.brand_id
+WHERE i.stock_quantity > 0
+ORDER BY p.product_id
+"""
+
+# Upper bound of the price filter spin boxes
+MAX_PRICE_FILTER = 1000000
+
+
+def build_catalog_index(products):
+    """Index a product ColumnarResult for name search and brand/price facets (run in the background)."""
+    return PrefixIndex(products, ["product_name"]), FacetIndex(products, ["brand_name"], ["price"])
+
 
 
 class Orders(QWidget):
-    def __init__(self, username):
+    def __init__(self, session):
         super().__init__()
-        self.username = username
-        self.cart = {}  
+        self.session = session
+        self.cart_model = CartModel(self)  # shared by the cart and the confirmation table
         self.selected_address = None  
+        self.name_index = None  # PrefixIndex over the catalog, once built
+        self.facet_index = None  # FacetIndex (brand, price) over the catalog, once built
         self.total_label = QLabel("Total: $0.00")  
+        self.cart_model.total_changed.connect(lambda total: self.total_label.setText(f"Total: ${total:.2f}"))
         self.initUI()  
 
     def initUI(self):
@@ -71,53 +99,108 @@ class Orders(QWidget):
         [self.btn_products, self.btn_shipping, self.btn_confirm][index].setChecked(True)
 
     def load_products(self):
-        """Load only available products (stock_quantity > 0)."""
-        conn = db.get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-
-        query = """
-        SELECT p.product_id, p.product_name, p.price
-        FROM products p
-        LEFT JOIN inventory i ON p.product_id = i.product_id
-        WHERE i.stock_quantity > 0
-        ORDER BY p.product_id
-        """
-
-        cursor.execute(query)
-        products = cursor.fetchall()
-
-        self.product_table.setRowCount(len(products))
-
-        for row_idx, product in enumerate(products):
-            checkbox_widget = QWidget()
-            layout = QHBoxLayout()
-            layout.setAlignment(Qt.AlignCenter)  
-            checkbox = QCheckBox()
-            layout.addWidget(checkbox)
-            layout.setContentsMargins(0, 0, 0, 0)  
-            checkbox_widget.setLayout(layout)
-            
-            self.product_table.setCellWidget(row_idx, 0, checkbox_widget)
-            self.product_table.setItem(row_idx, 1, QTableWidgetItem(product["product_name"]))
-            self.product_table.setItem(row_idx, 2, QTableWidgetItem(f"${product['price']:.2f}"))
-            self.product_table.setItem(row_idx, 3, QTableWidgetItem(str(product["product_id"])))
-
-        cursor.close()
+        """Load the available products in the background; the page opens without waiting."""
+        self.name_index = None
+        self.facet_index = None
+        self.catalog_label.setText("Loading products...")
+        db_async.submit(PRODUCTS_QUERY, on_result=self.populate_products, key=(self, "products"),
+                        fetch=db.fetch_columns)
+
+    def populate_products(self, products):
+        """Show the catalog (a ColumnarResult), then index it for search and facets."""
+        self.product_table.set_result(products)
+        self.catalog_label.setText(f"{products.row_count:,} products")
+        db_async.run(build_catalog_index, products, on_result=self.set_catalog_index, key=(self, "catalog_index"))
+
+    def set_catalog_index(self, indexes):
+        self.name_index, self.facet_index = indexes
+        self.brand_filter.blockSignals(True)
+        self.brand_filter.clear()
+        self.brand_filter.addItem("All Brands", None)
+        for brand, count in self.facet_index.counts("brand_name"):
+            self.brand_filter.addItem(f"{brand or 'No brand'} ({count:,})", brand)
+        self.brand_filter.blockSignals(False)
+        self.filter_products()
+
+    def filter_products(self):
+        """Apply the name search and the brand/price facets to the catalog, in memory."""
+        self.search_timer.stop()
+        if self.name_index is None:
+            return  # Applied once the catalog has been indexed
+
+        brand = self.brand_filter.currentData()
+        low = self.min_price.value() or None
+        high = self.max_price.value() or None
+        rows = self.name_index.search(self.search_input.text())
+        if brand is not None or low is not None or high is not None:
+            mask = self.facet_index.select(
+                categories={"brand_name": [brand]} if brand is not None else None,
+                ranges={"price": (low, high)},
+            )
+            rows = np.flatnonzero(mask) if rows is None else rows[mask[rows]]
+        self.product_table.set_row_filter(rows)
+        self.catalog_label.setText(f"{self.product_table.source_model.total_rows():,} products")
+
+    def reset_product_filters(self):
+        for widget in (self.search_input, self.brand_filter, self.min_price, self.max_price):
+            widget.blockSignals(True)
+        self.search_input.clear()
+        self.brand_filter.setCurrentIndex(0)
+        self.min_price.setValue(0)
+        self.max_price.setValue(0)
+        for widget in (self.search_input, self.brand_filter, self.min_price, self.max_price):
+            widget.blockSignals(False)
+        self.filter_products()
 
     def create_product_page(self):
         page = QWidget()
         layout = QHBoxLayout()  
         
-        # product table
+        # product filters (name search, brand and price range)
         product_layout = QVBoxLayout()
-        self.product_table = QTableWidget()
-        self.product_table.setColumnCount(4)  
-        self.product_table.setHorizontalHeaderLabels(["Select", "Product Name", "Price", "ID"])
-        self.product_table.setColumnHidden(3, True)  # ID
+        filter_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search products by name")
+        self.brand_filter = QComboBox()
+        self.brand_filter.addItem("All Brands", None)
+        self.min_price = QDoubleSpinBox()
+        self.max_price = QDoubleSpinBox()
+        for spinbox, label in ((self.min_price, "Min $"), (self.max_price, "Max $")):
+            spinbox.setRange(0, MAX_PRICE_FILTER)
+            spinbox.setDecimals(2)
+            spinbox.setSpecialValueText(label)  # Shown at 0, which means no bound
+        self.reset_filters_btn = QPushButton("Reset")
+        filter_layout.addWidget(self.search_input, stretch=2)
+        filter_layout.addWidget(self.brand_filter, stretch=1)
+        filter_layout.addWidget(self.min_price)
+        filter_layout.addWidget(self.max_price)
+        filter_layout.addWidget(self.reset_filters_btn)
+        product_layout.addLayout(filter_layout)
+
+        self.catalog_label = QLabel("")
+        product_layout.addWidget(self.catalog_label)
+
+        # product table; the checkbox sits in the name column
+        self.product_table = ColumnTableView(
+            [("product_name", "Product Name"), ("brand_name", "Brand"), ("price", "Price")],
+            formatters={"price": lambda price: f"${price:.2f}"},
+            check_key="product_id",
+        )
 
         header = self.product_table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.Stretch)  
-        
+
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_input.textChanged.connect(self.search_timer.start)
+        self.search_input.returnPressed.connect(self.filter_products)
+        self.search_timer.timeout.connect(self.filter_products)
+        self.brand_filter.currentIndexChanged.connect(self.filter_products)
+        self.min_price.valueChanged.connect(self.search_timer.start)
+        self.max_price.valueChanged.connect(self.search_timer.start)
+        self.reset_filters_btn.clicked.connect(self.reset_product_filters)
+
         self.load_products()
         product_layout.addWidget(self.product_table, stretch=2)
 
@@ -139,9 +222,12 @@ class Orders(QWidget):
 
         # cart table
         cart_layout = QVBoxLayout()
-        self.cart_table = QTableWidget()
-        self.cart_table.setColumnCount(5)  
-        self.cart_table.setHorizontalHeaderLabels(["Product Name", "Price", "Quantity", "Subtotal", "Remove"])
+        self.cart_table = QTableView()
+        self.cart_table.setModel(self.cart_model)
+        self.cart_table.setItemDelegateForColumn(CartModel.QUANTITY, QuantityDelegate(self.cart_table))
+        self.cart_table.setItemDelegateForColumn(
+            CartModel.REMOVE, RemoveButtonDelegate(self.remove_cart_row, self.cart_table))
+        self.cart_table.setEditTriggers(QAbstractItemView.AllEditTriggers)
         
         header_cart = self.cart_table.horizontalHeader()
         header_cart.setSectionResizeMode(QHeaderView.Stretch)  
@@ -160,77 +246,19 @@ class Orders(QWidget):
         return page
 
     def add_to_cart(self):
-        """Add selected products to the cart with quantity control."""
-        for row_idx in range(self.product_table.rowCount()):
-            checkbox_widget = self.product_table.cellWidget(row_idx, 0)  
-            if checkbox_widget:
-                checkbox = checkbox_widget.layout().itemAt(0).widget()  
+        """Add checked products to the cart with quantity control."""
+        products = self.product_table.source_model.result
+        for product_id in self.product_table.checked_values():
+            row = self.product_table.result_row("product_id", product_id)
+            if row is None:
+                continue
+            self.cart_model.add(product_id, products["product_name"][row], round(float(products["price"][row]), 2))
 
-                if checkbox and checkbox.isChecked():
-                    product_id = int(self.product_table.item(row_idx, 3).text())
-                    product_name = self.product_table.item(row_idx, 1).text()
-                    price = float(self.product_table.item(row_idx, 2).text().strip("$"))
-
-                    if product_id in self.cart:
-                        self.cart[product_id]["quantity"] += 1
-                    else:
-                        self.cart[product_id] = {"product_name": product_name, "price": price, "quantity": 1}
-                    
-                    checkbox.setChecked(False)  
-
-        self.update_cart_table()
-
-    def update_cart_table(self):
-        """Update cart table and total price."""
-        self.cart_table.setRowCount(len(self.cart))
-        total_price = 0
-
-        for row_idx, (product_id, item) in enumerate(self.cart.items()):
-            self.cart_table.setItem(row_idx, 0, QTableWidgetItem(item["product_name"]))
-            self.cart_table.setItem(row_idx, 1, QTableWidgetItem(f"${item['price']:.2f}"))
-
-            spinbox = QSpinBox()
-            spinbox.setValue(item["quantity"])
-            spinbox.setMinimum(1)
-            spinbox.setMaximum(99)
-            spinbox.valueChanged.connect(lambda value, pid=product_id: self.update_quantity(pid, value))
-            self.cart_table.setCellWidget(row_idx, 2, spinbox)
-
-            # Subtotal
-            subtotal = item["price"] * item["quantity"]
-            self.cart_table.setItem(row_idx, 3, QTableWidgetItem(f"${subtotal:.2f}"))
+        self.product_table.clear_checked()
 
-            # Remove
-            remove_btn = QPushButton("Remove")
-            remove_btn.setProperty("class", "standard") 
-            remove_btn.clicked.connect(lambda _, pid=product_id: self.remove_from_cart(pid))
-            self.cart_table.setCellWidget(row_idx, 4, remove_btn)
-
-            total_price += subtotal
-
-        self.total_label.setText(f"Total: ${total_price:.2f}")
-        self.total_label.repaint()
-    
-    def update_quantity(self, product_id, quantity):
-        """Update item quantity in cart and refresh total price."""
-        if product_id in self.cart:
-            print(f"[DEBUG] Updating Quantity for {self.cart[product_id]['product_name']} -> {quantity}")
-
-            if quantity > 0:
-                self.cart[product_id]["quantity"] = quantity
-            else:
-                print(f"[DEBUG] Removing {self.cart[product_id]['product_name']} from cart")
-                del self.cart[product_id]  
-
-            self.update_cart_table()  
-        else:
-            print(f"[ERROR] Product ID {product_id} not found in cart")
-
-    def remove_from_cart(self, product_id):
-        """Remove product from cart."""
-        if product_id in self.cart:
-            del self.cart[product_id]
-            self.update_cart_table()
+    def remove_cart_row(self, row):
+        """Remove product from cart (the Remove button of `row`)."""
+        self.cart_model.remove(self.cart_model.product_ids[row])
 
     def load_addresses(self):
         """Load user's addresses into the table."""
@@ -239,9 +267,9 @@ class Orders(QWidget):
 
         query = """
         SELECT address_id, street, city, state, postal_code, country FROM addresses 
-        WHERE user_id = (SELECT user_id FROM users WHERE username = %s)
+        WHERE user_id = %s
         """
-        cursor.execute(query, (self.username,))
+        cursor.execute(query, (self.session.user_id,))
         addresses = cursor.fetchall()
 
         print(f"[DEBUG] Total addresses fetched: {len(addresses)}") 
@@ -344,33 +372,23 @@ class Orders(QWidget):
 
     def create_order(self):
         """Insert order and order items into database."""
-        if not self.cart or not self.selected_address:
+        cart = self.cart_model.cart
+        if not cart or not self.selected_address:
             QMessageBox.warning(self, "Error", "Please select products and an address before confirming the order.")
             return
 
-        conn = db.get_db_connection()
-        cursor = conn.cursor()
-
-        total_amount = sum(item["price"] * item["quantity"] for item in self.cart.values())
-
-        # Step 1: Insert into orders table 
-        order_query = """
-        INSERT INTO orders (user_id, total_amount, shipping_address_id, delivery_status, status_updated_date)
-        VALUES ((SELECT user_id FROM users WHERE username = %s), %s, %s, 'Pending', NOW())
-        """
-        cursor.execute(order_query, (self.username, total_amount, self.selected_address['address_id']))  
-        order_id = cursor.lastrowid
-
-        # Step 2: Insert into order_items table
-        order_items_query = """
-        INSERT INTO order_items (order_id, product_id, quantity, unit_price, total_price)
-        VALUES (%s, %s, %s, %s, %s)
-        """
-        for product_id, item in self.cart.items():
-            cursor.execute(order_items_query, (order_id, product_id, item["quantity"], item["price"], item["price"] * item["quantity"]))
-
-        conn.commit()
-        cursor.close()
+        # Order and all of its lines are written in one transaction on a dedicated connection
+        try:
+            with db.connection() as conn:
+                place_order(conn, self.session.user_id, self.selected_address['address_id'], cart)
+        except OutOfStockError as e:
+            names = ", ".join(cart[product_id]["product_name"] for product_id in e.shortages)
+            QMessageBox.warning(self, "Out of Stock", f"Not enough stock available for: {names}")
+            return
+        except Exception as e:
+            QMessageBox.critical(self, "Database Error", f"Failed to place order: {e}")
+            return
+        db.invalidate_tables("orders", "order_items", "inventory")
 
         QMessageBox.information(self, "Order Confirmed", "Your order has been placed successfully.")
         self.reset_order_data()
@@ -380,13 +398,10 @@ class Orders(QWidget):
         """Reset order data when the Orders page is shown."""
         print("[DEBUG] Resetting order data...")
 
-        self.cart = {}
-        self.update_cart_table()
+        self.cart_model.clear()
 
         self.selected_address = None
 
-        self.order_table.setRowCount(0)
-        self.total_label.setText("Total: $0.00")
         self.address_label.setText("Selected Address: Not Chosen")
 
         for row_idx in range(self.address_table.rowCount()):
@@ -396,12 +411,7 @@ class Orders(QWidget):
                 if checkbox and isinstance(checkbox, QCheckBox):  
                     checkbox.setChecked(False)
 
-        for row_idx in range(self.product_table.rowCount()):
-            checkbox_widget = self.product_table.cellWidget(row_idx, 0)  
-            if checkbox_widget:
-                checkbox = checkbox_widget.layout().itemAt(0).widget()  
-                if checkbox and isinstance(checkbox, QCheckBox):  
-                    checkbox.setChecked(False)  
+        self.product_table.clear_checked()
                     
         print("[DEBUG] All order data has been reset.")
 
@@ -420,9 +430,11 @@ class Orders(QWidget):
         
         self.address_label = QLabel("Selected Address: Not Chosen")
         
-        self.order_table = QTableWidget()
-        self.order_table.setColumnCount(4)
-        self.order_table.setHorizontalHeaderLabels(["Product Name", "Quantity", "Unit Price", "Subtotal"])
+        # Same model as the cart, read-only and without the Remove column
+        self.order_table = QTableView()
+        self.order_table.setModel(self.cart_model)
+        self.order_table.setColumnHidden(CartModel.REMOVE, True)
+        self.order_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         
         header = self.order_table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.Stretch)  
@@ -445,7 +457,7 @@ class Orders(QWidget):
 
     def update_confirm_page(self):
         """Update the order confirmation page with selected items and address."""
-        if not self.cart:
+        if not self.cart_model.cart:
             QMessageBox.warning(self, "Error", "No items in cart!")
             return
 
@@ -459,29 +471,14 @@ class Orders(QWidget):
             f"{self.selected_address['postal_code']}, {self.selected_address['country']}"
         )
 
-        self.order_table.setRowCount(len(self.cart))
-        total_price = 0
-
-        for row_idx, (product_id, item) in enumerate(self.cart.items()):
-            self.order_table.setItem(row_idx, 0, QTableWidgetItem(item["product_name"]))  # product name 
-            self.order_table.setItem(row_idx, 1, QTableWidgetItem(str(item["quantity"])))  # quantity
-            self.order_table.setItem(row_idx, 2, QTableWidgetItem(f"${item['price']:.2f}"))  # unit price
-
-            subtotal = item["price"] * item["quantity"]
-            self.order_table.setItem(row_idx, 3, QTableWidgetItem(f"${subtotal:.2f}"))  # sub total
-            total_price += subtotal
-
-        self.total_label.setText(f"Total: ${total_price:.2f}")
-
+        # The table and total follow the cart model already
         header = self.order_table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.Stretch)  
         header.setMinimumSectionSize(50)
 
-        self.order_table.viewport().update()
-
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
-    order_window = Orders("test_user")
+    order_window = Orders(load_session("test_user"))
     order_window.show()
     sys.exit(app.exec_())
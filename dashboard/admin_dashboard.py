@@ -1,20 +1,31 @@
 import sys
+import time
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QPushButton, QHBoxLayout, 
     QStackedWidget, QLabel
 )
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+from auth.session import load_session
 from admin import AdminManagement, UserManagement, OrderManagement, BrandsSuppliersProducts, InventoryManagement
-from analytics_report import StockAnalysis, SalesPerformance, ProductInsights, CustomerOrders, MarketTrends
-from config import WINDOW_X, WINDOW_Y, WINDOW_WIDTH, WINDOW_HEIGHT
+import analytics_report
+from config import (
+    WINDOW_X, WINDOW_Y, WINDOW_WIDTH, WINDOW_HEIGHT, ADMIN_PREFETCH, ADMIN_PREFETCH_DELAY_MS, DEBUG_LOGGING,
+)
 
 class AdminDashboard(QWidget):
     logoutRequested = pyqtSignal()
 
-    def __init__(self, username):
+    def __init__(self, session, prefetch=ADMIN_PREFETCH):
         super().__init__()
-        self.username = username
+        self.session = session
+        self.username = session.username
+        self.prefetch_enabled = prefetch
+        self.created_at = time.perf_counter()
+        self.build_times = {}
         self.initUI()
+        if DEBUG_LOGGING:
+            # Fires once the first page is on screen and the event loop is free again
+            QTimer.singleShot(0, self.report_startup)
 
     def initUI(self):
         """Initialize Admin Dashboard with a sidebar navigation menu."""
@@ -69,31 +80,31 @@ class AdminDashboard(QWidget):
         self.btn_logout.clicked.connect(self.logout)
         self.sidebar.addWidget(self.btn_logout)
 
-        # Stacked Widget to manage different pages
+        # Pages are built on first navigation; until then a placeholder holds their slot
+        self.page_factories = [
+            AdminManagement,
+            UserManagement,
+            OrderManagement,
+            BrandsSuppliersProducts,
+            InventoryManagement,
+            # Resolved on first build so matplotlib/pandas are only imported when an analytics page is opened
+            lambda: analytics_report.StockAnalysis(),
+            lambda: analytics_report.SalesPerformance(),
+            lambda: analytics_report.ProductInsights(),
+            lambda: analytics_report.CustomerOrders(),
+            lambda: analytics_report.MarketTrends(),
+        ]
+        self.pages = [None] * len(self.page_factories)
+
         self.stacked_widget = QStackedWidget()
-        self.admin_mgmt_page = AdminManagement()
-        self.user_mgmt_page = UserManagement()
-        self.order_mgmt_page = OrderManagement()
-        self.product_mgmt_page = BrandsSuppliersProducts()
-        self.inventory_mgmt_page = InventoryManagement()
-
-        self.stock_analysis_page = StockAnalysis()
-        self.sales_performance_page = SalesPerformance()
-        self.product_insights_page = ProductInsights()
-        self.customer_orders_page = CustomerOrders()
-        self.market_trends_page = MarketTrends()
-
-        # Add pages to the stacked widget
-        self.stacked_widget.addWidget(self.admin_mgmt_page)
-        self.stacked_widget.addWidget(self.user_mgmt_page)
-        self.stacked_widget.addWidget(self.order_mgmt_page)
-        self.stacked_widget.addWidget(self.product_mgmt_page)
-        self.stacked_widget.addWidget(self.inventory_mgmt_page)
-        self.stacked_widget.addWidget(self.stock_analysis_page)
-        self.stacked_widget.addWidget(self.sales_performance_page)
-        self.stacked_widget.addWidget(self.product_insights_page)
-        self.stacked_widget.addWidget(self.customer_orders_page)
-        self.stacked_widget.addWidget(self.market_trends_page)
+        for _ in self.page_factories:
+            self.stacked_widget.addWidget(self.create_placeholder())
+
+        # Builds the next sidebar page while the UI is idle
+        self.prefetch_timer = QTimer(self)
+        self.prefetch_timer.setSingleShot(True)
+        self.prefetch_timer.timeout.connect(self.prefetch_next_page)
+        self.prefetch_index = None
 
         # Layout organization
         main_layout.addLayout(self.sidebar, 1)  
@@ -104,10 +115,51 @@ class AdminDashboard(QWidget):
         # Default screen
         self.switch_screen(0)
 
+    def create_placeholder(self):
+        """Lightweight stand-in shown until a page is built."""
+        placeholder = QLabel("Loading...")
+        placeholder.setAlignment(Qt.AlignCenter)
+        return placeholder
+
+    def ensure_page(self, index):
+        """Build the page at `index` if it does not exist yet and return it."""
+        if self.pages[index] is None:
+            start = time.perf_counter()
+            page = self.page_factories[index]()
+            self.build_times[index] = time.perf_counter() - start
+
+            placeholder = self.stacked_widget.widget(index)
+            self.stacked_widget.insertWidget(index, page)
+            self.stacked_widget.removeWidget(placeholder)
+            placeholder.deleteLater()
+            self.pages[index] = page
+            if DEBUG_LOGGING:
+                print(f"[TIMING] Built {type(page).__name__} in {self.build_times[index] * 1000:.1f} ms")
+        return self.pages[index]
+
+    def prefetch_next_page(self):
+        """Build the page most likely to be opened next (the one below in the sidebar)."""
+        if self.prefetch_index is not None and self.pages[self.prefetch_index] is None:
+            self.ensure_page(self.prefetch_index)
+        self.prefetch_index = None
+
+    def report_startup(self):
+        """Print how long the dashboard took to become interactive (with DEBUG_LOGGING)."""
+        elapsed = (time.perf_counter() - self.created_at) * 1000
+        built = sum(1 for page in self.pages if page is not None)
+        build_ms = sum(self.build_times.values()) * 1000
+        print(f"[TIMING] Admin dashboard interactive after {elapsed:.1f} ms "
+              f"({built}/{len(self.pages)} pages built, {build_ms:.1f} ms building pages)")
+
     def switch_screen(self, index):
         """Switch between different screens in the dashboard."""
+        self.ensure_page(index)
         self.stacked_widget.setCurrentIndex(index)
 
+        if self.prefetch_enabled and index + 1 < len(self.pages) and self.pages[index + 1] is None:
+            self.prefetch_index = index + 1
+            self.prefetch_timer.start(ADMIN_PREFETCH_DELAY_MS)
+
         for button in self.buttons:
             button.setProperty("class", "sidebar")
             button.style().unpolish(button)
@@ -123,6 +175,6 @@ class AdminDashboard(QWidget):
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
-    dashboard = AdminDashboard("admin_user")
+    dashboard = AdminDashboard(load_session("admin_user"))
     dashboard.show()
     sys.exit(app.exec_())
@@ -2,15 +2,17 @@ import sys
 from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QPushButton, QHBoxLayout, QStackedWidget, QLabel
 from PyQt5.QtCore import Qt, pyqtSignal
 from config import WINDOW_X, WINDOW_Y, WINDOW_WIDTH, WINDOW_HEIGHT
+from auth.session import load_session
 from customer_site import MyAccount, AddressManagement, Orders, OrderHistory
 
 
 class CustomerDashboard(QWidget):
     logoutRequested = pyqtSignal()
     
-    def __init__(self, username):
+    def __init__(self, session):
         super().__init__()
-        self.username = username
+        self.session = session
+        self.username = session.username
         self.initUI()
 
     def initUI(self):
@@ -51,10 +53,10 @@ class CustomerDashboard(QWidget):
         self.sidebar.addWidget(self.btn_logout)
 
         self.stacked_widget = QStackedWidget()
-        self.my_account_page = MyAccount(self.username)
-        self.address_management_page = AddressManagement(self.username)
-        self.orders_page = Orders(self.username)
-        self.order_history_page = OrderHistory(self.username)
+        self.my_account_page = MyAccount(self.session)
+        self.address_management_page = AddressManagement(self.session)
+        self.orders_page = Orders(self.session)
+        self.order_history_page = OrderHistory(self.session)
 
         self.stacked_widget.addWidget(self.my_account_page)
         self.stacked_widget.addWidget(self.address_management_page)
@@ -94,6 +96,6 @@ class CustomerDashboard(QWidget):
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
-    dashboard = CustomerDashboard("test_user")
+    dashboard = CustomerDashboard(load_session("test_user"))
     dashboard.show()
     sys.exit(app.exec_())
@@ -1 +1,2 @@
-from .database import db
\ No newline at end of file
+from .database import db
+from .async_query import db_async
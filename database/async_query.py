@@ -0,0 +1,106 @@
+import traceback
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from .database import db, DB_POOL_SIZE
+
+
+class QuerySignals(QObject):
+    """Signals emitted by a background query task."""
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+
+class QueryTask(QRunnable):
+    """Runs a callable (usually a database fetch) on a worker thread."""
+
+    def __init__(self, fn, args, kwargs):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.cancelled = False
+        self.signals = QuerySignals()
+
+    def cancel(self):
+        """Drop the result of this task. A task that has not started yet is skipped entirely."""
+        self.cancelled = True
+
+    def run(self):
+        if self.cancelled:
+            self.signals.finished.emit(None)
+            return
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            traceback.print_exc()
+            self.signals.failed.emit(str(e))
+            return
+        # Always emit so the executor can release the task; cancelled results are dropped there
+        self.signals.finished.emit(result)
+
+
+class AsyncQueryExecutor(QObject):
+    """Run database queries off the GUI thread and deliver results through Qt signals.
+
+    Results are delivered on the thread that submitted the task (the GUI thread).
+    Tasks submitted with the same `key` supersede each other: only the most recent
+    task's result is delivered, older ones are cancelled as stale.
+    """
+
+    def __init__(self, max_threads=None):
+        super().__init__()
+        self.thread_pool = QThreadPool()
+        # Leave one pooled connection for the GUI thread's own lease
+        self.thread_pool.setMaxThreadCount(max_threads or max(1, DB_POOL_SIZE - 1))
+        self._latest = {}
+        self._running = set()
+
+    def run(self, fn, *args, on_result=None, on_error=None, key=None, **kwargs):
+        """Run `fn(*args, **kwargs)` in the background and pass its return value to `on_result`."""
+        task = QueryTask(fn, args, kwargs)
+
+        if key is not None:
+            previous = self._latest.get(key)
+            if previous is not None:
+                self._cancel_task(previous)
+            self._latest[key] = task
+
+        task.signals.finished.connect(lambda result: self._deliver(task, key, on_result, result))
+        task.signals.failed.connect(lambda message: self._deliver(task, key, on_error, message))
+
+        self._running.add(task)
+        self.thread_pool.start(task)
+        return task
+
+    def submit(self, query, params=None, on_result=None, on_error=None, key=None, fetch=None):
+        """Execute `query` in the background. `fetch` defaults to db.execute_query."""
+        fetch = fetch or db.execute_query
+        return self.run(fetch, query, params, on_result=on_result, on_error=on_error, key=key)
+
+    def cancel(self, key):
+        """Cancel the pending task registered under `key`, if any."""
+        task = self._latest.pop(key, None)
+        if task is not None:
+            self._cancel_task(task)
+
+    def is_pending(self, key):
+        """Return True while a task registered under `key` has not delivered yet."""
+        return key in self._latest
+
+    def _cancel_task(self, task):
+        task.cancel()
+        if self.thread_pool.tryTake(task):
+            self._running.discard(task)
+
+    def _deliver(self, task, key, callback, payload):
+        self._running.discard(task)
+        if key is not None:
+            if self._latest.get(key) is not task:
+                return  # Superseded by a newer request
+            del self._latest[key]
+        if task.cancelled or callback is None:
+            return
+        callback(payload)
+
+
+db_async = AsyncQueryExecutor()
@@ -0,0 +1,127 @@
+from decimal import Decimal
+from mysql.connector import FieldType
+
+INTEGER_TYPES = {
+    FieldType.TINY, FieldType.SHORT, FieldType.LONG,
+    FieldType.LONGLONG, FieldType.INT24, FieldType.YEAR,
+}
+FLOAT_TYPES = {FieldType.FLOAT, FieldType.DOUBLE}
+DECIMAL_TYPES = {FieldType.DECIMAL, FieldType.NEWDECIMAL}
+DATE_TYPES = {FieldType.DATE, FieldType.NEWDATE}
+DATETIME_TYPES = {FieldType.DATETIME, FieldType.TIMESTAMP}
+
+
+def format_float(value, scale=None):
+    """Format a float cell: "" for NaN (SQL NULL), `scale` decimals for a DECIMAL column,
+    otherwise integral values without the trailing ".0"."""
+    if value != value:
+        return ""
+    if scale is not None:
+        return f"{value:.{scale}f}"
+    return str(int(value)) if value.is_integer() else str(value)
+
+
+class ColumnarResult(dict):
+    """Query result as a mapping of column name -> NumPy array.
+
+    `scales` holds the number of decimal places of each DECIMAL column. A result
+    with no rows is falsy, so `if data:` works the same as for a list of rows.
+    """
+
+    def __init__(self, columns=(), scales=None, row_count=0):
+        super().__init__(columns)
+        self.scales = scales or {}
+        self.row_count = row_count
+
+    def __bool__(self):
+        return self.row_count > 0
+
+    def take(self, selector):
+        """Return a new result with only the rows picked by a boolean mask or index array."""
+        columns = {name: values[selector] for name, values in self.items()}
+        row_count = len(next(iter(columns.values()))) if columns else 0
+        return ColumnarResult(columns, self.scales, row_count)
+
+    def text(self, name):
+        """Return the values of column `name` formatted for display, as a list of str."""
+        import numpy as np
+
+        values = self[name]
+        scale = self.scales.get(name)
+        kind = values.dtype.kind
+        if kind == "f":
+            return [format_float(v, scale) for v in values.tolist()]
+        if kind == "i" and scale:
+            # Exact decimals stored as scaled integers
+            return [str(Decimal(v).scaleb(-scale)) for v in values.tolist()]
+        if kind == "M":
+            unit = "D" if values.dtype == np.dtype("datetime64[D]") else "s"
+            return [t.replace("T", " ") if t != "NaT" else ""
+                    for t in np.datetime_as_string(values, unit=unit).tolist()]
+        if kind == "O":
+            return ["" if v is None else str(v) for v in values.tolist()]
+        return values.astype(str).tolist()
+
+    def to_frame(self):
+        """Wrap the columns in a pandas DataFrame (no copy of numeric columns)."""
+        import pandas as pd
+
+        return pd.DataFrame(dict(self), copy=False)
+
+
+def decimal_scale(values):
+    """Return the number of decimal places of the first non-NULL Decimal in `values`."""
+    for value in values:
+        if value is not None:
+            return max(0, -value.as_tuple().exponent) if isinstance(value, Decimal) else 0
+    return 0
+
+
+def build_columns(description, rows, exact_decimals=False):
+    """Convert tuple rows from a non-dictionary cursor into a ColumnarResult.
+
+    DECIMAL columns become float64, or int64 scaled by 10**scale with `exact_decimals`
+    (DECIMAL(10,2) -> cents). Integer columns become int64 (float64 if they contain
+    NULL), dates become datetime64 and everything else an object array.
+    """
+    import numpy as np
+
+    if not rows:
+        return ColumnarResult()
+
+    count = len(rows)
+    columns = {}
+    scales = {}
+    for index, column in enumerate(description):
+        name, type_code = column[0], column[1]
+        values = [row[index] for row in rows]
+        has_null = None in values
+
+        if type_code in DECIMAL_TYPES:
+            scale = decimal_scale(values)
+            scales[name] = scale
+            if has_null:
+                array = np.fromiter((np.nan if v is None else float(v) for v in values), np.float64, count)
+            elif scale == 0:
+                array = np.fromiter(map(int, values), np.int64, count)
+            elif exact_decimals:
+                array = np.fromiter((int(v.scaleb(scale)) for v in values), np.int64, count)
+            else:
+                array = np.fromiter(map(float, values), np.float64, count)
+        elif type_code in INTEGER_TYPES:
+            if has_null:
+                array = np.fromiter((np.nan if v is None else v for v in values), np.float64, count)
+            else:
+                array = np.fromiter(values, np.int64, count)
+        elif type_code in FLOAT_TYPES:
+            array = np.fromiter((np.nan if v is None else v for v in values), np.float64, count)
+        elif type_code in DATE_TYPES:
+            array = np.array(values, dtype="datetime64[D]")
+        elif type_code in DATETIME_TYPES:
+            array = np.array(values, dtype="datetime64[us]")
+        else:
+            array = np.empty(count, dtype=object)
+            array[:] = values
+        columns[name] = array
+
+    return ColumnarResult(columns, scales, count)
@@ -1,7 +1,12 @@
 import os
-import mysql.connector
-from mysql.connector import Error
+import threading
+from contextlib import contextmanager
+from mysql.connector import Error, errorcode
 from dotenv import load_dotenv
+from .pool import ConnectionPool
+from .query_cache import QueryCache, referenced_tables
+from .columnar import ColumnarResult, build_columns
+from .order_items import OrderItemsCache
 
 load_dotenv()
 
@@ -10,55 +15,281 @@ DB_CONFIG = {
     "password": os.getenv("DB_PASSWORD"),
     "host": os.getenv("DB_HOST"),
     "database": os.getenv("DB_NAME"),
+    "connection_timeout": int(os.getenv("DB_CONNECT_TIMEOUT", "10")),
+}
+
+# Connection pool settings
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+
+# Open the first connection in the background while the login screen is shown
+DB_WARM_UP = os.getenv("DB_WARM_UP", "1") == "1"
+
+# Seconds a connection is trusted without a ping after it was last used successfully
+DB_LIVENESS_INTERVAL = float(os.getenv("DB_LIVENESS_INTERVAL", "30"))
+# Exponential backoff between reconnect attempts (seconds)
+DB_RECONNECT_BACKOFF = float(os.getenv("DB_RECONNECT_BACKOFF", "0.5"))
+DB_RECONNECT_BACKOFF_MAX = float(os.getenv("DB_RECONNECT_BACKOFF_MAX", "30"))
+
+# Query result cache (used by execute_cached)
+DB_CACHE_TTL = float(os.getenv("DB_CACHE_TTL", "300"))
+DB_CACHE_MAX_ENTRIES = int(os.getenv("DB_CACHE_MAX_ENTRIES", "256"))
+DB_CACHE_MAX_MB = float(os.getenv("DB_CACHE_MAX_MB", "64"))
+# Orders whose line items are kept by the order items cache
+DB_ORDER_ITEMS_CACHE_SIZE = int(os.getenv("DB_ORDER_ITEMS_CACHE_SIZE", "5000"))
+
+# Rows fetched per round trip by stream_query
+DB_STREAM_CHUNK_SIZE = int(os.getenv("DB_STREAM_CHUNK_SIZE", "1000"))
+
+# Errors that mean the connection itself is gone and the query may be retried
+CONNECTION_LOST_ERRORS = {
+    errorcode.CR_SERVER_GONE_ERROR,
+    errorcode.CR_SERVER_LOST,
+    errorcode.CR_SERVER_LOST_EXTENDED,
+    errorcode.CR_CONNECTION_ERROR,
+    errorcode.CR_CONN_HOST_ERROR,
 }
 
 class DatabaseConnection:
-    """Singleton class for managing MySQL database connection."""
-    _instance = None  
+    """Singleton class for managing pooled MySQL database connections."""
+    _instance = None
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(DatabaseConnection, cls).__new__(cls)
-            cls._instance.connection = cls._create_connection()
+            cls._instance.pool = ConnectionPool(
+                DB_CONFIG,
+                size=DB_POOL_SIZE,
+                timeout=DB_POOL_TIMEOUT,
+                liveness_interval=DB_LIVENESS_INTERVAL,
+                backoff_initial=DB_RECONNECT_BACKOFF,
+                backoff_max=DB_RECONNECT_BACKOFF_MAX,
+            )
+            cls._instance.cache = QueryCache(
+                ttl=DB_CACHE_TTL,
+                max_entries=DB_CACHE_MAX_ENTRIES,
+                max_bytes=int(DB_CACHE_MAX_MB * 1024 * 1024),
+            )
+            cls._instance.order_items = OrderItemsCache(cls._instance, max_orders=DB_ORDER_ITEMS_CACHE_SIZE)
+            cls._instance._local = threading.local()
+            cls._instance._warm_up_thread = None
+            # No connection is opened here; the first query (or warm_up()) connects
         return cls._instance
 
-    @staticmethod
-    def _create_connection():
-        """Create a new database connection."""
-        try:
-            connection = mysql.connector.connect(**DB_CONFIG)
-            if connection.is_connected():
-                print("Connected to the database.")
-                return connection
-        except Error as e:
-            print(f"Error: {e}")
-            return None
+    def warm_up(self):
+        """Open a pooled connection on a background thread so the first query does not pay for it."""
+        if self._warm_up_thread is not None:
+            return self._warm_up_thread
+
+        def connect():
+            try:
+                with self.pool.connection():
+                    print("Connected to the database.")
+            except Error as e:
+                print(f"Error: {e}")
+
+        self._warm_up_thread = threading.Thread(target=connect, name="db-warm-up", daemon=True)
+        self._warm_up_thread.start()
+        return self._warm_up_thread
 
     def get_db_connection(self):
-        """Return an active database connection, reconnect if necessary."""
-        if not self.connection or not self.connection.is_connected():
+        """Return the calling thread's leased connection, leasing one from the pool if necessary.
+
+        The lease is held until release_connection() is called from the same thread,
+        so widgets that keep using the returned connection keep working unchanged.
+        It runs in autocommit, so reads never hold a snapshot open and always see
+        writes committed on other pooled connections; code that writes more than one
+        statement calls start_transaction() first. Liveness is cached by the pool, so
+        this only pings the server once the connection has been idle for longer than
+        DB_LIVENESS_INTERVAL.
+        """
+        conn = getattr(self._local, "connection", None)
+        if conn is not None and not self.pool.is_healthy(conn):
             print("Reconnecting to the database...")
-            self.connection = self._create_connection()
-        return self.connection
+            self.pool.report_broken(conn)
+            conn = None
+        elif conn is not None and conn.in_transaction:
+            # Left open by a write that failed before its commit; no round trip otherwise
+            conn.rollback()
+
+        if conn is None:
+            try:
+                conn = self.pool.acquire(autocommit=True)
+                print("Connected to the database.")
+            except Error as e:
+                print(f"Error: {e}")
+                conn = None
+            self._local.connection = conn
+        return conn
+
+    def release_connection(self):
+        """Return the calling thread's leased connection to the pool."""
+        conn = getattr(self._local, "connection", None)
+        if conn is not None:
+            self.pool.release(conn)
+            self._local.connection = None
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """Check out a pooled connection for the duration of a `with` block."""
+        with self.pool.connection(timeout) as conn:
+            yield conn
+
+    def pool_stats(self):
+        """Return pool usage stats (in use, idle, wait time)."""
+        return self.pool.stats()
+
+    def cache_stats(self):
+        """Return query cache stats (hits, misses, evictions, memory)."""
+        return self.cache.stats()
+
+    def invalidate_tables(self, *tables):
+        """Drop cached results that depend on `tables`. Call after committing writes to them."""
+        self.cache.invalidate_tables(*tables)
+        self.order_items.invalidate_tables(*tables)
 
     def close_connection(self):
-        """Close the database connection."""
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
-            print("Database connection closed.")
-    
-    def execute_query(self, query):
-        """Execute SQL query and return results."""
-        try:
-            conn = self.get_db_connection()
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute(query)
-            results = cursor.fetchall()
-            cursor.close()
+        """Close all pooled database connections."""
+        self.release_connection()
+        self.pool.close_all()
+        print("Database connection closed.")
+
+    def execute_query(self, query, params=None, cache=False, ttl=None):
+        """Execute SQL query on a pooled connection and return results.
+
+        If the connection turns out to be dead, it is replaced and the query retried once.
+        With `cache` set, results are served from the query cache for up to `ttl` seconds
+        (DB_CACHE_TTL by default) until a write invalidates one of the tables read.
+        Cached rows are shared between callers and must not be modified.
+        """
+        def run():
+            return self.fetch_rows(query, params)
+
+        results = self._cached("rows", query, params, ttl, run) if cache else run()
+        return [] if results is None else results
+
+    def execute_cached(self, query, params=None):
+        """Shorthand for execute_query(query, params, cache=True)."""
+        return self.execute_query(query, params, cache=True)
+
+    def fetch_rows(self, query, params=None):
+        """Execute SQL query without the query cache and return its rows as dicts.
+
+        Unlike execute_query, a failed query returns None rather than [], so callers
+        that cache the result themselves can tell an error from an empty result.
+        """
+        fetched = self._run_query(query, params)
+        return None if fetched is None else fetched[0]
+
+    def fetch_columns(self, query, params=None, as_frame=False, exact_decimals=False, cache=False, ttl=None):
+        """Execute SQL query and return a ColumnarResult (column name -> NumPy array).
+
+        Rows are read as tuples and converted column by column, so no per-row dicts are
+        built. DECIMAL columns become float64 (or scaled int64 with `exact_decimals`).
+        With `as_frame` a pandas DataFrame is returned instead. `cache` and `ttl` work
+        as for execute_query.
+        """
+        def run():
+            fetched = self._run_query(query, params, dictionary=False)
+            return None if fetched is None else build_columns(fetched[1], fetched[0], exact_decimals)
+
+        if cache:
+            result = self._cached(("columns", exact_decimals), query, params, ttl, run)
+        else:
+            result = run()
+        if result is None:
+            result = ColumnarResult()
+        return result.to_frame() if as_frame else result
+
+    def fetch_columns_cached(self, query, params=None):
+        """Shorthand for fetch_columns(query, params, cache=True)."""
+        return self.fetch_columns(query, params, cache=True)
+
+    def _cached(self, kind, query, params, ttl, run):
+        """Return the cached result of `run()` for this query, running it on a miss."""
+        key = self.cache.make_key(query, params, kind)
+        hit, results = self.cache.get(key)
+        if hit:
             return results
+        epoch = self.cache.epoch()
+        results = run()
+        if results is not None:
+            self.cache.put(key, results, referenced_tables(query), ttl, epoch)
+        return results
+
+    def stream_query(self, query, params=None, chunk_size=DB_STREAM_CHUNK_SIZE, batches=False):
+        """Yield result rows (or lists of up to `chunk_size` rows with `batches`) as they arrive.
+
+        Uses an unbuffered cursor, so only one chunk is held in memory at a time. The
+        pooled connection is busy until the generator is exhausted or closed; if it is
+        abandoned early the connection is discarded rather than draining the rest.
+        """
+        conn = self.pool.acquire(autocommit=True)
+        cursor = None
+        finished = False
+        try:
+            cursor = conn.cursor(dictionary=True, buffered=False)
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                if batches:
+                    yield rows
+                else:
+                    yield from rows
+            finished = True
         except Error as e:
-            print(f"Database error: {e}")
-            return []
+            if e.errno in CONNECTION_LOST_ERRORS:
+                print("Connection lost while streaming, reconnecting on next use...")
+                self.pool.report_broken(conn)
+                conn = None
+            raise
+        finally:
+            if cursor is not None:
+                try:
+                    cursor.close()
+                except Error:
+                    finished = False  # Unread rows left on the wire
+            if conn is not None:
+                if finished:
+                    self.pool.mark_alive(conn)
+                self.pool.release(conn, discard=not finished)
+
+    def _run_query(self, query, params, dictionary=True):
+        """Run a query with one retry on connection loss.
+
+        Returns (rows, cursor description), or None on error.
+        """
+        for attempt in range(2):
+            try:
+                # Single read: autocommit, so the lease is returned without a rollback
+                conn = self.pool.acquire(autocommit=True)
+            except Error as e:
+                print(f"Database error: {e}")
+                return None
+
+            try:
+                cursor = conn.cursor(dictionary=dictionary)
+                try:
+                    cursor.execute(query, params)
+                    results = cursor.fetchall()
+                    description = cursor.description
+                finally:
+                    cursor.close()
+            except Error as e:
+                if e.errno in CONNECTION_LOST_ERRORS and attempt == 0:
+                    print("Connection lost, reconnecting to the database...")
+                    self.pool.report_broken(conn)
+                    continue
+                self.pool.release(conn)
+                print(f"Database error: {e}")
+                return None
+
+            self.pool.mark_alive(conn)
+            self.pool.release(conn)
+            return results, description
+        return None
 
 
 db = DatabaseConnection()
@@ -0,0 +1,104 @@
+"""Check with EXPLAIN that the hot queries use the indexes added for them.
+
+Each check runs EXPLAIN on a query the application actually sends (imported from
+the module that sends it) and asserts which index MySQL picks for the listed
+tables, and optionally that the plan has no filesort. On tiny tables the optimizer
+may prefer full scans, so run it against realistically sized data, after
+`python -m database.migrate`:
+
+    python -m database.index_check             # exit status 1 if any check fails
+    python -m database.index_check --analyze   # refresh table statistics first
+"""
+import argparse
+import sys
+from datetime import date
+from .database import db
+from .order_items import ORDER_ITEMS_QUERY
+from .rollups import INSERT_PRODUCT_STATE_QUERY, INSERT_CUSTOMER_QUERY, day_condition
+
+ANALYZED_TABLES = ("orders", "order_items", "inventory", "addresses")
+
+
+def hot_queries():
+    """Return (name, query, params, {table alias: expected index}, forbidden Extra notes) per check."""
+    # Imported here: the customer pages pull in Qt
+    from customer_site.order_history import ORDER_HISTORY_QUERY
+    from customer_site.orders import PRODUCTS_QUERY
+    from customer_site.checkout import LOCK_STOCK_QUERY
+
+    ids = ", ".join(["%s"] * 3)
+    order_days, day_params = day_condition("o.order_date", [date.today()])
+    return [
+        ("order history", ORDER_HISTORY_QUERY, (1,),
+         {"o": "idx_orders_user_date"}, ("Using filesort",)),
+        ("order items cache", ORDER_ITEMS_QUERY.format(ids=ids), [1, 2, 3],
+         {"oi": "idx_order_items_order_cover"}, ()),
+        ("product catalog", PRODUCTS_QUERY, None,
+         {"i": "idx_inventory_product_stock"}, ()),
+        ("checkout stock lock", LOCK_STOCK_QUERY.format(ids=ids), [1, 2, 3],
+         {"inventory": "idx_inventory_product_stock"}, ()),
+        ("rollup by product and state", INSERT_PRODUCT_STATE_QUERY.format(order_days=order_days), day_params,
+         {"o": "idx_orders_order_date", "oi": "idx_order_items_order_cover"}, ()),
+        ("rollup by customer", INSERT_CUSTOMER_QUERY.format(order_days=order_days), day_params * 2,
+         {"oi": "idx_order_items_order_cover"}, ()),
+    ]
+
+
+def check_plan(plan, expected, forbidden):
+    """Return a list of problems with an EXPLAIN result (one dict per plan row)."""
+    problems = []
+    for alias, index in expected.items():
+        rows = [row for row in plan if row["table"] == alias]
+        if not rows:
+            problems.append(f"{alias}: not in the plan")
+        for row in rows:
+            if row["key"] != index:
+                problems.append(f"{alias}: uses {row['key'] or 'no index'} ({row['type']}), expected {index}")
+    for row in plan:
+        for note in forbidden:
+            if note in (row["Extra"] or ""):
+                problems.append(f"{row['table']}: {note}")
+    return problems
+
+
+def run_checks(analyze=False):
+    """EXPLAIN every hot query and print the result. Returns the number of failed checks."""
+    failed = 0
+    with db.connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+        try:
+            if analyze:
+                for table in ANALYZED_TABLES:
+                    cursor.execute(f"ANALYZE TABLE {table}")
+                    cursor.fetchall()
+            for name, query, params, expected, forbidden in hot_queries():
+                cursor.execute("EXPLAIN " + query, params)
+                problems = check_plan(cursor.fetchall(), expected, forbidden)
+                if problems:
+                    failed += 1
+                    print(f"FAIL  {name}")
+                    for problem in problems:
+                        print(f"      {problem}")
+                else:
+                    print(f"ok    {name}: {', '.join(f'{alias} -> {index}' for alias, index in expected.items())}")
+            conn.rollback()
+        finally:
+            cursor.close()
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--analyze", action="store_true", help="Run ANALYZE TABLE on the indexed tables first.")
+    args = parser.parse_args()
+
+    failed = run_checks(analyze=args.analyze)
+    db.close_connection()
+    if failed:
+        print(f"{failed} check(s) failed.")
+        sys.exit(1)
+    print("All hot queries use their indexes.")
+
+
+if __name__ == "__main__":
+    main()
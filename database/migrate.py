@@ -0,0 +1,120 @@
+"""Apply pending SQL migrations from the migrations/ directory.
+
+Migrations are plain .sql files named NNN_description.sql and are applied in order.
+Applied versions are recorded in the schema_migrations table.
+
+    python -m database.migrate            # apply pending migrations
+    python -m database.migrate --status   # list applied and pending migrations
+"""
+import argparse
+import os
+from mysql.connector import Error
+from .database import db
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
+CREATE_MIGRATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version VARCHAR(255) PRIMARY KEY,
+    applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+def migration_files():
+    """Return (version, path) for every migration file, in apply order."""
+    if not os.path.isdir(MIGRATIONS_DIR):
+        return []
+    names = sorted(name for name in os.listdir(MIGRATIONS_DIR) if name.endswith(".sql"))
+    return [(os.path.splitext(name)[0], os.path.join(MIGRATIONS_DIR, name)) for name in names]
+
+
+def split_statements(sql):
+    """Split a SQL script into statements, honouring DELIMITER lines and skipping comments."""
+    delimiter = ";"
+    statements = []
+    current = []
+    for line in sql.splitlines():
+        stripped = line.strip()
+        if not current and (not stripped or stripped.startswith("--")):
+            continue
+        if stripped.upper().startswith("DELIMITER "):
+            delimiter = stripped.split(None, 1)[1]
+            continue
+        current.append(line)
+        if stripped.endswith(delimiter):
+            statement = "\n".join(current).strip()
+            statements.append(statement[: -len(delimiter)].strip())
+            current = []
+    if "".join(current).strip():
+        statements.append("\n".join(current).strip())
+    return statements
+
+
+def applied_versions(cursor):
+    cursor.execute(CREATE_MIGRATIONS_TABLE)
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def migrate(dry_run=False):
+    """Apply every pending migration. Returns the list of versions applied."""
+    applied = []
+    with db.connection() as conn:
+        cursor = conn.cursor()
+        try:
+            done = applied_versions(cursor)
+            for version, path in migration_files():
+                if version in done:
+                    continue
+                print(f"Applying {version}...")
+                if dry_run:
+                    applied.append(version)
+                    continue
+                with open(path, encoding="utf-8") as f:
+                    statements = split_statements(f.read())
+                try:
+                    for statement in statements:
+                        cursor.execute(statement)
+                    cursor.execute("INSERT INTO schema_migrations (version) VALUES (%s)", (version,))
+                    conn.commit()
+                except Error as e:
+                    # DDL commits implicitly in MySQL, so a failed migration may be partly applied
+                    conn.rollback()
+                    print(f"Migration {version} failed: {e}")
+                    raise
+                applied.append(version)
+        finally:
+            cursor.close()
+    return applied
+
+
+def status():
+    """Print applied and pending migrations."""
+    with db.connection() as conn:
+        cursor = conn.cursor()
+        try:
+            done = applied_versions(cursor)
+            conn.commit()
+        finally:
+            cursor.close()
+    for version, _ in migration_files():
+        print(f"{'applied' if version in done else 'pending':<8} {version}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--status", action="store_true", help="List migrations without applying them.")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would be applied.")
+    args = parser.parse_args()
+
+    if args.status:
+        status()
+    else:
+        applied = migrate(dry_run=args.dry_run)
+        print(f"{len(applied)} migration(s) {'pending' if args.dry_run else 'applied'}.")
+    db.close_connection()
+
+
+if __name__ == "__main__":
+    main()
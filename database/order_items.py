@@ -0,0 +1,109 @@
+import threading
+from collections import OrderedDict
+
+# Columns used by both the admin order view and the customer order history
+ORDER_ITEMS_QUERY = """
+SELECT oi.order_item_id, oi.order_id, p.product_name, oi.quantity, oi.unit_price,
+       oi.total_price, (oi.quantity * oi.unit_price) AS subtotal
+FROM order_items oi
+JOIN products p ON oi.product_id = p.product_id
+WHERE oi.order_id IN ({ids})
+ORDER BY oi.order_id, oi.order_item_id
+"""
+
+# Orders looked up per IN (...) query
+ORDER_ITEMS_BATCH = 500
+
+
+class OrderItemsCache:
+    """LRU cache of order_id -> line items (list of dict rows), filled in batches.
+
+    Orders missing from the cache are loaded together with one IN (...) query, and
+    orders without lines are cached as empty lists. Cached lists are shared between
+    callers and must not be modified. Code that changes an order's lines must call
+    invalidate(order_id); writes to products clear everything (through
+    invalidate_tables), since product names are part of the rows.
+    """
+
+    def __init__(self, db, max_orders=5000):
+        self.db = db
+        self.max_orders = max_orders
+        self._entries = OrderedDict()
+        self._epoch = 0  # bumped on every invalidation
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, order_id):
+        """Return the cached items of `order_id`, or None if they are not cached."""
+        with self._lock:
+            items = self._entries.get(order_id)
+            if items is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(order_id)
+            self.hits += 1
+            return items
+
+    def fetch(self, order_ids):
+        """Return {order_id: items} for `order_ids`, querying only the ones not cached.
+
+        Blocking; call it from a background thread (db_async.run) to prefetch a page.
+        """
+        found = {}
+        missing = []
+        for order_id in dict.fromkeys(order_ids):
+            items = self.get(order_id)
+            if items is None:
+                missing.append(order_id)
+            else:
+                found[order_id] = items
+
+        for start in range(0, len(missing), ORDER_ITEMS_BATCH):
+            batch = missing[start:start + ORDER_ITEMS_BATCH]
+            epoch = self._epoch
+            query = ORDER_ITEMS_QUERY.format(ids=", ".join(["%s"] * len(batch)))
+            rows = self.db.fetch_rows(query, batch)
+            if rows is None:
+                # Not cached as empty: the error was already reported by fetch_rows
+                raise RuntimeError("Failed to load order items")
+            loaded = {order_id: [] for order_id in batch}
+            for row in rows:
+                loaded[row["order_id"]].append(row)
+            self._put(loaded, epoch)
+            found.update(loaded)
+        return found
+
+    def items(self, order_id):
+        """Return the items of one order, from the cache or the database."""
+        return self.fetch([order_id])[order_id]
+
+    def invalidate(self, *order_ids):
+        with self._lock:
+            self._epoch += 1
+            for order_id in order_ids:
+                self._entries.pop(order_id, None)
+
+    def invalidate_tables(self, *tables):
+        """Clear the cache when products change (called from DatabaseConnection.invalidate_tables)."""
+        if "products" in (table.lower() for table in tables):
+            self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"orders": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def _put(self, loaded, epoch):
+        with self._lock:
+            if epoch != self._epoch:
+                return  # Invalidated while the query was running
+            for order_id, items in loaded.items():
+                self._entries[order_id] = items
+                self._entries.move_to_end(order_id)
+            while len(self._entries) > self.max_orders:
+                self._entries.popitem(last=False)
@@ -0,0 +1,258 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import mysql.connector
+from mysql.connector import Error
+
+
+class PoolExhaustedError(Error):
+    """Raised when no connection could be checked out before the timeout."""
+
+
+class ConnectionPool:
+    """Bounded pool of MySQL connections with checkout/return semantics.
+
+    A lease is either transactional (autocommit off, the default) or read-only
+    (`autocommit=True`). Read-only leases never leave a transaction open, so they are
+    returned without a rollback round trip. Each connection's mode is tracked here,
+    and idle connections already in the requested mode are handed out first, so
+    switching modes (one SET round trip) is rare.
+    """
+
+    def __init__(self, config, size=5, timeout=10.0, liveness_interval=30.0,
+                 backoff_initial=0.5, backoff_max=30.0):
+        self.config = config
+        self.size = max(1, int(size))
+        self.timeout = timeout
+        self.liveness_interval = liveness_interval
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self._idle = deque()
+        self._in_use = set()
+        self._created = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+        # Liveness cache: connection -> time it was last known to work
+        self._last_ok = {}
+        # Session autocommit mode of each connection
+        self._autocommit = {}
+
+        # Reconnect backoff
+        self._backoff = 0.0
+        self._next_attempt = 0.0
+        self._pending_reconnects = 0
+
+        # Stats
+        self._checkouts = 0
+        self._waits = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._pings = 0
+        self._reconnects = 0
+        self._connect_failures = 0
+
+    def _connect(self):
+        """Open a new physical connection, backing off exponentially after failures."""
+        now = time.monotonic()
+        with self._cond:
+            if now < self._next_attempt:
+                raise Error(msg=f"Database unavailable, next reconnect attempt in "
+                                f"{self._next_attempt - now:.1f}s.")
+        try:
+            conn = mysql.connector.connect(**self.config)
+        except Error:
+            with self._cond:
+                self._connect_failures += 1
+                self._backoff = min(self.backoff_max, self._backoff * 2 or self.backoff_initial)
+                self._next_attempt = time.monotonic() + self._backoff
+            raise
+
+        with self._cond:
+            self._backoff = 0.0
+            self._next_attempt = 0.0
+            if self._pending_reconnects:
+                self._pending_reconnects -= 1
+                self._reconnects += 1
+            self._last_ok[conn] = time.monotonic()
+            self._autocommit[conn] = bool(self.config.get("autocommit", False))
+        return conn
+
+    def is_healthy(self, conn):
+        """Check that a pooled connection is still usable.
+
+        A connection that worked within the last `liveness_interval` seconds is trusted
+        without a server round trip; otherwise it is pinged.
+        """
+        last_ok = self._last_ok.get(conn)
+        if last_ok is not None and time.monotonic() - last_ok < self.liveness_interval:
+            return True
+        try:
+            self._pings += 1
+            alive = conn.is_connected()
+        except Error:
+            alive = False
+        if alive:
+            self.mark_alive(conn)
+        return alive
+
+    def mark_alive(self, conn):
+        """Record a successful use of `conn`, extending its liveness trust window."""
+        self._last_ok[conn] = time.monotonic()
+
+    def report_broken(self, conn):
+        """Discard a connection that failed in use; it is replaced lazily on the next checkout."""
+        with self._cond:
+            self._pending_reconnects += 1
+        self.release(conn, discard=True)
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Error:
+            pass
+
+    def acquire(self, timeout=None, autocommit=False):
+        """Check out a connection, waiting up to `timeout` seconds for one to free up.
+
+        With `autocommit` the connection runs each statement in its own transaction;
+        use it for leases that only read.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        start = time.perf_counter()
+        deadline = start + timeout
+        waited = False
+
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn = self._pop_idle(autocommit)
+                    break
+                if self._created < self.size:
+                    # Reserve a slot, connect outside the lock
+                    self._created += 1
+                    conn = None
+                    break
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    raise PoolExhaustedError(
+                        msg=f"No database connection available after {timeout:.1f}s "
+                            f"(pool size {self.size})."
+                    )
+                waited = True
+                self._cond.wait(remaining)
+
+            wait_time = time.perf_counter() - start
+            self._checkouts += 1
+            self._total_wait += wait_time
+            self._max_wait = max(self._max_wait, wait_time)
+            if waited:
+                self._waits += 1
+
+        try:
+            if conn is not None and not self.is_healthy(conn):
+                self._forget(conn)
+                self._close_quietly(conn)
+                conn = None
+                with self._cond:
+                    self._pending_reconnects += 1
+            if conn is None:
+                conn = self._connect()
+            if self._autocommit.get(conn) != autocommit:
+                try:
+                    conn.autocommit = autocommit
+                except Error:
+                    self._forget(conn)
+                    self._close_quietly(conn)
+                    raise
+                self._autocommit[conn] = autocommit
+        except Error:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._in_use.add(conn)
+        return conn
+
+    def _pop_idle(self, autocommit):
+        """Take the most recently used idle connection in the requested mode, or any idle one."""
+        for conn in reversed(self._idle):
+            if self._autocommit.get(conn) == autocommit:
+                self._idle.remove(conn)
+                return conn
+        return self._idle.pop()
+
+    def release(self, conn, discard=False):
+        """Return a connection to the pool, or close it if `discard` is set or it is broken."""
+        if conn is None:
+            return
+
+        if not discard:
+            try:
+                # Never hand the next borrower an open transaction (or a stale snapshot).
+                # in_transaction is the server status from the last reply, so read-only
+                # (autocommit) leases skip this without a round trip.
+                if conn.in_transaction:
+                    conn.rollback()
+                    self.mark_alive(conn)
+            except Error:
+                discard = True
+
+        with self._cond:
+            if conn not in self._in_use:
+                return
+            self._in_use.discard(conn)
+            if discard or self._closed:
+                self._created -= 1
+                self._forget(conn)
+                self._close_quietly(conn)
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+
+    def _forget(self, conn):
+        self._last_ok.pop(conn, None)
+        self._autocommit.pop(conn, None)
+
+    @contextmanager
+    def connection(self, timeout=None, autocommit=False):
+        """Context manager that checks a connection out and always returns it."""
+        conn = self.acquire(timeout, autocommit)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def stats(self):
+        """Return a snapshot of pool usage."""
+        with self._cond:
+            return {
+                "size": self.size,
+                "created": self._created,
+                "in_use": len(self._in_use),
+                "idle": len(self._idle),
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "total_wait": self._total_wait,
+                "avg_wait": self._total_wait / self._checkouts if self._checkouts else 0.0,
+                "max_wait": self._max_wait,
+                "pings": self._pings,
+                "reconnects": self._reconnects,
+                "connect_failures": self._connect_failures,
+            }
+
+    def close_all(self):
+        """Close every idle connection. Connections still checked out are closed on release."""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn = self._idle.pop()
+                self._forget(conn)
+                self._close_quietly(conn)
+                self._created -= 1
+            self._cond.notify_all()
@@ -0,0 +1,168 @@
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# Tables a query reads from (CTE names are picked up too, which is harmless)
+TABLE_PATTERN = re.compile(r"\b(?:FROM|JOIN)\s+`?(\w+)`?", re.IGNORECASE)
+
+# Writes to a table also change these tables (triggers and foreign key actions)
+TABLE_SIDE_EFFECTS = {
+    "orders": {"order_items"},                          # ON DELETE CASCADE
+    "products": {"inventory", "order_items"},           # CASCADE / SET NULL
+    "brands": {"products"},                             # ON DELETE SET NULL
+    "suppliers": {"products"},                          # ON DELETE SET NULL
+    "users": {"admins", "addresses", "orders"},         # CASCADE / SET NULL
+    "addresses": {"orders"},                            # ON DELETE SET NULL
+}
+
+
+def normalize_sql(query):
+    """Collapse whitespace so formatting differences map to the same cache key."""
+    return " ".join(query.split()).rstrip(";").strip()
+
+
+def referenced_tables(query):
+    """Return the lower-cased names of the tables referenced by a SELECT statement."""
+    return {name.lower() for name in TABLE_PATTERN.findall(query)}
+
+
+def expand_side_effects(tables):
+    """Return `tables` plus every table changed indirectly by writing to them."""
+    pending = [t.lower() for t in tables]
+    expanded = set()
+    while pending:
+        table = pending.pop()
+        if table in expanded:
+            continue
+        expanded.add(table)
+        pending.extend(TABLE_SIDE_EFFECTS.get(table, ()))
+    return expanded
+
+
+def estimate_size(rows, sample=100):
+    """Roughly estimate the memory held by a result (list of rows or dict of columns), in bytes."""
+    if isinstance(rows, dict):
+        return sum(estimate_column_size(values, sample) for values in rows.values())
+    if not rows:
+        return sys.getsizeof(rows)
+    sampled = rows[:sample]
+    per_row = 0
+    for row in sampled:
+        values = row.values() if isinstance(row, dict) else row
+        per_row += sys.getsizeof(row) + sum(sys.getsizeof(v) for v in values)
+    return sys.getsizeof(rows) + per_row * len(rows) // len(sampled)
+
+
+def estimate_column_size(values, sample=100):
+    """Estimate the memory held by one NumPy column, including boxed objects."""
+    size = getattr(values, "nbytes", sys.getsizeof(values))
+    if getattr(values, "dtype", None) is not None and values.dtype.kind == "O" and len(values):
+        sampled = values[:sample]
+        size += sum(sys.getsizeof(v) for v in sampled) * len(values) // len(sampled)
+    return size
+
+
+class QueryCache:
+    """LRU cache of query results with a TTL, a memory cap and table-level invalidation."""
+
+    def __init__(self, ttl=300.0, max_entries=256, max_bytes=64 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()   # key -> (expires_at, rows, tables, size)
+        self._by_table = {}             # table -> set of keys
+        self._bytes = 0
+        self._epoch = 0                 # bumped on every invalidation
+        self._lock = threading.Lock()
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(query, params=None, kind="rows"):
+        return kind, normalize_sql(query), tuple(params) if params is not None else None
+
+    def get(self, key):
+        """Return (True, rows) on a fresh hit, (False, None) otherwise."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            if entry[0] < time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def epoch(self):
+        """Return a token to pass to put(); results fetched across an invalidation are not stored."""
+        return self._epoch
+
+    def put(self, key, rows, tables, ttl=None, epoch=None):
+        """Store `rows` for `key`, evicting least recently used entries to stay under the caps."""
+        size = estimate_size(rows)
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if epoch is not None and epoch != self._epoch:
+                return  # A write landed while the query was running
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, rows, tables, size)
+            self._bytes += size
+            for table in tables:
+                self._by_table.setdefault(table, set()).add(key)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate_tables(self, *tables):
+        """Drop every entry that reads from any of `tables` (including trigger/FK side effects)."""
+        with self._lock:
+            self._epoch += 1
+            for table in expand_side_effects(tables):
+                for key in list(self._by_table.get(table, ())):
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._by_table.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry[3]
+        for table in entry[2]:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[table]
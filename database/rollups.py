@@ -0,0 +1,235 @@
+"""Daily sales rollups for the analytics pages, refreshed incrementally.
+
+sales_daily_product_state holds sales per (day, product, shipping state) and
+sales_daily_customer holds sales per (day, customer). Both are created by migration
+002. A refresh finds the days touched by new order lines (order_item_id above the
+watermark) or by changed orders (status_updated_date above the watermark), then
+recomputes just those days from the base tables.
+
+Deleting a product, a user or an address, or changing an address, also changes past
+days (through ON DELETE SET NULL, order lines lose their product and orders their
+customer or shipping state), and nothing in orders records that. Code that makes
+such a change calls reset_sales_watermark in the same transaction, and the next
+refresh rebuilds both rollups from scratch.
+
+    python -m database.rollups          # fold in new and changed orders
+    python -m database.rollups --full   # rebuild both rollups from scratch
+"""
+import argparse
+import os
+import threading
+import time
+from datetime import timedelta
+from mysql.connector import Error
+from .database import db
+
+ROLLUP_TABLES = ("sales_daily_product_state", "sales_daily_customer")
+
+# Minimum seconds between the refresh checks made by fetch_rollup
+ROLLUP_REFRESH_INTERVAL = float(os.getenv("DB_ROLLUP_REFRESH_INTERVAL", "10"))
+# Orders updated up to this many seconds before the watermark are checked again, so
+# order lines from transactions that committed after a refresh started are not missed
+ROLLUP_OVERLAP_SECONDS = int(os.getenv("DB_ROLLUP_OVERLAP", "300"))
+# Days recomputed per statement
+ROLLUP_DAY_BATCH = 100
+
+LOCK_WATERMARK_QUERY = """
+SELECT last_order_item_id, last_status_updated
+FROM rollup_watermarks
+WHERE rollup_name = 'sales'
+FOR UPDATE
+"""
+
+HIGH_WATER_QUERY = """
+SELECT (SELECT COALESCE(MAX(order_item_id), 0) FROM order_items),
+       (SELECT MAX(status_updated_date) FROM orders)
+"""
+
+CHANGED_DAYS_QUERY = """
+SELECT DATE(o.order_date)
+FROM order_items oi
+JOIN orders o ON o.order_id = oi.order_id
+WHERE oi.order_item_id > %s
+UNION
+SELECT DATE(order_date)
+FROM orders
+WHERE status_updated_date > %s - INTERVAL %s SECOND
+"""
+
+# Back to the initial watermark, which makes the next refresh a full rebuild
+RESET_WATERMARK_QUERY = """
+UPDATE rollup_watermarks
+SET last_order_item_id = 0, last_status_updated = '1970-01-01 00:00:00'
+WHERE rollup_name = 'sales'
+"""
+
+UPDATE_WATERMARK_QUERY = """
+UPDATE rollup_watermarks
+SET last_order_item_id = %s, last_status_updated = %s, refreshed_at = NOW()
+WHERE rollup_name = 'sales'
+"""
+
+DELETE_PRODUCT_STATE_QUERY = "DELETE FROM sales_daily_product_state WHERE {rollup_days}"
+
+INSERT_PRODUCT_STATE_QUERY = """
+INSERT INTO sales_daily_product_state
+    (sales_date, product_id, state, line_count, quantity, total_sales, max_line_total)
+SELECT DATE(o.order_date), oi.product_id, a.state,
+       COUNT(*), SUM(oi.quantity), SUM(oi.total_price), MAX(oi.total_price)
+FROM orders o
+JOIN order_items oi ON oi.order_id = o.order_id
+LEFT JOIN addresses a ON a.address_id = o.shipping_address_id
+WHERE oi.product_id IS NOT NULL AND ({order_days})
+GROUP BY DATE(o.order_date), oi.product_id, a.state
+"""
+
+DELETE_CUSTOMER_QUERY = "DELETE FROM sales_daily_customer WHERE {rollup_days}"
+
+# Order lines are summed per order first so orders.total_amount is not repeated per line
+INSERT_CUSTOMER_QUERY = """
+INSERT INTO sales_daily_customer
+    (sales_date, user_id, order_count, order_amount, line_count, total_sales)
+SELECT DATE(o.order_date), o.user_id, COUNT(*), SUM(o.total_amount),
+       COALESCE(SUM(li.line_count), 0), COALESCE(SUM(li.total_sales), 0)
+FROM orders o
+LEFT JOIN (
+    SELECT oi.order_id, COUNT(*) AS line_count, SUM(oi.total_price) AS total_sales
+    FROM order_items oi
+    JOIN orders o ON o.order_id = oi.order_id
+    WHERE {order_days}
+    GROUP BY oi.order_id
+) li ON li.order_id = o.order_id
+WHERE {order_days}
+GROUP BY DATE(o.order_date), o.user_id
+"""
+
+_refresh_lock = threading.Lock()
+_last_refresh_check = 0.0
+
+
+def day_condition(column, days):
+    """Return a WHERE fragment and its params matching `column` on any of `days`.
+
+    DATETIME columns are compared as ranges so an index on them can be used. A None
+    day matches rows whose date is NULL.
+    """
+    clauses = []
+    params = []
+    for day in days:
+        if day is None:
+            clauses.append(f"{column} IS NULL")
+        else:
+            clauses.append(f"({column} >= %s AND {column} < %s)")
+            params.extend((day, day + timedelta(days=1)))
+    return " OR ".join(clauses), params
+
+
+def reset_sales_watermark(cursor):
+    """Make the next refresh rebuild the rollups. Run it in the transaction that deletes
+    a product or user, or changes or deletes an address."""
+    global _last_refresh_check
+    cursor.execute(RESET_WATERMARK_QUERY)
+    _last_refresh_check = 0.0
+
+
+def recompute_days(cursor, days):
+    """Replace the rollup rows for `days` (None = every day) with fresh aggregates."""
+    if days is None:
+        order_days, order_params = "1 = 1", []
+        rollup_days, rollup_params = "1 = 1", []
+    else:
+        order_days, order_params = day_condition("o.order_date", days)
+        rollup_days, rollup_params = day_condition("sales_date", days)
+
+    cursor.execute(DELETE_PRODUCT_STATE_QUERY.format(rollup_days=rollup_days), rollup_params)
+    cursor.execute(INSERT_PRODUCT_STATE_QUERY.format(order_days=order_days), order_params)
+    cursor.execute(DELETE_CUSTOMER_QUERY.format(rollup_days=rollup_days), rollup_params)
+    cursor.execute(INSERT_CUSTOMER_QUERY.format(order_days=order_days), order_params * 2)
+
+
+def refresh_sales_rollups(conn, full=False):
+    """Fold new and changed orders into the rollups; return the number of days recomputed.
+
+    The watermark row is locked for the whole refresh, so concurrent refreshes (from
+    any process) run one after another. With `full`, or when the watermark has been
+    reset, both rollups are rebuilt.
+    """
+    cursor = conn.cursor()
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+        conn.start_transaction()
+
+        cursor.execute(LOCK_WATERMARK_QUERY)
+        watermark = cursor.fetchone()
+        if watermark is None:
+            raise RuntimeError("Sales rollups are not set up; run python -m database.migrate")
+        last_item_id, last_status_updated = watermark
+
+        cursor.execute(HIGH_WATER_QUERY)
+        max_item_id, max_status_updated = cursor.fetchone()
+
+        if full or last_item_id == 0:
+            recompute_days(cursor, None)
+            changed = -1
+        else:
+            cursor.execute(CHANGED_DAYS_QUERY, (last_item_id, last_status_updated, ROLLUP_OVERLAP_SECONDS))
+            days = [row[0] for row in cursor.fetchall()]
+            for start in range(0, len(days), ROLLUP_DAY_BATCH):
+                recompute_days(cursor, days[start:start + ROLLUP_DAY_BATCH])
+            changed = len(days)
+
+        cursor.execute(UPDATE_WATERMARK_QUERY, (max(last_item_id, max_item_id),
+                                                max_status_updated or last_status_updated))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    if changed:
+        db.invalidate_tables(*ROLLUP_TABLES)
+    return changed
+
+
+def refresh_if_due():
+    """Refresh the rollups unless that was checked within ROLLUP_REFRESH_INTERVAL seconds."""
+    global _last_refresh_check
+    with _refresh_lock:
+        if time.monotonic() - _last_refresh_check < ROLLUP_REFRESH_INTERVAL:
+            return 0
+        try:
+            with db.connection() as conn:
+                return refresh_sales_rollups(conn)
+        except (Error, RuntimeError) as e:
+            print(f"[ERROR] Sales rollup refresh failed: {e}")
+            return 0
+        finally:
+            _last_refresh_check = time.monotonic()
+
+
+def fetch_rollup(query, params=None):
+    """fetch_columns_cached for queries over the rollup tables, refreshing them first if due."""
+    refresh_if_due()
+    return db.fetch_columns_cached(query, params)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--full", action="store_true", help="Rebuild the rollups from the base tables.")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with db.connection() as conn:
+        changed = refresh_sales_rollups(conn, full=args.full)
+    elapsed = time.perf_counter() - start
+    if changed < 0:
+        print(f"Rebuilt sales rollups in {elapsed:.2f}s.")
+    else:
+        print(f"Recomputed {changed} day(s) in {elapsed:.2f}s.")
+    db.close_connection()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ import sys
 from PyQt5.QtWidgets import QApplication
 from config import load_stylesheet
 from database import db
+from database.database import DB_WARM_UP
 from main_window import MainWindow  # The file that contains the MainWindow class with a QStackedWidget
 
 if __name__ == '__main__':
@@ -11,6 +12,10 @@ if __name__ == '__main__':
     main_win = MainWindow()
     main_win.show()
 
+    # Connect while the user is typing credentials instead of blocking first paint
+    if DB_WARM_UP:
+        db.warm_up()
+
     exit_code = app.exec_()
     db.close_connection() 
     sys.exit(exit_code)
@@ -4,10 +4,6 @@ from auth.login import LoginWidget
 from auth.register import RegisterWidget
 from config import WINDOW_WIDTH, WINDOW_HEIGHT
 
-# Import your dashboard widgets when needed in showDashboard
-from dashboard.customer_dashboard import CustomerDashboard
-from dashboard.admin_dashboard import AdminDashboard
-
 class MainWindow(QWidget):
     def __init__(self):
         super().__init__()
@@ -29,12 +25,15 @@ class MainWindow(QWidget):
         self.login_widget.loginSuccessful.connect(self.showDashboard)
         self.login_widget.createAccountClicked.connect(self.showRegister)
 
-    def showDashboard(self, username, role):
+    def showDashboard(self, session):
         """Switch to the appropriate dashboard based on the user's role."""
-        if role.lower() == "admin":
-            self.dashboard = AdminDashboard(username)
+        # Dashboards are imported here so the login screen does not pay for their dependencies
+        if session.is_admin():
+            from dashboard.admin_dashboard import AdminDashboard
+            self.dashboard = AdminDashboard(session)
         else:
-            self.dashboard = CustomerDashboard(username)
+            from dashboard.customer_dashboard import CustomerDashboard
+            self.dashboard = CustomerDashboard(session)
         # Connect dashboard logout signal to return to login screen
         self.dashboard.logoutRequested.connect(self.showLogin)
         self.stack.addWidget(self.dashboard)
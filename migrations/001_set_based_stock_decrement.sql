@@ -0,0 +1,3 @@
+-- Checkout now locks and decrements inventory for the whole cart in one statement
+-- (customer_site/checkout.py), so the per-row trigger would decrement twice.
+DROP TRIGGER IF EXISTS update_stock_after_order;
@@ -0,0 +1,43 @@
+-- Daily sales rollups maintained by database/rollups.py. The analytics pages read
+-- these instead of joining order_items, orders, addresses and products.
+
+-- One row per (day, product, shipping state); state is NULL for orders without an address
+CREATE TABLE IF NOT EXISTS sales_daily_product_state (
+    rollup_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    sales_date DATE NULL,
+    product_id INT NOT NULL,
+    state VARCHAR(100) NULL,
+    line_count INT NOT NULL,
+    quantity INT NOT NULL,
+    total_sales DECIMAL(14, 2) NOT NULL,
+    max_line_total DECIMAL(10, 2) NOT NULL,
+    KEY idx_sdps_date (sales_date),
+    KEY idx_sdps_product_state (product_id, state)
+);
+
+-- One row per (day, customer); order_amount sums orders.total_amount, total_sales sums the order lines
+CREATE TABLE IF NOT EXISTS sales_daily_customer (
+    rollup_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    sales_date DATE NULL,
+    user_id INT NULL,
+    order_count INT NOT NULL,
+    order_amount DECIMAL(14, 2) NOT NULL,
+    line_count INT NOT NULL,
+    total_sales DECIMAL(14, 2) NOT NULL,
+    KEY idx_sdc_date (sales_date),
+    KEY idx_sdc_user (user_id)
+);
+
+-- High-water marks of the last refresh. Starting from zero makes the first refresh a full build.
+CREATE TABLE IF NOT EXISTS rollup_watermarks (
+    rollup_name VARCHAR(64) PRIMARY KEY,
+    last_order_item_id INT NOT NULL DEFAULT 0,
+    last_status_updated DATETIME NOT NULL DEFAULT '1970-01-01 00:00:00',
+    refreshed_at DATETIME NULL
+);
+
+INSERT IGNORE INTO rollup_watermarks (rollup_name) VALUES ('sales');
+
+-- Finding and recomputing changed days (orders.order_date is already indexed by the
+-- base schema as idx_orders_order_date)
+CREATE INDEX idx_orders_status_updated ON orders (status_updated_date);
@@ -0,0 +1,4 @@
+-- UserManagement searches in memory (models/search_index.py) while the users table is
+-- small enough to load; beyond that it searches on the server with MATCH ... AGAINST,
+-- which needs this index (same columns, same order as the query).
+CREATE FULLTEXT INDEX ft_users_search ON users (username, email, first_name, last_name, phone_number);
@@ -0,0 +1,9 @@
+from .table_model import ColumnTableModel, ColumnProxyModel, ColumnTableView
+from .search_index import PrefixIndex, tokenize
+from .facet_index import FacetIndex
+from .cart_model import CartModel, QuantityDelegate, RemoveButtonDelegate
+
+__all__ = [
+    "ColumnTableModel", "ColumnProxyModel", "ColumnTableView", "PrefixIndex", "tokenize", "FacetIndex",
+    "CartModel", "QuantityDelegate", "RemoveButtonDelegate",
+]
@@ -0,0 +1,180 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QEvent, pyqtSignal
+from PyQt5.QtWidgets import QStyledItemDelegate, QSpinBox, QStyleOptionButton, QStyle, QApplication
+
+MAX_QUANTITY = 99
+
+
+def price_cents(price):
+    return int(round(price * 100))
+
+
+class CartModel(QAbstractTableModel):
+    """Cart lines as a table model shared by the cart and the order confirmation views.
+
+    `cart` is the {product_id: {"product_name", "price", "quantity"}} dict that
+    place_order takes; its order is the row order. A quantity change repaints only
+    that line's quantity and subtotal, and the total is kept as a running sum in
+    cents, adjusted by each change instead of re-added over every line.
+    """
+
+    PRODUCT_NAME, PRICE, QUANTITY, SUBTOTAL, REMOVE = range(5)
+    HEADERS = ["Product Name", "Price", "Quantity", "Subtotal", "Remove"]
+
+    total_changed = pyqtSignal(float)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.cart = {}
+        self.product_ids = []  # product_id of each row
+        self.rows = {}  # product_id -> row
+        self.total_cents = 0
+
+    # ──────────────────── Cart ────────────────────
+    def add(self, product_id, product_name, price, quantity=1):
+        """Add `quantity` of a product, as a new line or onto its existing line."""
+        if product_id in self.cart:
+            self.set_quantity(product_id, self.cart[product_id]["quantity"] + quantity)
+            return
+        row = len(self.product_ids)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.cart[product_id] = {"product_name": product_name, "price": price, "quantity": quantity}
+        self.product_ids.append(product_id)
+        self.rows[product_id] = row
+        self.endInsertRows()
+        self._add_to_total(price_cents(price) * quantity)
+
+    def set_quantity(self, product_id, quantity):
+        """Change a line's quantity (capped at MAX_QUANTITY); 0 or less removes the line."""
+        item = self.cart.get(product_id)
+        if item is None:
+            print(f"[ERROR] Product ID {product_id} not found in cart")
+            return
+        if quantity <= 0:
+            self.remove(product_id)
+            return
+        quantity = min(quantity, MAX_QUANTITY)
+        if quantity == item["quantity"]:
+            return
+        print(f"[DEBUG] Updating Quantity for {item['product_name']} -> {quantity}")
+        delta = quantity - item["quantity"]
+        item["quantity"] = quantity
+        row = self.rows[product_id]
+        self.dataChanged.emit(self.index(row, self.QUANTITY), self.index(row, self.SUBTOTAL))
+        self._add_to_total(price_cents(item["price"]) * delta)
+
+    def remove(self, product_id):
+        item = self.cart.get(product_id)
+        if item is None:
+            return
+        print(f"[DEBUG] Removing {item['product_name']} from cart")
+        row = self.rows[product_id]
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.cart[product_id]
+        del self.product_ids[row]
+        del self.rows[product_id]
+        for later_row in range(row, len(self.product_ids)):
+            self.rows[self.product_ids[later_row]] = later_row
+        self.endRemoveRows()
+        self._add_to_total(-price_cents(item["price"]) * item["quantity"])
+
+    def clear(self):
+        self.beginResetModel()
+        self.cart.clear()
+        self.product_ids = []
+        self.rows = {}
+        self.endResetModel()
+        self.total_cents = 0
+        self.total_changed.emit(0.0)
+
+    def total(self):
+        return self.total_cents / 100
+
+    def _add_to_total(self, cents):
+        self.total_cents += cents
+        self.total_changed.emit(self.total())
+
+    # ──────────────────── Qt model interface ────────────────────
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.product_ids)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        item = self.cart[self.product_ids[index.row()]]
+        column = index.column()
+        if role == Qt.EditRole and column == self.QUANTITY:
+            return item["quantity"]
+        if role != Qt.DisplayRole:
+            return None
+        if column == self.PRODUCT_NAME:
+            return item["product_name"]
+        if column == self.PRICE:
+            return f"${item['price']:.2f}"
+        if column == self.QUANTITY:
+            return str(item["quantity"])
+        if column == self.SUBTOTAL:
+            return f"${price_cents(item['price']) * item['quantity'] / 100:.2f}"
+        return "Remove"
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole or index.column() != self.QUANTITY:
+            return False
+        self.set_quantity(self.product_ids[index.row()], int(value))
+        return True
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.isValid() and index.column() == self.QUANTITY:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return str(section + 1)
+
+
+class QuantityDelegate(QStyledItemDelegate):
+    """Edits a cart quantity with a spin box that exists only while the cell is being edited."""
+
+    def createEditor(self, parent, option, index):
+        editor = QSpinBox(parent)
+        editor.setRange(1, MAX_QUANTITY)
+        return editor
+
+    def setEditorData(self, editor, index):
+        editor.setValue(index.data(Qt.EditRole))
+
+    def setModelData(self, editor, model, index):
+        editor.interpretText()
+        model.setData(index, editor.value(), Qt.EditRole)
+
+
+class RemoveButtonDelegate(QStyledItemDelegate):
+    """Paints a push button in each cell and calls `on_click(row)` when it is clicked.
+
+    Only painted, so a cart with hundreds of lines has no button widgets.
+    """
+
+    def __init__(self, on_click, parent=None):
+        super().__init__(parent)
+        self.on_click = on_click
+
+    def paint(self, painter, option, index):
+        button = QStyleOptionButton()
+        button.rect = option.rect.adjusted(4, 2, -4, -2)
+        button.text = index.data(Qt.DisplayRole)
+        button.state = QStyle.State_Enabled
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawControl(QStyle.CE_PushButton, button, painter, option.widget)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and option.rect.contains(event.pos()):
+            self.on_click(index.row())
+            return True
+        return super().editorEvent(event, model, option, index)
@@ -0,0 +1,54 @@
+import numpy as np
+
+
+class FacetIndex:
+    """Category and range facets over columns of a ColumnarResult.
+
+    For a category column the rows are grouped by value (CSR, as in PrefixIndex), so
+    the rows of one value are a slice. For a range column the rows are kept in value
+    order, so the rows between two bounds are one searchsorted slice. Selections are
+    combined as boolean row masks; nothing is scanned per row.
+    """
+
+    def __init__(self, result, category_keys=(), range_keys=()):
+        self.row_count = result.row_count
+
+        self.categories = {}  # key -> (sorted values, rows grouped by value, offsets)
+        for key in category_keys:
+            labels = np.array(["" if value is None else str(value) for value in result[key].tolist()], dtype=object)
+            values, codes, counts = np.unique(labels, return_inverse=True, return_counts=True)
+            self.categories[key] = (values, np.argsort(codes, kind="stable"), np.concatenate(([0], np.cumsum(counts))))
+
+        self.ranges = {}  # key -> (sorted values, rows in that order)
+        for key in range_keys:
+            order = np.argsort(result[key], kind="stable")
+            self.ranges[key] = (result[key][order], order)
+
+    def counts(self, key):
+        """Return [(value, row count)] for a category column, sorted by value ("" for NULL)."""
+        values, _, offsets = self.categories[key]
+        return list(zip(values.tolist(), np.diff(offsets).tolist()))
+
+    def select(self, categories=None, ranges=None):
+        """Boolean mask of the rows matching every facet.
+
+        `categories` maps a category column to the values to keep; `ranges` maps a
+        range column to inclusive (low, high) bounds, either of which may be None.
+        """
+        mask = np.ones(self.row_count, dtype=bool)
+        for key, wanted in (categories or {}).items():
+            values, rows, offsets = self.categories[key]
+            selected = np.zeros(self.row_count, dtype=bool)
+            for value in wanted:
+                position = np.searchsorted(values, value)
+                if position < len(values) and values[position] == value:
+                    selected[rows[offsets[position]:offsets[position + 1]]] = True
+            mask &= selected
+        for key, (low, high) in (ranges or {}).items():
+            values, rows = self.ranges[key]
+            start = 0 if low is None else np.searchsorted(values, low, side="left")
+            end = len(rows) if high is None else np.searchsorted(values, high, side="right")
+            selected = np.zeros(self.row_count, dtype=bool)
+            selected[rows[start:end]] = True
+            mask &= selected
+        return mask
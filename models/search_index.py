@@ -0,0 +1,81 @@
+import re
+import numpy as np
+
+# Words are runs of letters and digits, so "jane.doe@mail.com" is "jane", "doe", "mail", "com"
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+# Tokens (and search words) are cut to this length to keep the vocabulary array small
+MAX_TOKEN_LENGTH = 32
+
+
+def tokenize(text):
+    if not text:
+        return []
+    return [token[:MAX_TOKEN_LENGTH] for token in TOKEN_PATTERN.findall(text.lower())]
+
+
+class PrefixIndex:
+    """Word-prefix search over the text columns of a ColumnarResult.
+
+    Every word of every indexed column goes into a sorted vocabulary (UTF-8 bytes,
+    which sort like the text); the rows containing each word are stored contiguously
+    in vocabulary order. All words starting with a search word are therefore one
+    searchsorted range, and so are their rows, which are marked in a boolean row
+    mask. A query matches rows that have a word starting with each of its words, in
+    any of the columns ("jan doe" finds Jane Doe and jan.doe@mail.com).
+
+    Rows changed after the build are handled by update(): their old words are masked
+    out and the new ones kept in a small side table that is scanned linearly.
+    """
+
+    def __init__(self, result, keys):
+        self.keys = keys
+        self.row_count = result.row_count
+
+        tokens = []
+        rows = []
+        for key in keys:
+            for row, text in enumerate(result[key].tolist()):
+                for token in tokenize(text):
+                    tokens.append(token)
+                    rows.append(row)
+
+        self.vocabulary, token_ids = np.unique(np.char.encode(np.array(tokens, dtype=str), "utf-8"),
+                                               return_inverse=True)
+        order = np.argsort(token_ids, kind="stable")
+        self.postings = np.array(rows, dtype=np.int32)[order]
+        counts = np.bincount(token_ids, minlength=len(self.vocabulary))
+        self.offsets = np.concatenate(([0], np.cumsum(counts)))
+
+        self.stale = np.zeros(self.row_count, dtype=bool)  # Rows whose indexed words are out of date
+        self.changed = {}  # row -> words, for rows updated or added after the build
+
+    def update(self, row, texts):
+        """Re-index `row` (which may be new) from `texts`, one string per indexed column."""
+        if row >= len(self.stale):
+            self.stale = np.concatenate((self.stale, np.zeros(row + 1 - len(self.stale), dtype=bool)))
+        self.stale[row] = True
+        self.changed[row] = sorted({token for text in texts for token in tokenize(text)})
+
+    def search(self, query):
+        """Return the sorted rows matching every word of `query`, or None for an empty query."""
+        words = tokenize(query)
+        if not words:
+            return None
+        matches = None
+        for word in set(words):
+            rows = self._rows_with_prefix(word)
+            matches = rows if matches is None else matches & rows
+        return np.flatnonzero(matches)
+
+    def _rows_with_prefix(self, word):
+        """Boolean mask over all rows of those with a word starting with `word`."""
+        prefix = word.encode("utf-8")
+        start, end = np.searchsorted(self.vocabulary, [prefix, prefix + b"\xff"])
+        rows = np.zeros(len(self.stale), dtype=bool)
+        rows[self.postings[self.offsets[start]:self.offsets[end]]] = True
+        if self.changed:
+            rows &= ~self.stale
+            for row, tokens in self.changed.items():
+                if any(token.startswith(word) for token in tokens):
+                    rows[row] = True
+        return rows
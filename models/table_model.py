@@ -0,0 +1,347 @@
+from decimal import Decimal
+import numpy as np
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+from PyQt5.QtWidgets import QTableView, QAbstractItemView
+from config import TABLE_FETCH_BATCH
+from database.columnar import ColumnarResult, format_float
+
+
+def display_text(values, row, scale=None):
+    """Format one cell of a ColumnarResult column the way ColumnarResult.text does."""
+    value = values[row]
+    kind = values.dtype.kind
+    if kind == "f":
+        return format_float(value, scale)
+    if kind == "i" and scale:
+        return str(Decimal(int(value)).scaleb(-scale))
+    if kind == "M":
+        if np.isnat(value):
+            return ""
+        unit = "D" if values.dtype == np.dtype("datetime64[D]") else "s"
+        return np.datetime_as_string(value, unit=unit).replace("T", " ")
+    if kind == "O":
+        return "" if value is None else str(value)
+    return str(value)
+
+
+def store_value(values, row, value, scale=None):
+    """Write a Python value (as returned by a dictionary cursor) into a ColumnarResult column."""
+    kind = values.dtype.kind
+    if kind == "f":
+        values[row] = np.nan if value is None else float(value)
+    elif kind == "M":
+        values[row] = np.datetime64("NaT") if value is None else np.datetime64(value)
+    elif kind in "iu":
+        values[row] = int(Decimal(value).scaleb(scale)) if scale else int(value)
+    else:
+        values[row] = value
+
+
+class ColumnTableModel(QAbstractTableModel):
+    """Table model over a ColumnarResult that creates no per-cell objects.
+
+    Cells are formatted when the view asks for them. Rows are exposed to the view in
+    batches of `batch_size` through canFetchMore/fetchMore, so a view only lays out
+    what has been scrolled to. Sorting and filtering reorder an index array over all
+    rows with NumPy, not just the rows fetched so far.
+
+    `columns` is a list of (column name, header label) pairs. `formatters` maps a
+    column name to a function from its Python value to the displayed text. With
+    `check_key`, the first column gets a checkbox; checked rows are remembered by
+    their `check_key` value, so they stay checked through sorting and filtering.
+    """
+
+    def __init__(self, columns, formatters=None, batch_size=TABLE_FETCH_BATCH, check_key=None, parent=None):
+        super().__init__(parent)
+        self.keys = [key for key, _ in columns]
+        self.headers = [header for _, header in columns]
+        self.formatters = formatters or {}
+        self.batch_size = batch_size
+        self.check_key = check_key
+        self.checked = {}  # check_key value -> None, in the order the rows were checked
+
+        self.result = ColumnarResult()
+        self.rows = np.zeros(0, dtype=np.intp)  # Result row shown at each view row
+        self.loaded = 0
+        self.sort_key = None
+        self.sort_order = Qt.AscendingOrder
+        self.filter_text = ""
+        self.filter_keys = None
+        self.row_filter = None  # Result rows to show (e.g. from a search index), or None for all
+        self._search_text = {}  # column name -> lower-cased str array, built on first filter
+        self._row_lookup = {}  # column name -> {value: result row}, built on first update_row
+
+    # ──────────────────── Data ────────────────────
+    def set_result(self, result):
+        """Replace the rows shown, keeping the current sort and text filter (not the row filter)."""
+        self.beginResetModel()
+        self.result = result
+        self.row_filter = None
+        self.checked = {}
+        self._search_text = {}
+        self._row_lookup = {}
+        self.rows = self._view_rows()
+        self.loaded = min(self.batch_size, len(self.rows))
+        self.endResetModel()
+
+    def total_rows(self):
+        """Rows matching the filter, fetched or not."""
+        return len(self.rows)
+
+    def value(self, row, key):
+        """Python value of column `key` at view row `row`."""
+        value = self.result[key][self.rows[row]]
+        return value.item() if isinstance(value, np.generic) else value
+
+    def find_row(self, key, value):
+        """Return the view row whose `key` equals `value` (fetching up to it), or -1."""
+        if not self.result:
+            return -1
+        matches = np.flatnonzero(self.result[key][self.rows] == value)
+        if not len(matches):
+            return -1
+        row = int(matches[0])
+        if row >= self.loaded:
+            self.beginInsertRows(QModelIndex(), self.loaded, row)
+            self.loaded = row + 1
+            self.endInsertRows()
+        return row
+
+    def result_row(self, key, value):
+        """Return the result row (not view row) whose `key` equals `value`, or None."""
+        if not self.result:
+            return None
+        if key not in self._row_lookup:
+            self._row_lookup[key] = {v: row for row, v in enumerate(self.result[key].tolist())}
+        return self._row_lookup[key].get(value)
+
+    def update_row(self, key, value, values):
+        """Overwrite the row whose `key` equals `value` with `values` (column name -> value).
+
+        The result's arrays are modified in place, so this is only for results that
+        are not shared (not from the query cache). Only that row is repainted; the
+        view keeps its selection and scroll position. Returns False if the row is not
+        in the result.
+        """
+        result_row = self.result_row(key, value)
+        if result_row is None:
+            return False
+
+        for name, new_value in values.items():
+            if name in self.result:
+                store_value(self.result[name], result_row, new_value, self.result.scales.get(name))
+                self._search_text.pop(name, None)
+
+        view_rows = np.flatnonzero(self.rows[:self.loaded] == result_row)
+        if len(view_rows):
+            row = int(view_rows[0])
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.keys) - 1))
+        return True
+
+    def checked_values(self):
+        """`check_key` values of the checked rows, in the order they were checked."""
+        return list(self.checked)
+
+    def clear_checked(self):
+        if not self.checked:
+            return
+        self.checked = {}
+        if self.loaded:
+            self.dataChanged.emit(self.index(0, 0), self.index(self.loaded - 1, 0), [Qt.CheckStateRole])
+
+    # ──────────────────── Sorting and filtering ────────────────────
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Sort every row (fetched or not) by `column`."""
+        if not 0 <= column < len(self.keys):
+            return
+        self.sort_key = self.keys[column]
+        self.sort_order = order
+        self.refresh_view()
+
+    def set_filter(self, text, keys=None):
+        """Show only rows where any of `keys` (default: all columns) contains `text`, ignoring case."""
+        self.filter_text = text.strip().lower()
+        self.filter_keys = keys
+        self.refresh_view()
+
+    def set_row_filter(self, rows):
+        """Show only the result rows in `rows` (an index array, kept in result order), or all for None."""
+        self.row_filter = None if rows is None else np.sort(rows)
+        self.refresh_view()
+
+    def refresh_view(self):
+        """Recompute the visible rows after the sort or filter changed."""
+        self.beginResetModel()
+        self.rows = self._view_rows()
+        self.loaded = min(self.batch_size, len(self.rows))
+        self.endResetModel()
+
+    def _view_rows(self):
+        rows = np.arange(self.result.row_count)
+        if not self.result:
+            return rows
+        if self.row_filter is not None:
+            rows = self.row_filter[self.row_filter < len(rows)]
+        if self.filter_text:
+            mask = np.zeros(len(rows), dtype=bool)
+            for key in self.filter_keys or self.keys:
+                mask |= np.char.find(self._search_column(key), self.filter_text) >= 0
+            rows = rows[mask]
+        if self.sort_key is not None:
+            values = self.result[self.sort_key][rows]
+            if values.dtype.kind == "O":
+                values = self._search_column(self.sort_key)[rows]
+            rows = rows[np.argsort(values, kind="stable")]
+            if self.sort_order == Qt.DescendingOrder:
+                rows = rows[::-1]
+        return rows
+
+    def _search_column(self, key):
+        """Lower-cased display text of a column as a NumPy str array (cached per result)."""
+        if key not in self._search_text:
+            self._search_text[key] = np.char.lower(np.array(self.result.text(key), dtype=str))
+        return self._search_text[key]
+
+    # ──────────────────── Qt model interface ────────────────────
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.loaded
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.keys)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.loaded < len(self.rows)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(self.batch_size, len(self.rows) - self.loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.loaded, self.loaded + count - 1)
+        self.loaded += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.CheckStateRole and self._is_check_column(index):
+            return Qt.Checked if self.value(index.row(), self.check_key) in self.checked else Qt.Unchecked
+        if role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+        key = self.keys[index.column()]
+        formatter = self.formatters.get(key)
+        if formatter is not None:
+            return formatter(self.value(index.row(), key))
+        return display_text(self.result[key], self.rows[index.row()], self.result.scales.get(key))
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.CheckStateRole or not self._is_check_column(index):
+            return False
+        key_value = self.value(index.row(), self.check_key)
+        if value == Qt.Checked:
+            self.checked[key_value] = None
+        else:
+            self.checked.pop(key_value, None)
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        return True
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if self._is_check_column(index):
+            flags |= Qt.ItemIsUserCheckable
+        return flags
+
+    def _is_check_column(self, index):
+        return self.check_key is not None and index.isValid() and index.column() == 0
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.headers[section]
+        return str(section + 1)
+
+
+class ColumnProxyModel(QSortFilterProxyModel):
+    """Sort/filter proxy in front of a ColumnTableModel.
+
+    Sorting and filtering are handed to the source model, which applies them to all
+    rows with NumPy; Qt's own proxy sort would only see the rows fetched so far.
+    """
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sourceModel().sort(column, order)
+
+    def set_filter(self, text, keys=None):
+        self.sourceModel().set_filter(text, keys)
+
+    def value(self, row, key):
+        return self.sourceModel().value(self.mapToSource(self.index(row, 0)).row(), key)
+
+    def find_row(self, key, value):
+        row = self.sourceModel().find_row(key, value)
+        if row < 0:
+            return -1
+        return self.mapFromSource(self.sourceModel().index(row, 0)).row()
+
+
+class ColumnTableView(QTableView):
+    """QTableView wired to a ColumnTableModel through a ColumnProxyModel.
+
+    Clicking a header sorts; rows are selected whole.
+    """
+
+    def __init__(self, columns, formatters=None, check_key=None, parent=None):
+        super().__init__(parent)
+        self.source_model = ColumnTableModel(columns, formatters, check_key=check_key, parent=self)
+        self.proxy_model = ColumnProxyModel(self)
+        self.proxy_model.setSourceModel(self.source_model)
+        self.setModel(self.proxy_model)
+
+        # No indicator yet, so enabling sorting keeps the query's row order
+        self.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.setSortingEnabled(True)
+        self.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.setWordWrap(False)
+
+    def set_result(self, result):
+        self.source_model.set_result(result)
+
+    def set_filter(self, text, keys=None):
+        self.proxy_model.set_filter(text, keys)
+
+    def set_row_filter(self, rows):
+        self.source_model.set_row_filter(rows)
+
+    def update_row(self, key, value, values):
+        return self.source_model.update_row(key, value, values)
+
+    def result_row(self, key, value):
+        return self.source_model.result_row(key, value)
+
+    def checked_values(self):
+        return self.source_model.checked_values()
+
+    def clear_checked(self):
+        self.source_model.clear_checked()
+
+    def current_row(self):
+        """Selected view row, or -1 (like QTableWidget.currentRow)."""
+        return self.currentIndex().row()
+
+    def selected_rows(self):
+        """View rows of every selected row, in order."""
+        return sorted(index.row() for index in self.selectionModel().selectedRows())
+
+    def value(self, row, key):
+        return self.proxy_model.value(row, key)
+
+    def select_value(self, key, value):
+        """Select and scroll to the row whose `key` equals `value`; return its row or -1."""
+        row = self.proxy_model.find_row(key, value)
+        if row >= 0:
+            self.selectRow(row)
+            self.scrollTo(self.proxy_model.index(row, 0))
+        return row